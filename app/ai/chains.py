@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+from langchain_core.exceptions import OutputParserException
+from app.ai.image_process import get_image_description_chain
+from app.ai.model import LARGE_TIER, ainvoke_chain, astream_chain, get_llm
+from app.ai.query_generation import get_find_related_graph_chain, get_relation_classification_chain, get_search_question_query_chain
+from app.ai.routing import get_chain_route
+from app.ai.telemetry import llm_telemetry
+from app.ai.text_processing import get_answer_with_nodes_query_chain, get_answer_with_nodes_stream_chain, get_text_extraction_chain, get_update_node_chain
+from app.config import settings
+
+
+# 체인 이름 -> 체인 생성 함수 (사용할 모델을 인자로 받음)
+CHAIN_FACTORIES: Dict[str, Callable[..., Any]] = {
+    "text_extraction": get_text_extraction_chain,
+    "update_node": get_update_node_chain,
+    "answer_with_nodes": get_answer_with_nodes_query_chain,
+    "answer_with_nodes_stream": get_answer_with_nodes_stream_chain,
+    "find_related_graph": get_find_related_graph_chain,
+    "classify_relations": get_relation_classification_chain,
+    "search_question_query": get_search_question_query_chain,
+    "image_description": get_image_description_chain,
+}
+
+_chains: Dict[Tuple[str, str], Any] = {}
+
+
+def build_chains():
+    """
+    모든 체인을 한 번만 생성하여 등록.
+    애플리케이션 시작 시 호출되며, 이후 요청들은 같은 체인 인스턴스를 공유합니다.
+    """
+    for name in CHAIN_FACTORIES:
+        get_chain(name)
+
+
+def get_chain(name: str, tier: Optional[str] = None):
+    """
+    등록된 체인을 반환. 아직 생성되지 않았다면 생성 후 등록합니다.
+    체인은 LLM_CHAIN_ROUTES에 설정된 모델 tier (또는 주어진 tier)의 모델로 생성됩니다.
+    """
+    route = get_chain_route(name)
+    tier = tier or route.tier
+    chain = _chains.get((name, tier))
+    if chain is None:
+        chain = CHAIN_FACTORIES[name](get_llm(tier, route.max_tokens, route.timeout))
+        _chains[(name, tier)] = chain
+    return chain
+
+
+async def _run_chain(name: str, chain, inputs, temperature: Optional[float]):
+    callbacks = llm_telemetry.callbacks()
+    config = {"callbacks": callbacks, "run_name": name}
+    if temperature is not None:
+        config["configurable"] = {"llm_temperature": temperature}
+    start = time.perf_counter()
+    try:
+        result = await ainvoke_chain(chain, inputs, config=config)
+    except (Exception, asyncio.CancelledError) as e:
+        # 취소된 호출(hedging에서 진 후보 등)도 비용이 발생하므로 기록합니다.
+        llm_telemetry.record_call(name, start, callbacks, e)
+        raise
+    llm_telemetry.record_call(name, start, callbacks)
+    return result
+
+
+async def run_chain(name: str, inputs, temperature: Optional[float] = None):
+    """
+    등록된 체인을 비동기로 실행. temperature를 주면 이번 실행에서만 모델 temperature를 바꿉니다.
+    small tier 체인의 출력을 파싱하지 못하면 large tier 모델로 한 번 더 실행합니다.
+    실행 시간, 토큰 사용량, 오류는 체인 이름별로 llm_telemetry에 기록됩니다.
+    """
+    tier = get_chain_route(name).tier
+    try:
+        return await _run_chain(name, get_chain(name), inputs, temperature)
+    except OutputParserException as e:
+        if tier == LARGE_TIER or not settings.LLM_FALLBACK_ON_PARSE_FAILURE:
+            raise
+        print(f"{name} 체인 출력 파싱 실패, large 모델로 다시 실행합니다: {str(e)}")
+        llm_telemetry.record_fallback(name)
+        return await _run_chain(name, get_chain(name, LARGE_TIER), inputs, temperature)
+
+
+async def stream_chain(name: str, inputs):
+    """
+    등록된 체인의 출력을 생성되는 대로 전달
+    """
+    callbacks = llm_telemetry.callbacks()
+    start = time.perf_counter()
+    try:
+        async for chunk in astream_chain(get_chain(name), inputs, config={"callbacks": callbacks, "run_name": name}):
+            yield chunk
+    except (Exception, asyncio.CancelledError, GeneratorExit) as e:
+        llm_telemetry.record_call(name, start, callbacks, e)
+        raise
+    llm_telemetry.record_call(name, start, callbacks)
+
+
+async def warmup_llm_client():
+    """
+    Anthropic HTTP 클라이언트를 미리 생성하고 연결을 맺어두어
+    배포 후 첫 요청에서 연결 수립 비용이 발생하지 않도록 합니다.
+    """
+    clients = {}
+    for name in CHAIN_FACTORIES:
+        route = get_chain_route(name)
+        client = getattr(get_llm(route.tier, route.max_tokens, route.timeout), "_async_client", None)
+        if client is not None:
+            clients[id(client)] = client
+    await asyncio.gather(*(client.models.list(limit=1) for client in clients.values()))
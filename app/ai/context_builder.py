@@ -0,0 +1,77 @@
+import json
+import math
+from typing import Any, Dict, List
+from app.db.node_index import bigrams, dice, tokenize
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    토크나이저 없이 추정한 토큰 수. 영문은 약 4글자, 한글 등은 약 1.5글자당 1토큰으로 계산합니다.
+    """
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    other_chars = len(text) - ascii_chars
+    return math.ceil(ascii_chars / 4 + other_chars / 1.5)
+
+
+def _node_text(node: Dict[str, Any]) -> str:
+    return " ".join([node.get("title", ""), " ".join(node.get("entities", []) or []), node.get("summary", "")])
+
+
+def _relevance(question_tokens, question_bigrams, node: Dict[str, Any]) -> float:
+    node_text = _node_text(node)
+    overlap = len(question_tokens & tokenize(node_text)) / len(question_tokens) if question_tokens else 0.0
+    return overlap + dice(question_bigrams, bigrams(node_text))
+
+
+def _jaccard(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def build_answer_context(
+    question: str,
+    nodes: List[Dict[str, Any]],
+    token_budget: int,
+    dedup_threshold: float,
+) -> Dict[str, Any]:
+    """
+    답변 체인에 전달할 노드들을 고릅니다.
+    질문과의 관련도 순으로 정렬한 뒤, summary가 이미 포함된 노드와 거의 같은 노드는 제외하고,
+    token_budget을 넘지 않는 만큼만 포함합니다.
+    """
+    question_tokens = tokenize(question)
+    question_bigrams = bigrams(question)
+
+    ranked = sorted(
+        enumerate(nodes),
+        key=lambda item: (-_relevance(question_tokens, question_bigrams, item[1]), item[0]),
+    )
+
+    context_nodes = []
+    included_summaries = []
+    used_tokens = 0
+    for _, node in ranked:
+        summary_tokens = tokenize(node.get("summary", ""))
+        if any(_jaccard(summary_tokens, included) >= dedup_threshold for included in included_summaries):
+            continue
+
+        context_node = {
+            "title": node.get("title", ""),
+            "summary": node.get("summary", ""),
+            "entities": node.get("entities", []),
+        }
+        cost = estimate_tokens(json.dumps(context_node, ensure_ascii=False))
+        if used_tokens + cost > token_budget:
+            continue
+
+        context_nodes.append(context_node)
+        included_summaries.append(summary_tokens)
+        used_tokens += cost
+
+    return {
+        "nodes": context_nodes,
+        "included_nodes": len(context_nodes),
+        "dropped_nodes": len(nodes) - len(context_nodes),
+        "context_tokens": used_tokens,
+    }
@@ -0,0 +1,184 @@
+import re
+from typing import Any, Dict, Optional
+from neo4j import AsyncSession
+from app.config import settings
+
+
+# 검증에서 허용하는 프로시저/함수 (소문자로 비교)
+ALLOWED_PROCEDURES = {
+    "apoc.text.sorensendicesimilarity",
+    "apoc.text.levenshteinsimilarity",
+    "apoc.text.jarowinklerdistance",
+    "apoc.coll.intersection",
+}
+
+# 내장 temporal/spatial 함수 namespace (date.truncate, duration.between, point.distance 등, 소문자로 비교)
+ALLOWED_FUNCTION_NAMESPACES = {
+    "date",
+    "datetime",
+    "localdatetime",
+    "localtime",
+    "time",
+    "duration",
+    "point",
+}
+
+STRING_LITERAL_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+COMMENT_PATTERN = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+# 절 키워드와 같은 이름일 수 있는 식별자: `escape된 이름`, $파라미터, .속성, label/관계 유형/map key (n:Label, {key: value})
+IDENTIFIER_PATTERN = re.compile(r"`[^`]*`|\$\w+|\.\s*\w+|\w*\s*:\s*\w+")
+WRITE_CLAUSE_PATTERN = re.compile(r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b", re.IGNORECASE)
+FORBIDDEN_CLAUSE_PATTERN = re.compile(r"\b(DELETE|DETACH|REMOVE|DROP|LOAD\s+CSV)\b", re.IGNORECASE)
+PROCEDURE_PATTERN = re.compile(r"(?<![.\w])([A-Za-z_]\w*(?:\s*\.\s*[A-Za-z_]\w*)+)\s*\(")
+# 괄호 없이 호출하는 프로시저도 포함 (CALL db.labels YIELD ...)
+CALL_PATTERN = re.compile(r"(?<![.\w])CALL\s+([A-Za-z_]\w*(?:\s*\.\s*[A-Za-z_]\w*)*)", re.IGNORECASE)
+# 노드 패턴: (변수), (변수:Label), (변수:Label {...}), () 등. 함수 호출 괄호와 식의 괄호는 제외합니다.
+NODE_PATTERN = re.compile(r"(?<![\w`.])\(\s*(`[^`]*`|[A-Za-z_]\w*)?\s*(:[^(){}]*)?(?=[{)])")
+LABEL_PATTERN = re.compile(r"^:\s*(`[^`]+`|\w+)\s*$")
+LIMIT_PATTERN = re.compile(r"(?<![.\w$])LIMIT\b", re.IGNORECASE)
+# LIMIT 값은 정수 또는 $파라미터만 허용 (LIMIT 10 + 1000 같은 식은 허용하지 않음)
+LIMIT_VALUE_PATTERN = re.compile(r"\s+(\d+|\$\w+)\b(?!\s*[-+*/%^.(\[])")
+FINAL_LIMIT_PATTERN = re.compile(r"(?<![.\w$])LIMIT\s+(?:\d+|\$\w+)\s*;?\s*$", re.IGNORECASE)
+UNION_PATTERN = re.compile(r"(?<![.\w])UNION(?:\s+ALL)?\b", re.IGNORECASE)
+
+
+class CypherValidationError(ValueError):
+    pass
+
+
+def _strip_literals(query: str) -> str:
+    query = COMMENT_PATTERN.sub(" ", query)
+    return STRING_LITERAL_PATTERN.sub("''", query)
+
+
+def _strip_identifiers(query: str) -> str:
+    """
+    n.set, (n:Create), {merge: 1}처럼 절 키워드가 아닌 위치의 단어를 지워 절 검사에만 사용합니다.
+    """
+    return IDENTIFIER_PATTERN.sub(" ", query)
+
+
+def _is_allowed_procedure(procedure: str) -> bool:
+    name = re.sub(r"\s+", "", procedure).lower()
+    namespace, _, function = name.partition(".")
+    return name in ALLOWED_PROCEDURES or (namespace in ALLOWED_FUNCTION_NAMESPACES and "." not in function)
+
+
+def _check_node_patterns(query: str, label: str) -> None:
+    """
+    모든 노드 패턴은 label을 가져야 합니다.
+    label이 없는 노드 패턴은 앞에서 label과 함께 선언된 변수를 다시 사용하는 경우만 허용합니다.
+    """
+    has_label = False
+    labeled_variables = set()
+    unlabeled = []
+    for match in NODE_PATTERN.finditer(query):
+        variable = (match.group(1) or "").strip("`")
+        label_expression = match.group(2)
+        if label_expression is None:
+            unlabeled.append(variable)
+            continue
+
+        label_match = LABEL_PATTERN.match(label_expression)
+        if not label_match:
+            raise CypherValidationError(f"쿼리 검증 실패: 허용되지 않은 label 식입니다: {label_expression.strip()}. label {label}만 사용하세요.")
+        node_label = label_match.group(1).strip("`")
+        if node_label != label:
+            raise CypherValidationError(f"쿼리 검증 실패: 허용되지 않은 label이 사용되었습니다: {node_label}. label {label}만 사용하세요.")
+        has_label = True
+        if variable:
+            labeled_variables.add(variable)
+
+    if not has_label:
+        raise CypherValidationError(f"쿼리 검증 실패: 노드 패턴에 label {label}이 사용되지 않았습니다.")
+
+    for variable in unlabeled:
+        if variable not in labeled_variables:
+            raise CypherValidationError(f"쿼리 검증 실패: label이 없는 노드 패턴은 사용할 수 없습니다: ({variable}). 모든 노드 패턴에 label {label}을 지정하세요.")
+
+
+def _check_limits(query: str, query_params: Dict[str, Any]) -> None:
+    """
+    최종 RETURN(UNION이면 각 RETURN)은 LIMIT으로 끝나야 하고,
+    모든 LIMIT 값은 CYPHER_MAX_LIMIT 이하의 정수 또는 $파라미터여야 합니다.
+    """
+    for match in LIMIT_PATTERN.finditer(query):
+        value_match = LIMIT_VALUE_PATTERN.match(query, match.end())
+        if not value_match:
+            raise CypherValidationError("쿼리 검증 실패: LIMIT 값은 정수 또는 $파라미터여야 합니다.")
+        limit = value_match.group(1)
+        value = query_params.get(limit[1:]) if limit.startswith("$") else limit
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise CypherValidationError(f"쿼리 검증 실패: LIMIT 값 {limit}을 확인할 수 없습니다.")
+        if value > settings.CYPHER_MAX_LIMIT:
+            raise CypherValidationError(f"쿼리 검증 실패: LIMIT은 {settings.CYPHER_MAX_LIMIT} 이하여야 합니다.")
+
+    for part in UNION_PATTERN.split(query):
+        if not FINAL_LIMIT_PATTERN.search(part):
+            raise CypherValidationError(f"쿼리 검증 실패: 마지막 RETURN에 LIMIT 절이 없습니다. 결과를 최대 {settings.CYPHER_MAX_LIMIT}개로 제한하세요.")
+
+
+def check_cypher(
+    query: str,
+    label: str,
+    query_params: Optional[Dict[str, Any]] = None,
+    read_only: bool = True,
+) -> None:
+    """
+    쿼리를 실행하지 않고 정적으로 검사합니다.
+    - 모든 노드 패턴은 주어진 label을 가져야 합니다 (label과 함께 선언한 변수의 재사용은 허용).
+    - read_only인 경우 쓰기 절을 사용할 수 없고, 마지막 RETURN은 LIMIT (최대 CYPHER_MAX_LIMIT)으로 끝나야 합니다.
+    - 쓰기가 허용되어도 삭제 계열 절은 사용할 수 없습니다.
+    - 허용된 프로시저/함수와 내장 temporal/spatial 함수만 호출할 수 있습니다. (CALL로 호출하는 프로시저 포함)
+    절 검사는 문자열, 주석, 속성 이름, label, map key를 지운 뒤에 수행합니다.
+    정적 검사는 보조 수단이며, 생성된 조회 쿼리는 읽기 트랜잭션에서 실행해야 합니다.
+    """
+    stripped = _strip_literals(query)
+    clauses = _strip_identifiers(stripped)
+    if not isinstance(query_params, dict):
+        query_params = {}
+
+    _check_node_patterns(stripped, label)
+
+    forbidden = FORBIDDEN_CLAUSE_PATTERN.search(clauses)
+    if forbidden:
+        raise CypherValidationError(f"쿼리 검증 실패: {forbidden.group(1).upper()} 절은 사용할 수 없습니다.")
+
+    if read_only:
+        write = WRITE_CLAUSE_PATTERN.search(clauses)
+        if write:
+            raise CypherValidationError(f"쿼리 검증 실패: 조회 쿼리에서는 {write.group(1).upper()} 절을 사용할 수 없습니다.")
+        _check_limits(stripped, query_params)
+
+    unquoted = stripped.replace("`", "")
+    for procedure in CALL_PATTERN.findall(unquoted) + PROCEDURE_PATTERN.findall(unquoted):
+        if not _is_allowed_procedure(procedure):
+            raise CypherValidationError(f"쿼리 검증 실패: 허용되지 않은 프로시저/함수입니다: {procedure}")
+
+
+async def explain_cypher(session: AsyncSession, query: str, query_params: Optional[Dict[str, Any]] = None) -> None:
+    """
+    EXPLAIN으로 실행 계획만 만들어 문법/의미 오류를 확인합니다. 데이터는 읽거나 쓰지 않습니다.
+    """
+    try:
+        result = await session.run(f"EXPLAIN {query}", query_params if isinstance(query_params, dict) else {})
+        await result.consume()
+    except Exception as e:
+        raise CypherValidationError(f"쿼리 검증 실패: {str(e)}")
+
+
+async def validate_cypher(
+    session: AsyncSession,
+    query: str,
+    query_params: Optional[Dict[str, Any]],
+    label: str,
+    read_only: bool = True,
+) -> None:
+    """
+    생성된 쿼리를 실행하기 전에 정적 검사와 EXPLAIN을 차례로 수행
+    """
+    check_cypher(query, label, query_params, read_only)
+    if settings.CYPHER_EXPLAIN_ENABLED:
+        await explain_cypher(session, query, query_params)
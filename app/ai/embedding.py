@@ -0,0 +1,90 @@
+import math
+import re
+import unicodedata
+import zlib
+from typing import Iterable, List, Optional
+import numpy as np
+from app.config import settings
+
+
+EMBEDDING_DIM = settings.EMBEDDING_DIM
+NGRAM_SIZES = (2, 3)
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# 노드 임베딩 계산 시 필드별 가중치
+TITLE_WEIGHT = 2.0
+ENTITIES_WEIGHT = 2.0
+SUMMARY_WEIGHT = 1.0
+
+
+def _features(text: str) -> List[str]:
+    """
+    단어 토큰과 단어 내부의 문자 n-gram. 한국어 조사가 붙은 단어도 n-gram으로 매칭됩니다.
+    """
+    features = []
+    for word in WORD_PATTERN.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        features.append(word)
+        padded = f"<{word}>"
+        for n in NGRAM_SIZES:
+            features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return features
+
+
+def _hashed_tf(text: str) -> np.ndarray:
+    """
+    feature hashing으로 고정 차원에 투영한 TF 벡터 (sublinear tf, 부호 해싱)
+    """
+    counts = {}
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        index = h % EMBEDDING_DIM
+        sign = 1.0 if (h >> 31) & 1 else -1.0
+        key = (index, sign)
+        counts[key] = counts.get(key, 0) + 1
+
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for (index, sign), count in counts.items():
+        vector[index] += sign * (1.0 + math.log(count))
+    return vector
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    if norm > 0:
+        vector /= norm
+    return vector
+
+
+def embed_text(text: str) -> np.ndarray:
+    """
+    문자열의 L2 정규화된 float32 임베딩. 외부 모델 없이 로컬에서 계산됩니다.
+    """
+    return _normalize(_hashed_tf(text))
+
+
+def embed_node(title: str, summary: str, entities: Iterable[str]) -> np.ndarray:
+    """
+    노드의 title / summary / entities를 가중합한 임베딩
+    """
+    vector = (
+        TITLE_WEIGHT * _normalize(_hashed_tf(title))
+        + ENTITIES_WEIGHT * _normalize(_hashed_tf(" ".join(entities or [])))
+        + SUMMARY_WEIGHT * _normalize(_hashed_tf(summary))
+    )
+    return _normalize(vector.astype(np.float32))
+
+
+def embedding_to_bytes(vector: np.ndarray) -> bytes:
+    """
+    graph db에 저장하기 위한 float32 바이트 배열
+    """
+    return vector.astype(np.float32).tobytes()
+
+
+def embedding_from_bytes(data: Optional[bytes]) -> Optional[np.ndarray]:
+    if not data:
+        return None
+    vector = np.frombuffer(bytes(data), dtype=np.float32)
+    if vector.shape[0] != EMBEDDING_DIM:
+        return None
+    return vector
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from app.ai.chains import run_chain
+from app.config import settings
+
+
+def hedge_temperatures() -> List[float]:
+    return [float(value) for value in settings.CYPHER_HEDGE_TEMPERATURES.split(",") if value.strip()]
+
+
+class HedgeStats:
+    def __init__(self):
+        self.rounds = 0
+        self.candidates_launched = 0
+        self.candidates_failed = 0
+        self.candidates_cancelled = 0
+        self.rounds_failed = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.CYPHER_HEDGE_ENABLED,
+            "temperatures": hedge_temperatures(),
+            "rounds": self.rounds,
+            "rounds_failed": self.rounds_failed,
+            "candidates_launched": self.candidates_launched,
+            "candidates_failed": self.candidates_failed,
+            "candidates_cancelled": self.candidates_cancelled,
+            # 라운드당 추가로 실행한 후보 수 (1.0이면 모든 라운드에서 LLM 호출이 한 번씩 더 발생)
+            "extra_candidates_per_round": round(
+                (self.candidates_launched - self.rounds) / self.rounds, 4
+            ) if self.rounds else 0.0,
+        }
+
+
+hedge_stats = HedgeStats()
+
+
+async def _hedged(name: str, inputs: Dict[str, Any], execute: Callable[[Any], Awaitable[Any]], temperatures: List[float]) -> Tuple[Any, Any]:
+    tasks = [asyncio.create_task(run_chain(name, inputs, temperature=temperature)) for temperature in temperatures]
+    hedge_stats.rounds += 1
+    hedge_stats.candidates_launched += len(tasks)
+
+    last_error = None
+    try:
+        for next_candidate in asyncio.as_completed(tasks):
+            try:
+                candidate = await next_candidate
+                return candidate, await execute(candidate)
+            except Exception as e:
+                print(f"후보 쿼리 실패, 다음 후보를 기다립니다: {str(e)}")
+                hedge_stats.candidates_failed += 1
+                last_error = e
+        hedge_stats.rounds_failed += 1
+        raise last_error
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                hedge_stats.candidates_cancelled += 1
+
+
+async def generate_and_execute(name: str, inputs: Dict[str, Any], execute: Callable[[Any], Awaitable[Any]]) -> Tuple[Any, Any]:
+    """
+    체인으로 쿼리를 생성하고 execute(쿼리)를 실행하여 (쿼리, 실행 결과)를 리턴.
+    CYPHER_HEDGE_ENABLED이면 temperature를 달리한 후보들을 동시에 생성하고,
+    먼저 도착한 후보부터 실행하여 처음 성공한 결과를 리턴하며 나머지 생성은 취소합니다.
+    모든 후보가 실패하면 마지막 오류를 raise합니다.
+    """
+    temperatures = hedge_temperatures()
+    if not settings.CYPHER_HEDGE_ENABLED or len(temperatures) < 2:
+        candidate = await run_chain(name, inputs)
+        return candidate, await execute(candidate)
+    return await _hedged(name, inputs, execute, temperatures)
@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional
+from app.config import settings
+from app.core.cache import LRUCache
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class ImageDescriptionCache:
+    """
+    (label, perceptual hash)로 이미지 분석 결과(설명과 인코딩 정보)를 저장하는 캐시.
+    같은 label에서 해밍 거리가 max_distance 이하인 이미지는 같은 이미지로 보고
+    저장된 결과를 재사용합니다.
+    """
+
+    def __init__(self, max_size: int, max_distance: int):
+        self.max_distance = max_distance
+        self._descriptions = LRUCache(max_size)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize_label(label: str) -> str:
+        return label.strip().lower()
+
+    def get(self, label: str, image_hash: int) -> Optional[Dict[str, Any]]:
+        label = self._normalize_label(label)
+
+        best_key, best_distance = None, None
+        for (cached_label, cached_hash), _ in self._descriptions.items():
+            if cached_label != label:
+                continue
+            distance = hamming_distance(image_hash, cached_hash)
+            if distance <= self.max_distance and (best_distance is None or distance < best_distance):
+                best_key, best_distance = (cached_label, cached_hash), distance
+                if distance == 0:
+                    break
+
+        analysis = self._descriptions.get(best_key) if best_key is not None else None
+        if analysis is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return analysis
+
+    def set(self, label: str, image_hash: int, analysis: Dict[str, Any]) -> None:
+        self._descriptions.set((self._normalize_label(label), image_hash), analysis)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._descriptions),
+            "max_size": self._descriptions.max_size,
+            "max_distance": self.max_distance,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+image_description_cache = ImageDescriptionCache(
+    settings.IMAGE_CACHE_SIZE,
+    settings.IMAGE_CACHE_MAX_DISTANCE,
+)
@@ -9,18 +9,18 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.messages import HumanMessage
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from app.ai.model import claude_llm
 from app.schemas.ai import ImageDescription
 
 
-def get_image_description_chain():
+def get_image_description_chain(llm=claude_llm):
     """이미지로부터 설명을 생성하는 체인"""
     
     parser = PydanticOutputParser(pydantic_object=ImageDescription)
     format_instructions = parser.get_format_instructions()
     
-    def generate_description(inputs):
+    async def generate_description(inputs):
         topic = inputs["topic"]
         base64_image = inputs["image_data"]["base64_image"]
         mime_type = inputs["image_data"]["mime_type"]
@@ -55,7 +55,7 @@ def get_image_description_chain():
             ]
         )
         
-        response = claude_llm.invoke([message])
+        response = await llm.ainvoke([message])
         
         try:
             parsed_response = parser.parse(response.content)
@@ -64,4 +64,4 @@ def get_image_description_chain():
         
             return ImageDescription(description=response.content)
     
-    return generate_description
+    return RunnableLambda(generate_description)
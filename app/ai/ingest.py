@@ -0,0 +1,181 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from fastapi.encoders import jsonable_encoder
+from neo4j import AsyncSession
+from sqlalchemy.orm import Session as DBSession
+from app.ai.hedging import generate_and_execute
+from app.ai.summary_cache import summarize_with_cache
+from app.ai.telemetry import llm_telemetry
+from app.config import settings
+from app.db.base import SessionLocal, driver
+from app.db.crud.ingest_job import claim_ingest_job, fail_ingest_job, finish_ingest_job, save_ingest_stage
+from app.db.graph import create_graph_node, merge_relations
+from app.db.node_index import node_index
+from app.models.ingest_job import IngestJob
+from app.schemas.ai import RelationChoices
+from app.schemas.node import BaseNode
+
+
+# 파이프라인 단계 (순서대로 실행되며, 완료된 단계는 재시도 시 건너뜁니다)
+INGEST_STAGES = ["summarize", "create_node", "related_nodes", "create_relations"]
+
+
+async def create_node_relations(neo4j: AsyncSession, label: str, node: BaseNode, related_nodes: List[BaseNode]) -> List[Dict[str, Any]]:
+    """
+    AI가 고른 관계 유형으로 node와 관련된 노드들 사이에 relation을 생성하고, 생성된 relation 목록을 리턴.
+    AI는 (연관 노드 uuid, 관계 유형) 목록만 고르고, 관계는 서버의 고정된 쿼리 한 번으로 생성됩니다.
+    응답을 해석할 수 없으면 오류 내용을 전달하여 다시 요청하며, 재시도 횟수를 넘기면 마지막 오류를 raise합니다.
+    """
+    max_retries = 3
+    retry_count = 0
+    previous_error = ""
+    related_uuids = {related_node.uuid for related_node in related_nodes}
+
+    async def write_relations(choices: RelationChoices) -> List[Dict[str, Any]]:
+        pairs = []
+        for choice in choices.relations:
+            pair = {"uuid": choice.related_uuid, "type": choice.relation_type}
+            if choice.related_uuid in related_uuids and pair not in pairs:
+                pairs.append(pair)
+        return await merge_relations(neo4j, label, node.uuid, pairs)
+
+    while True:
+        try:
+            _, relations = await generate_and_execute(
+                "classify_relations",
+                {
+                    "target_node": node,
+                    "existing_nodes": related_nodes,
+                    "previous_error": previous_error,
+                },
+                write_relations,
+            )
+            return relations
+
+        except Exception as e:
+            print(f"관계 생성 중 오류 발생: {str(e)}")
+            previous_error = str(e)
+            retry_count += 1
+            if retry_count >= max_retries:
+                raise
+            print(f"AI에게 관계 유형을 다시 요청합니다. 재시도 횟수: {retry_count}")
+            llm_telemetry.record_retry("classify_relations")
+
+
+async def run_ingest_stage(stage: str, job: IngestJob, db: DBSession, neo4j: AsyncSession) -> Dict[str, Any]:
+    """
+    단계 하나를 실행하고 job 결과에 추가할 값을 리턴
+    """
+    result = job.result or {}
+
+    if stage == "summarize":
+        summarized = await summarize_with_cache(db, job.title, job.text)
+        return {"summary": summarized.summary, "entities": summarized.entities}
+
+    if stage == "create_node":
+        # job id를 노드 uuid로 사용하여, 노드 생성 후 결과 저장 전에 실패해도 재시도 시 같은 노드를 사용합니다.
+        node = await create_graph_node(neo4j, job.label, job.title, result["summary"], result["entities"], uuid=job.id)
+        if not node:
+            raise RuntimeError("Node creation failed")
+        return {"node": node}
+
+    if stage == "related_nodes":
+        node = result["node"]
+        related_nodes = await node_index.search(
+            neo4j,
+            job.label,
+            title=node["title"],
+            summary=node["summary"],
+            entities=node["entities"],
+            top_k=settings.RELATED_NODES_TOP_K,
+            exclude_uuid=node["uuid"],
+        )
+        return {"related_nodes": related_nodes}
+
+    if stage == "create_relations":
+        if not result["related_nodes"]:
+            return {"relations": []}
+        relations = await create_node_relations(
+            neo4j,
+            job.label,
+            BaseNode(**result["node"]),
+            [BaseNode(**related_node) for related_node in result["related_nodes"]],
+        )
+        return {"relations": relations}
+
+    raise ValueError(f"알 수 없는 단계: {stage}")
+
+
+async def run_ingest_job(job: IngestJob, db: DBSession) -> None:
+    """
+    마지막으로 완료된 단계 다음부터 파이프라인을 실행합니다.
+    실패하면 INGEST_MAX_ATTEMPTS까지 지수 백오프로 다시 대기열에 넣습니다.
+    """
+    start = INGEST_STAGES.index(job.stage) + 1 if job.stage in INGEST_STAGES else 0
+    try:
+        async with driver.session() as neo4j:
+            for stage in INGEST_STAGES[start:]:
+                stage_result = await run_ingest_stage(stage, job, db, neo4j)
+                # result는 JSON 컬럼이므로 노드의 datetime 등을 JSON 값으로 변환하여 저장합니다.
+                save_ingest_stage(db, job, stage, jsonable_encoder(stage_result))
+        finish_ingest_job(db, job)
+
+    except Exception as e:
+        print(f"ingest job {job.id} 처리 중 오류 발생 (시도 {job.attempts}회): {str(e)}")
+        db.rollback()
+        retry_after = None
+        if job.attempts < settings.INGEST_MAX_ATTEMPTS:
+            retry_after = settings.INGEST_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 1)
+        fail_ingest_job(db, job, str(e), retry_after)
+
+
+class IngestWorkers:
+    """
+    SQL db의 ingest_jobs 테이블을 대기열로 사용하는 백그라운드 워커들.
+    워커 수만큼만 job이 동시에 실행되므로 요청이 몰려도 LLM 호출이 대기열에서 고르게 처리됩니다.
+    """
+
+    def __init__(self, worker_count: int):
+        self.worker_count = worker_count
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def notify(self) -> None:
+        """
+        새 job이 등록되었음을 알려 대기 중인 워커를 바로 깨웁니다.
+        """
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            job = None
+            db = SessionLocal()
+            try:
+                job = claim_ingest_job(db, settings.INGEST_JOB_TIMEOUT_SECONDS, settings.INGEST_MAX_ATTEMPTS)
+                if job is not None:
+                    await run_ingest_job(job, db)
+            except Exception as e:
+                print(f"ingest job 조회 중 오류 발생: {str(e)}")
+            finally:
+                db.close()
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.INGEST_POLL_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.worker_count)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+ingest_workers = IngestWorkers(settings.INGEST_WORKERS)
@@ -1,8 +1,61 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
 from langchain_anthropic import ChatAnthropic
+from langchain_core.runnables import ConfigurableField
 from app.config import settings
 
-claude_llm = ChatAnthropic(
-    model="claude-3-5-sonnet-20240620",
-    anthropic_api_key=settings.ANTHROPIC_API_KEY,
-    temperature=0.2
-)
\ No newline at end of file
+LARGE_TIER = "large"
+SMALL_TIER = "small"
+
+_llms: Dict[Tuple[str, Optional[int], Optional[float]], Any] = {}
+
+
+def tier_model(tier: str) -> str:
+    return settings.LLM_SMALL_MODEL if tier == SMALL_TIER else settings.LLM_LARGE_MODEL
+
+
+def get_llm(tier: str = LARGE_TIER, max_tokens: Optional[int] = None, timeout: Optional[float] = None):
+    """
+    tier(large / small)와 max_tokens, timeout(초) 조합별로 하나씩 만들어 공유하는 모델.
+    temperature는 실행 시 config={"configurable": {"llm_temperature": ...}}로 바꿀 수 있습니다.
+    """
+    model = tier_model(tier)
+    key = (model, max_tokens, timeout)
+    llm = _llms.get(key)
+    if llm is None:
+        llm = ChatAnthropic(
+            model=model,
+            anthropic_api_key=settings.ANTHROPIC_API_KEY,
+            temperature=0.2,
+            max_tokens=max_tokens or settings.LLM_DEFAULT_MAX_TOKENS,
+            default_request_timeout=timeout or settings.LLM_DEFAULT_TIMEOUT_SECONDS,
+        ).configurable_fields(
+            temperature=ConfigurableField(id="llm_temperature", name="LLM temperature")
+        )
+        _llms[key] = llm
+    return llm
+
+
+claude_llm = get_llm(LARGE_TIER)
+
+# 프로세스 전체에서 동시에 진행되는 LLM 호출 수 제한
+llm_semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+
+
+async def ainvoke_chain(chain, inputs, config=None):
+    """
+    이벤트 루프를 막지 않도록 체인을 비동기로 실행.
+    동시에 실행되는 LLM 호출 수는 llm_semaphore로 제한됩니다.
+    """
+    async with llm_semaphore:
+        return await chain.ainvoke(inputs, config=config)
+
+
+async def astream_chain(chain, inputs, config=None):
+    """
+    체인의 출력을 생성되는 대로 비동기로 전달.
+    스트리밍이 끝날 때까지 llm_semaphore를 점유합니다.
+    """
+    async with llm_semaphore:
+        async for chunk in chain.astream(inputs, config=config):
+            yield chunk
@@ -0,0 +1,128 @@
+import re
+from typing import List, Tuple
+from app.ai.chains import run_chain
+from app.ai.telemetry import llm_telemetry
+from app.config import settings
+from app.db.node_index import bigrams, dice, normalize
+from app.schemas.ai import SummarizedText
+
+
+SENTENCE_SPLIT_PATTERN = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+# 이 값 이상 bigram이 겹치는 문장은 같은 문장으로 봅니다.
+DUPLICATE_SENTENCE_THRESHOLD = 0.9
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_SPLIT_PATTERN.split(text or "") if sentence.strip()]
+
+
+def merge_entities(prev_entities: List[str], new_entities: List[str], max_entities: int) -> List[str]:
+    """
+    정규화한 값 기준으로 중복을 제거한 합집합. 처음 등장한 표기를 유지합니다.
+    max_entities를 넘으면 양쪽에 모두 있는 엔티티, 새 엔티티, 기존 엔티티 순으로 남기고
+    순서는 원래 순서(기존 -> 새)를 유지합니다.
+    """
+    prev_keys = {normalize(entity) for entity in prev_entities or []}
+    new_keys = {normalize(entity) for entity in new_entities or []}
+
+    merged = []
+    seen = set()
+    for entity in list(prev_entities or []) + list(new_entities or []):
+        entity = entity.strip()
+        key = normalize(entity)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        merged.append(entity)
+
+    if len(merged) <= max_entities:
+        return merged
+
+    def priority(entity: str) -> int:
+        key = normalize(entity)
+        if key in prev_keys and key in new_keys:
+            return 0
+        return 1 if key in new_keys else 2
+
+    kept = set(sorted(merged, key=priority)[:max_entities])
+    return [entity for entity in merged if entity in kept]
+
+
+def _novel_sentences(prev_summary: str, new_summary: str) -> List[str]:
+    """
+    새 summary의 문장 중 기존 summary에 없는 문장
+    """
+    prev_bigrams = [bigrams(sentence) for sentence in split_sentences(prev_summary)]
+    novel = []
+    for sentence in split_sentences(new_summary):
+        sentence_bigrams = bigrams(sentence)
+        if any(dice(sentence_bigrams, prev) >= DUPLICATE_SENTENCE_THRESHOLD for prev in prev_bigrams):
+            continue
+        novel.append(sentence)
+    return novel
+
+
+def merge_summary(prev_summary: str, new_summary: str, max_chars: int) -> str:
+    """
+    기존 summary 뒤에 새 summary의 새로운 문장만 이어 붙입니다.
+    max_chars를 넘으면 가장 오래된 문장부터 제거합니다.
+    """
+    sentences = split_sentences(prev_summary) + _novel_sentences(prev_summary, new_summary)
+    while len(sentences) > 1 and len(" ".join(sentences)) > max_chars:
+        sentences.pop(0)
+    return " ".join(sentences)
+
+
+def merge_divergence(prev_summary: str, prev_entities: List[str], new_summary: str, new_entities: List[str]) -> float:
+    """
+    새 내용이 기존 내용과 얼마나 다른지 (0~1).
+    summary는 새 문장의 길이 비율, entities는 새 엔티티 수의 비율 중 큰 값입니다.
+    """
+    novel_chars = sum(len(sentence) for sentence in _novel_sentences(prev_summary, new_summary))
+    summary_divergence = novel_chars / (len(prev_summary or "") + novel_chars) if novel_chars else 0.0
+
+    prev_keys = {normalize(entity) for entity in prev_entities or []}
+    novel_entities = {normalize(entity) for entity in new_entities or []} - prev_keys - {""}
+    entity_divergence = len(novel_entities) / (len(prev_keys) + len(novel_entities)) if novel_entities else 0.0
+
+    return max(summary_divergence, entity_divergence)
+
+
+def merge_locally(prev_summary: str, prev_entities: List[str], new_summary: str, new_entities: List[str]) -> SummarizedText:
+    return SummarizedText(
+        summary=merge_summary(prev_summary, new_summary, settings.NODE_MERGE_SUMMARY_MAX_CHARS),
+        entities=merge_entities(prev_entities, new_entities, settings.NODE_MERGE_MAX_ENTITIES),
+    )
+
+
+async def merge_node_content(
+    title: str,
+    prev_summary: str,
+    prev_entities: List[str],
+    new_summary: str,
+    new_entities: List[str],
+    mode: str = "auto",
+) -> Tuple[SummarizedText, str]:
+    """
+    노드의 기존 내용과 새 내용을 합쳐 (결과, 사용한 방식)을 리턴.
+    local은 모델 호출 없이 합치고, llm은 update_node 체인을 사용합니다.
+    auto는 새 내용이 NODE_MERGE_LLM_THRESHOLD 이상 다를 때만 llm을 사용합니다.
+    사용한 방식은 llm_telemetry에 기록됩니다.
+    """
+    if mode == "auto":
+        divergence = merge_divergence(prev_summary, prev_entities, new_summary, new_entities)
+        mode = "llm" if divergence >= settings.NODE_MERGE_LLM_THRESHOLD else "local"
+    llm_telemetry.record_node_merge(mode)
+
+    if mode == "local":
+        return merge_locally(prev_summary, prev_entities, new_summary, new_entities), mode
+
+    result = await run_chain("update_node", {
+        "title": title,
+        "prev_summary": prev_summary,
+        "prev_entities": prev_entities,
+        "new_summary": new_summary,
+        "new_entities": new_entities
+    })
+    return result, mode
@@ -0,0 +1,94 @@
+import re
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.core.cache import LRUCache
+from app.schemas.ai import Neo4jCipherQuery
+
+
+# 쿼리 문자열 안의 문자열 리터럴 ('...' 또는 "...")
+STRING_LITERAL_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+
+def _find_binding(value: Any, inputs: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    """
+    쿼리 파라미터 값이 요청 입력 필드 전체(field)이거나 상수(const)인지 찾습니다.
+    찾을 수 없다면 None (해당 쿼리는 템플릿으로 재사용할 수 없음)
+    AI가 summary에서 고른 키워드 목록처럼 입력의 일부를 골라 만든 값은
+    새 입력에서 같은 방식으로 다시 고를 수 없으므로 재사용하지 않습니다.
+    """
+    for field, field_value in inputs.items():
+        if value == field_value:
+            return ("field", field)
+
+    if isinstance(value, (bool, int, float)):
+        return ("const", value)
+
+    return None
+
+
+def _resolve_binding(binding: Tuple[str, Any], inputs: Dict[str, Any]) -> Any:
+    kind, source = binding
+    if kind == "field":
+        return inputs[source]
+    return source
+
+
+class CypherTemplateCache:
+    """
+    실행에 성공한 LLM 생성 Cypher 쿼리를 파라미터화된 템플릿으로 저장하고,
+    같은 (endpoint, label, 입력 형태)의 요청에 새 파라미터로 재사용하는 캐시.
+    입력 형태는 값이 있는 입력 필드 이름이므로, 입력 필드가 고정되어 있고
+    필드 값만 바꿔 끼우면 되는 endpoint(get_related_nodes)에만 사용합니다.
+    자유 형식 질문처럼 값에 따라 쿼리 구조가 달라지는 입력에는 사용할 수 없습니다.
+    """
+
+    def __init__(self, max_size: int):
+        self._templates = LRUCache(max_size)
+
+    @staticmethod
+    def _key(endpoint: str, label: str, inputs: Dict[str, Any]) -> Tuple[str, str, Tuple[str, ...]]:
+        shape = tuple(sorted(field for field, value in inputs.items() if value))
+        return (endpoint, label, shape)
+
+    def lookup(self, endpoint: str, label: str, inputs: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        캐시된 템플릿이 있다면 (query, query_params)를 반환
+        """
+        template = self._templates.get(self._key(endpoint, label, inputs))
+        if template is None:
+            return None
+
+        query, bindings = template
+        query_params = {name: _resolve_binding(binding, inputs) for name, binding in bindings.items()}
+        return query, query_params
+
+    def store(self, endpoint: str, label: str, inputs: Dict[str, Any], cipher_query: Neo4jCipherQuery) -> bool:
+        """
+        실행에 성공한 쿼리를 템플릿으로 저장.
+        쿼리에 입력값이 직접 들어가 있거나 파라미터의 출처를 알 수 없다면 저장하지 않습니다.
+        """
+        if STRING_LITERAL_PATTERN.search(cipher_query.query):
+            return False
+
+        query_params = cipher_query.query_params or {}
+        if not isinstance(query_params, dict):
+            return False
+
+        bindings = {}
+        for name, value in query_params.items():
+            binding = _find_binding(value, inputs)
+            if binding is None:
+                return False
+            bindings[name] = binding
+
+        self._templates.set(self._key(endpoint, label, inputs), (cipher_query.query, bindings))
+        return True
+
+    def invalidate(self, endpoint: str, label: str, inputs: Dict[str, Any]) -> None:
+        self._templates.pop(self._key(endpoint, label, inputs))
+
+    def stats(self) -> Dict[str, int]:
+        return self._templates.stats()
+
+
+cypher_template_cache = CypherTemplateCache(settings.CYPHER_TEMPLATE_CACHE_SIZE)
@@ -2,9 +2,9 @@ from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from langchain.schema import StrOutputParser
 from app.ai.model import claude_llm
-from app.schemas.ai import Neo4jCipherQuery, RawNeo4jCipherQuery
+from app.schemas.ai import Neo4jCipherQuery, RelationChoices
 
-def get_find_related_graph_chain():
+def get_find_related_graph_chain(llm=claude_llm):
     """추출된 의미와 관련된 노드를 찾기 위한 Cypher 쿼리"""
     
     parser = PydanticOutputParser(pydantic_object=Neo4jCipherQuery)
@@ -42,51 +42,50 @@ def get_find_related_graph_chain():
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
     
-    query_chain = prompt | claude_llm | StrOutputParser() | parser
+    query_chain = prompt | llm | StrOutputParser() | parser
     
     return query_chain
 
 
 
 
-def get_create_relation_query_chain():
-    """생성된 노드와, 기존 노드 간의 관계를 생성하기 위한 Cypher 쿼리"""
+def get_relation_classification_chain(llm=claude_llm):
+    """생성된 노드와 기존 노드들 사이의 관계 유형 분류 (관계는 서버에서 고정된 쿼리로 생성)"""
     
-    parser = PydanticOutputParser(pydantic_object=RawNeo4jCipherQuery)
+    parser = PydanticOutputParser(pydantic_object=RelationChoices)
     
     template = """
-    타겟 노드와 연관 노드들 사이의 관계를 생성하는 Neo4j 쿼리를 작성하세요.
+    타겟 노드와 연관 노드들 사이의 관계 유형을 골라주세요.
 
-    주어진 라벨: {label}
     타겟 노드: {target_node}
     연관 노드들: {existing_nodes}
 
     
-    쿼리 작성 시 유의사항:
-    1. 모든 노드는 동일한 label을 가지고 있습니다.
-    2. 타겟 노드와 연관 노드들 간의 관계를 생성합니다.
-    3. 관계 유형은 다음 5가지 중 하나여야 합니다. [(REFERS_TO, REFERENCED_BY), RELATED_TO, (PARENT_OF, CHILD_OF)].
-    4. MERGE 구문을 사용하여 중복 노드/관계 생성을 방지합니다.
+    관계 선택 시 유의사항:
+    1. 관계는 타겟 노드에서 연관 노드 방향입니다. (타겟 노드)-[관계]->(연관 노드)
+    2. 관계 유형은 다음 5가지 중 하나여야 합니다. [(REFERS_TO, REFERENCED_BY), RELATED_TO, (PARENT_OF, CHILD_OF)].
+    3. related_uuid는 연관 노드들의 uuid 중 하나여야 합니다.
+    4. 관계가 없는 연관 노드는 목록에서 제외합니다.
     
 
-    previous_query_error:
-    {previous_query_error}
+    previous_error:
+    {previous_error}
 
     {format_instructions}
     """
     
     prompt = PromptTemplate(
         template=template,
-        input_variables=["label", "target_node", "existing_nodes", "previous_query_error"],
+        input_variables=["target_node", "existing_nodes", "previous_error"],
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
     
-    relationship_chain = prompt | claude_llm | StrOutputParser() | parser
+    relationship_chain = prompt | llm | StrOutputParser() | parser
     
     return relationship_chain
 
 
-def get_search_question_query_chain():
+def get_search_question_query_chain(llm=claude_llm):
     """사용자의 질문과 관련한 노드를 검색하기 위한 Cypher 쿼리"""
     
     parser = PydanticOutputParser(pydantic_object=Neo4jCipherQuery)
@@ -121,6 +120,6 @@ def get_search_question_query_chain():
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
     
-    relationship_chain = prompt | claude_llm | StrOutputParser() | parser
+    relationship_chain = prompt | llm | StrOutputParser() | parser
     
     return relationship_chain
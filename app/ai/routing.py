@@ -0,0 +1,45 @@
+from typing import Dict, NamedTuple, Optional
+from app.ai.model import LARGE_TIER, SMALL_TIER, tier_model
+from app.config import settings
+
+
+class ChainRoute(NamedTuple):
+    tier: str
+    max_tokens: Optional[int]
+    timeout: Optional[float]
+
+    @property
+    def model(self) -> str:
+        return tier_model(self.tier)
+
+
+def parse_chain_routes(spec: str) -> Dict[str, ChainRoute]:
+    """
+    "체인이름=tier[:max_tokens[:timeout]]"을 쉼표로 구분한 설정을 파싱.
+    예: "find_related_graph=small:512:20,answer_with_nodes=large"
+    """
+    routes = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        name, _, value = entry.partition("=")
+        tier, max_tokens, timeout = (value.split(":") + ["", ""])[:3]
+        tier = tier.strip() or LARGE_TIER
+        if tier not in (LARGE_TIER, SMALL_TIER):
+            raise ValueError(f"알 수 없는 모델 tier: {entry}")
+        routes[name.strip()] = ChainRoute(
+            tier=tier,
+            max_tokens=int(max_tokens) if max_tokens.strip() else None,
+            timeout=float(timeout) if timeout.strip() else None,
+        )
+    return routes
+
+
+chain_routes = parse_chain_routes(settings.LLM_CHAIN_ROUTES)
+
+
+def get_chain_route(name: str) -> ChainRoute:
+    """
+    체인에 설정된 모델 tier, max_tokens, timeout. 설정이 없는 체인은 large tier를 사용합니다.
+    """
+    return chain_routes.get(name) or ChainRoute(LARGE_TIER, None, None)
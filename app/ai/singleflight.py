@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import json
+import re
+from typing import Any, Awaitable, Callable, Dict
+
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return WHITESPACE_PATTERN.sub(" ", value).strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def singleflight_key(*parts: Any) -> str:
+    """
+    공백 차이를 무시한 입력값들의 해시. bytes는 그대로 해시합니다.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, (bytes, bytearray)):
+            digest.update(part)
+        else:
+            digest.update(json.dumps(_normalize(part), ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나로 합칩니다.
+    처음 들어온 호출(leader)만 실제로 실행되고, 실행 중에 들어온 같은 키의 호출(follower)은
+    leader의 결과(또는 예외)를 함께 기다립니다.
+    leader 요청이 취소되어도 실행은 계속되어 follower들은 결과를 받을 수 있습니다.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def _done(self, key: str, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 기다리는 요청이 모두 취소된 경우에도 예외가 처리되지 않았다는 경고가 나오지 않도록 합니다.
+            task.exception()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+            self.leaders += 1
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+
+ai_singleflight = SingleFlight()
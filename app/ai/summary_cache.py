@@ -0,0 +1,107 @@
+import hashlib
+import json
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+from app.ai.chains import run_chain
+from app.ai.routing import get_chain_route
+from app.ai.singleflight import ai_singleflight, singleflight_key
+from app.ai.text_processing import TEXT_EXTRACTION_PROMPT_VERSION
+from app.config import settings
+from app.core.cache import LRUCache
+from app.db.base import SessionLocal
+from app.db.crud.summary_cache import get_summary_cache, save_summary_cache
+from app.schemas.ai import SummarizedText
+
+
+def summary_cache_key(title: str, text: str) -> str:
+    """
+    (title, text, 프롬프트 버전, 모델)의 해시
+    """
+    payload = json.dumps(
+        [title, text, TEXT_EXTRACTION_PROMPT_VERSION, get_chain_route("text_extraction").model],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """
+    /ai/summarize 결과 캐시.
+    워커별 메모리 LRU를 먼저 조회하고, 없으면 SQL db에 저장된 결과를 조회합니다.
+    db에 저장된 결과는 재시작 후에도 유지되며 모든 워커가 공유합니다.
+    """
+
+    def __init__(self, max_size: int):
+        self._memory = LRUCache(max_size)
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.db_errors = 0
+
+    def get(self, db: Session, key: str) -> Optional[SummarizedText]:
+        result = self._memory.get(key)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        try:
+            cached = get_summary_cache(db, key)
+        except Exception as e:
+            print(f"요약 캐시 조회 중 오류 발생: {str(e)}")
+            db.rollback()
+            self.db_errors += 1
+            cached = None
+
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        result = SummarizedText(summary=cached.summary, entities=cached.entities)
+        self._memory.set(key, result)
+        return result
+
+    def set(self, db: Session, key: str, result: SummarizedText) -> None:
+        self._memory.set(key, result)
+        try:
+            save_summary_cache(db, key, result.summary, result.entities)
+        except Exception as e:
+            print(f"요약 캐시 저장 중 오류 발생: {str(e)}")
+            db.rollback()
+            self.db_errors += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "memory_size": len(self._memory),
+            "memory_max_size": self._memory.max_size,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "db_errors": self.db_errors,
+        }
+
+
+summary_cache = SummaryCache(settings.SUMMARY_CACHE_SIZE)
+
+
+async def summarize_with_cache(db: Session, title: str, text: str) -> SummarizedText:
+    """
+    캐시된 요약 결과가 있으면 리턴하고, 없으면 추출 체인을 실행한 뒤 결과를 캐시합니다.
+    같은 내용으로 동시에 들어온 요청들은 추출 체인을 한 번만 실행합니다.
+    """
+    cache_key = summary_cache_key(title, text)
+    cached_result = summary_cache.get(db, cache_key)
+    if cached_result is not None:
+        return cached_result
+
+    async def extract():
+        extraction_result = await run_chain("text_extraction", {"text": text, "title": title})
+        # 공유된 실행은 leader 요청이 끝난 뒤에도 계속될 수 있으므로 요청의 db 세션 대신 별도 세션을 사용합니다.
+        extract_db = SessionLocal()
+        try:
+            summary_cache.set(extract_db, cache_key, extraction_result)
+        finally:
+            extract_db.close()
+        return extraction_result
+
+    return await ai_singleflight.do(singleflight_key("summarize", title, text), extract)
@@ -0,0 +1,201 @@
+import asyncio
+import bisect
+import json
+import time
+from typing import Any, Dict, List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.exceptions import OutputParserException
+from app.ai.context_builder import estimate_tokens
+from app.config import settings
+
+
+# 지연 시간 히스토그램 버킷 상한 (ms)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+
+class TokenUsageCallback(BaseCallbackHandler):
+    """
+    체인 실행 한 번 동안 모델 호출들의 토큰 사용량을 합산하는 콜백.
+    응답 전에 취소된 호출은 사용량을 받을 수 없으므로 프롬프트로 입력 토큰 수를 추정해 둡니다.
+    """
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.llm_calls = 0
+        self.estimated_prompt_tokens = 0
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self.estimated_prompt_tokens += sum(
+            estimate_tokens(str(message.content)) for batch in messages for message in batch
+        )
+
+    def on_llm_end(self, response, **kwargs: Any) -> None:
+        self.llm_calls += 1
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    self.input_tokens += usage.get("input_tokens", 0)
+                    self.output_tokens += usage.get("output_tokens", 0)
+
+
+class ChainMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cancelled = 0
+        self.parse_failures = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.estimated_input_tokens = 0
+        self.output_tokens = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def latency_percentile(self, p: float) -> Optional[float]:
+        """
+        히스토그램으로 추정한 백분위수 (해당 버킷의 상한, 최대값을 넘지 않음)
+        """
+        if self.calls == 0:
+            return None
+        rank = p / 100 * self.calls
+        count = 0
+        for i, bucket_count in enumerate(self.latency_buckets):
+            count += bucket_count
+            if count >= rank:
+                bound = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else self.latency_max_ms
+                return round(min(bound, self.latency_max_ms), 2)
+        return round(self.latency_max_ms, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "parse_failures": self.parse_failures,
+            "parse_failure_rate": round(self.parse_failures / self.calls, 4) if self.calls else 0.0,
+            "retries": self.retries,
+            "fallbacks": self.fallbacks,
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            # input_tokens 중 응답 전에 취소되어 프롬프트로 추정한 토큰 수
+            "estimated_input_tokens": self.estimated_input_tokens,
+            "output_tokens": self.output_tokens,
+            "latency_ms": {
+                "avg": round(self.latency_sum_ms / self.calls, 2) if self.calls else None,
+                "p50": self.latency_percentile(50),
+                "p95": self.latency_percentile(95),
+                "p99": self.latency_percentile(99),
+                "max": round(self.latency_max_ms, 2),
+                "buckets": {
+                    **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.latency_buckets)},
+                    "inf": self.latency_buckets[-1],
+                },
+            },
+        }
+
+
+class LLMTelemetry:
+    """
+    체인 이름별 호출 수, 지연 시간, 토큰 사용량, 재시도, 출력 파싱 실패와 노드 병합 방식별 횟수 집계.
+    LLM_TELEMETRY_LOG가 켜져 있으면 호출마다 JSON 한 줄을 출력합니다.
+    """
+
+    def __init__(self, log_enabled: bool = False):
+        self.log_enabled = log_enabled
+        self._chains: Dict[str, ChainMetrics] = {}
+        self._node_merges: Dict[str, int] = {}
+
+    def _metrics(self, name: str) -> ChainMetrics:
+        metrics = self._chains.get(name)
+        if metrics is None:
+            metrics = self._chains[name] = ChainMetrics()
+        return metrics
+
+    def callbacks(self) -> List[TokenUsageCallback]:
+        return [TokenUsageCallback()]
+
+    def record_call(
+        self,
+        name: str,
+        start: float,
+        callbacks: List[TokenUsageCallback],
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        start는 time.perf_counter()로 잰 체인 실행 시작 시각.
+        취소된 호출(hedging에서 진 후보, 연결이 끊긴 요청)도 기록하며,
+        응답을 받기 전에 취소되었다면 추정한 입력 토큰 수를 input_tokens에 더합니다.
+        """
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        usage = callbacks[0]
+        parse_failure = isinstance(error, OutputParserException)
+        cancelled = isinstance(error, (asyncio.CancelledError, GeneratorExit))
+        estimated_input_tokens = usage.estimated_prompt_tokens if cancelled and usage.llm_calls == 0 else 0
+
+        metrics = self._metrics(name)
+        metrics.calls += 1
+        metrics.errors += error is not None and not cancelled
+        metrics.cancelled += cancelled
+        metrics.parse_failures += parse_failure
+        metrics.llm_calls += usage.llm_calls
+        metrics.input_tokens += usage.input_tokens + estimated_input_tokens
+        metrics.estimated_input_tokens += estimated_input_tokens
+        metrics.output_tokens += usage.output_tokens
+        metrics.latency_sum_ms += elapsed_ms
+        metrics.latency_max_ms = max(metrics.latency_max_ms, elapsed_ms)
+        metrics.latency_buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+        if self.log_enabled:
+            print(json.dumps({
+                "event": "llm_chain",
+                "chain": name,
+                "latency_ms": round(elapsed_ms, 2),
+                "input_tokens": usage.input_tokens + estimated_input_tokens,
+                "estimated_input_tokens": estimated_input_tokens,
+                "output_tokens": usage.output_tokens,
+                "llm_calls": usage.llm_calls,
+                "error": type(error).__name__ if error is not None and not cancelled else None,
+                "cancelled": cancelled,
+                "parse_failure": parse_failure,
+            }, ensure_ascii=False))
+
+    def record_retry(self, name: str) -> None:
+        """
+        이전 실행 결과가 잘못되어 체인을 다시 실행할 때 호출
+        """
+        self._metrics(name).retries += 1
+        if self.log_enabled:
+            print(json.dumps({"event": "llm_chain_retry", "chain": name}))
+
+    def record_fallback(self, name: str) -> None:
+        """
+        small tier 출력 파싱에 실패하여 large tier로 다시 실행할 때 호출
+        """
+        self._metrics(name).fallbacks += 1
+        if self.log_enabled:
+            print(json.dumps({"event": "llm_chain_fallback", "chain": name}))
+
+    def record_node_merge(self, mode: str) -> None:
+        """
+        노드 업데이트 시 내용을 합친 방식(local 또는 llm)
+        """
+        self._node_merges[mode] = self._node_merges.get(mode, 0) + 1
+        if self.log_enabled:
+            print(json.dumps({"event": "node_merge", "mode": mode}))
+
+    def stats(self) -> Dict[str, Any]:
+        total_tokens = sum(m.input_tokens + m.output_tokens for m in self._chains.values())
+        chains = {}
+        for name, metrics in sorted(self._chains.items()):
+            chains[name] = metrics.to_dict()
+            tokens = metrics.input_tokens + metrics.output_tokens
+            chains[name]["token_share"] = round(tokens / total_tokens, 4) if total_tokens else 0.0
+        return {"total_tokens": total_tokens, "chains": chains, "node_merges": dict(self._node_merges)}
+
+
+llm_telemetry = LLMTelemetry(settings.LLM_TELEMETRY_LOG)
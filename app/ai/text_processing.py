@@ -5,8 +5,11 @@ from app.ai.model import claude_llm
 from app.schemas.ai import AnswerModel, SummarizedText
 
 
+# 추출 프롬프트를 수정하면 올려서 이전 프롬프트로 캐시된 요약 결과를 무효화합니다.
+TEXT_EXTRACTION_PROMPT_VERSION = "1"
 
-def get_text_extraction_chain():
+
+def get_text_extraction_chain(llm=claude_llm):
     """메모에서 중요한 의미를 추출"""
 
     parser = PydanticOutputParser(pydantic_object=SummarizedText)
@@ -30,12 +33,12 @@ def get_text_extraction_chain():
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
     
-    extraction_chain = prompt | claude_llm | StrOutputParser() | parser
+    extraction_chain = prompt | llm | StrOutputParser() | parser
     
     return extraction_chain
 
 
-def get_update_node_chain():
+def get_update_node_chain(llm=claude_llm):
     """이미 존재하는 노드와 새로운 데이터 업데이트"""
 
     parser = PydanticOutputParser(pydantic_object=SummarizedText)
@@ -66,14 +69,14 @@ def get_update_node_chain():
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
 
-    extraction_chain = prompt | claude_llm | StrOutputParser() | parser
+    extraction_chain = prompt | llm | StrOutputParser() | parser
     
     return extraction_chain
 
 
 
 
-def get_answer_with_nodes_query_chain():
+def get_answer_with_nodes_query_chain(llm=claude_llm):
     """검색된 노드를 기반으로 사용자의 질문에 답변하는 쿼리"""
 
     parser = PydanticOutputParser(pydantic_object=AnswerModel)
@@ -93,10 +96,35 @@ def get_answer_with_nodes_query_chain():
 
     prompt = PromptTemplate(
         template=template,
-        input_variables=["title", "prev_summary", "prev_entities", "new_summary", "new_entities"],
+        input_variables=["question", "nodes"],
         partial_variables={"format_instructions": parser.get_format_instructions()}
     )
 
-    extraction_chain = prompt | claude_llm | StrOutputParser() | parser
+    extraction_chain = prompt | llm | StrOutputParser() | parser
     
     return extraction_chain
+
+
+def get_answer_with_nodes_stream_chain(llm=claude_llm):
+    """검색된 노드를 기반으로 사용자의 질문에 답변하는 스트리밍 체인 (답변 텍스트를 토큰 단위로 출력)"""
+
+    template = """
+    사용자의 질문에 답변해주세요.
+    주어진 노드들의 내용을 기반으로 답변을 작성해야 합니다.
+    주어진 노드가 존재하지 않을 경우, 관련된 노드를 찾을 수 없었다고 명시해주세요.
+    답변 본문만 작성하고, JSON 등 다른 형식으로 감싸지 마세요.
+
+    사용자의 질문:
+    {question}
+    주어진 노드들:
+    {nodes}
+    """
+
+    prompt = PromptTemplate(
+        template=template,
+        input_variables=["question", "nodes"],
+    )
+
+    answer_chain = prompt | llm | StrOutputParser()
+    
+    return answer_chain
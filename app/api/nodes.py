@@ -1,14 +1,14 @@
 from fastapi import HTTPException, Depends, APIRouter
 from app.db.session import get_neo4j
-from neo4j import Session
+from neo4j import AsyncSession
 
 from app.db.util.utilities import convert_neo4j_datetime
 
 router = APIRouter(prefix="/test-nodes", tags=["test-nodes"])
 
 @router.get("/")
-def get_all_nodes(
-    neo4j: Session = Depends(get_neo4j),
+async def get_all_nodes(
+    neo4j: AsyncSession = Depends(get_neo4j),
 ):
     query = """
     MATCH (n)
@@ -16,9 +16,9 @@ def get_all_nodes(
     LIMIT 100
     """
     
-    result = neo4j.run(query)
+    result = await neo4j.run(query)
     nodes = []
-    for record in result:
+    async for record in result:
         node = record["n"]
         node_labels = record["labels"]
         
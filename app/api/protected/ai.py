@@ -1,20 +1,37 @@
+import asyncio
 import base64
 import io
+import json
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from neo4j import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Any, List
-from app.ai.image_process import  get_image_description_chain
-from app.ai.query_generation import get_create_relation_query_chain, get_find_related_graph_chain, get_search_question_query_chain
-from app.ai.text_processing import get_answer_with_nodes_query_chain, get_text_extraction_chain
-from app.db.util.utilities import compress_image_to_base64, convert_neo4j_datetime
-from app.schemas.ai import CreateNodeRelationRequest, CreateNodeRelationResponse, CreateNodeRequest, GetRelatedNodesRequest, QueryRequest, SummarizedText, TextProcessRequest
+from app.ai.chains import run_chain, stream_chain
+from app.ai.context_builder import build_answer_context
+from app.ai.cypher_validation import validate_cypher
+from app.ai.embedding import embed_node, embed_text
+from app.ai.hedging import generate_and_execute, hedge_stats
+from app.ai.image_cache import image_description_cache
+from app.ai.ingest import create_node_relations, ingest_workers
+from app.ai.query_cache import cypher_template_cache
+from app.ai.singleflight import ai_singleflight, singleflight_key
+from app.ai.summary_cache import summarize_with_cache, summary_cache, summary_cache_key
+from app.ai.telemetry import llm_telemetry
+from app.config import settings
+from app.db.base import driver
+from app.db.crud.ingest_job import create_ingest_job, get_ingest_job
+from app.db.graph import run_read_query, search_graph_nodes
+from app.db.node_index import node_index
+from app.db.util.utilities import compress_image_to_base64, compute_perceptual_hash, convert_neo4j_datetime, node_to_dict, read_upload_limited
+from app.schemas.ai import BatchSummarizeResponse, BatchTextProcessRequest, CreateNodeRelationRequest, CreateNodeRelationResponse, GetRelatedNodesRequest, IngestJobResponse, IngestRequest, QueryRequest, SummarizedText, TextProcessRequest
 from app.schemas.note import *
 from app.db.session import get_neo4j
 from app.db.session import get_db
 from app.dependencies import get_current_user
 from app.schemas.auth import TokenData
-from app.core.exceptions import NotFound
+from app.core.exceptions import BadRequest, NotFound, PayloadTooLarge
 from PIL import Image
 
 
@@ -27,22 +44,45 @@ async def analyze_image(
     token_data: TokenData = Depends(get_current_user),
 ) -> Any:
     """
-    image에서 유의미한 정보 추출하여 리턴하는 api
+    image에서 유의미한 정보 추출하여 리턴하는 api.
+    같은 label로 거의 같은 이미지를 분석한 적이 있다면 캐시된 설명을 리턴합니다.
     """
     try:
-        image_content = await image.read()
-        image_data = await compress_image_to_base64(image_content)
-        description_chain = get_image_description_chain()
-        
-        result = description_chain({
-            "topic": label,
-            "image_data": image_data
-        })
+        image_content = await read_upload_limited(image, settings.IMAGE_MAX_UPLOAD_BYTES)
+
+        image_hash = await compute_perceptual_hash(image_content)
+        cached_analysis = image_description_cache.get(label, image_hash)
+        if cached_analysis is not None:
+            return JSONResponse(content={**cached_analysis, "cached": True})
+
+        async def describe_image():
+            image_data = await compress_image_to_base64(image_content)
+            result = await run_chain("image_description", {
+                "topic": label,
+                "image_data": image_data
+            })
+            # 캐시 적중 시에도 같은 형태로 응답하도록 인코딩 정보를 설명과 함께 저장합니다.
+            analysis = {
+                "description": result.description,
+                "image": {
+                    "width": image_data["width"],
+                    "height": image_data["height"],
+                    "mime_type": image_data["mime_type"],
+                    "output_bytes": image_data["output_bytes"],
+                    "encode_ms": image_data["encode_ms"],
+                },
+            }
+            image_description_cache.set(label, image_hash, analysis)
+            return analysis
+
+        analysis = await ai_singleflight.do(singleflight_key("analyze_image", label, image_content), describe_image)
         
-        return JSONResponse(content={
-            "description": result.description
-        })
+        return JSONResponse(content={**analysis, "cached": False})
         
+    except HTTPException:
+        raise
+    except Image.DecompressionBombError:
+        raise PayloadTooLarge(f"이미지는 최대 {settings.IMAGE_MAX_PIXELS} 픽셀까지 분석할 수 있습니다.")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"서버 오류: {str(e)}")
 
@@ -51,14 +91,15 @@ async def analyze_image(
 @router.post("/summarize", response_model=SummarizedText)
 async def summarize_text(
     request: TextProcessRequest,
+    db: Session = Depends(get_db),
     token_data: TokenData = Depends(get_current_user),
 ) -> Any:
     """
-    note에서 유의미한 정보 추출하여 리턴하는 api
+    note에서 유의미한 정보 추출하여 리턴하는 api.
+    같은 내용의 note는 캐시된 결과를 바로 리턴합니다.
     """
-    chain = get_text_extraction_chain()
     try:
-        extraction_result = chain.invoke({"text": request.text,"title":request.title})
+        extraction_result = await summarize_with_cache(db, request.title, request.text)
         
         return extraction_result
 
@@ -67,61 +108,161 @@ async def summarize_text(
         raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
 
 
+@router.post("/summarize/batch", response_model=BatchSummarizeResponse)
+async def summarize_text_batch(
+    request: BatchTextProcessRequest,
+    db: Session = Depends(get_db),
+    token_data: TokenData = Depends(get_current_user),
+) -> Any:
+    """
+    여러 note에서 유의미한 정보를 한 번에 추출하여 리턴하는 api.
+    동시에 실행되는 추출 수는 SUMMARIZE_BATCH_CONCURRENCY로 제한되며,
+    배치 안에서 내용이 같은 note는 한 번만 처리합니다.
+    """
+    if len(request.items) > settings.SUMMARIZE_BATCH_MAX_ITEMS:
+        raise BadRequest(f"한 번에 최대 {settings.SUMMARIZE_BATCH_MAX_ITEMS}개까지 요청할 수 있습니다.")
+
+    semaphore = asyncio.Semaphore(settings.SUMMARIZE_BATCH_CONCURRENCY)
+    keys = [summary_cache_key(item.title, item.text) for item in request.items]
+    unique_items = {}
+    for key, item in zip(keys, request.items):
+        unique_items.setdefault(key, item)
+
+    async def summarize_item(key: str, item: TextProcessRequest):
+        async with semaphore:
+            try:
+                return key, await summarize_with_cache(db, item.title, item.text), None
+            except Exception as e:
+                print(f"처리 중 오류 발생: {str(e)}")
+                return key, None, f"처리 중 오류 발생: {str(e)}"
+
+    outcomes = await asyncio.gather(*(summarize_item(key, item) for key, item in unique_items.items()))
+    results_by_key = {key: (result, error) for key, result, error in outcomes}
+
+    return {
+        "results": [
+            {"index": index, "result": results_by_key[key][0], "error": results_by_key[key][1]}
+            for index, key in enumerate(keys)
+        ]
+    }
+
+
 @router.post("/get_related_nodes")
 async def get_related_nodes(
     request: GetRelatedNodesRequest,
-    neo4j: Session = Depends(get_neo4j),
+    neo4j: AsyncSession = Depends(get_neo4j),
     token_data: TokenData = Depends(get_current_user),
 ) -> Any:
     """
-    요약 정보로부터 cipher query를 생성하고,
-    db로부터 노드와 relation을 가져와서 리턴하는 api
+    요약 정보로부터 관련된 노드를 찾아서 리턴하는 api.
+    기본(index 모드)은 로컬 역색인으로, vector 모드는 임베딩 유사도로 검색하고,
+    llm 모드에서는 cipher query를 생성하여 db로부터 노드를 가져옵니다.
+    """
+    if request.mode == "vector":
+        nodes = await node_index.vector_search(
+            neo4j,
+            request.label,
+            embed_node(request.node.title, request.node.summary, request.node.entities),
+            top_k=request.top_k or settings.RELATED_NODES_TOP_K,
+            exclude_uuid=request.node.uuid,
+        )
+        return {"nodes": nodes}
+
+    if request.mode == "index":
+        nodes = await node_index.search(
+            neo4j,
+            request.label,
+            title=request.node.title,
+            summary=request.node.summary,
+            entities=request.node.entities,
+            top_k=request.top_k or settings.RELATED_NODES_TOP_K,
+            exclude_uuid=request.node.uuid,
+        )
+        return {"nodes": nodes}
+
+    related_nodes_key = singleflight_key(
+        "get_related_nodes", request.label, request.node.title, request.node.summary, request.node.entities
+    )
+
+    async def find_related_nodes_shared():
+        # 공유된 실행은 leader 요청이 끝난 뒤에도 계속될 수 있으므로 요청의 세션 대신 별도 세션을 사용합니다.
+        async with driver.session() as session:
+            return await find_related_nodes_with_llm(request, session)
+
+    return await ai_singleflight.do(related_nodes_key, find_related_nodes_shared)
+
+
+async def find_related_nodes_with_llm(request: GetRelatedNodesRequest, neo4j: AsyncSession) -> Any:
+    """
+    AI가 생성한 cipher query로 관련 노드를 검색
     """
-    chain = get_find_related_graph_chain()
     max_retries = 3
     retry_count = 0
     previous_query_error = ""
 
-    while retry_count < max_retries:
-        try:
-            cipher_query = chain.invoke({
+    query_inputs = {
+        "title": request.node.title,
+        "summary": request.node.summary,
+        "entities": request.node.entities,
+    }
+    cached_query = cypher_template_cache.lookup("get_related_nodes", request.label, query_inputs)
+
+    async def find_nodes(query, query_params):
+        await validate_cypher(neo4j, query, query_params, request.label)
+        records = await run_read_query(neo4j, query, query_params)
+        nodes = []
+        unique_uuids = set()
+        for record in records:
+            node = record["n"]
+            node_data = dict(node.items())
+            uuid = node_data.get("uuid", "")
+
+            if uuid in unique_uuids:
+                continue
+
+            unique_uuids.add(uuid)
+
+            nodes.append({
+                "uuid": uuid, 
                 "label": request.label,
-                "title": request.node.title,
-                "summary": request.node.summary,
-                "entities": request.node.entities,
-                "previous_query_error": previous_query_error,
+                "title": node_data.get("title", ""),
+                "summary": node_data.get("summary", []),
+                "entities": node_data.get("entities", []),
+                "createdAt": convert_neo4j_datetime(node_data.get("createdAt", "")),
+                "updatedAt": convert_neo4j_datetime(node_data.get("updatedAt", ""))
             })
-            
-            result = neo4j.run(cipher_query.query, cipher_query.query_params)
-            nodes = []
-            unique_uuids = set()
-            for record in result:
-                node = record["n"]
-                node_data = dict(node.items())
-                uuid = node_data.get("uuid", "")
-
-                if uuid in unique_uuids:
-                    continue
-
-                unique_uuids.add(uuid)
-
-                nodes.append({
-                    "uuid": uuid, 
-                    "label": request.label,
-                    "title": node_data.get("title", ""),
-                    "summary": node_data.get("summary", []),
-                    "entities": node_data.get("entities", []),
-                    "createdAt": convert_neo4j_datetime(node_data.get("createdAt", "")),
-                    "updatedAt": convert_neo4j_datetime(node_data.get("updatedAt", ""))
-                })
+        return nodes
+
+    while retry_count < max_retries:
+        try:
+            if cached_query is not None:
+                nodes = await find_nodes(*cached_query)
+            else:
+                cipher_query, nodes = await generate_and_execute(
+                    "find_related_graph",
+                    {
+                        "label": request.label,
+                        **query_inputs,
+                        "previous_query_error": previous_query_error,
+                    },
+                    lambda candidate: find_nodes(candidate.query, candidate.query_params),
+                )
+                cypher_template_cache.store("get_related_nodes", request.label, query_inputs, cipher_query)
             return {"nodes": nodes}
         
         except Exception as e:
+            if cached_query is not None:
+                print(f"캐시된 쿼리 실행 중 오류 발생, AI에게 쿼리를 요청합니다: {str(e)}")
+                cypher_template_cache.invalidate("get_related_nodes", request.label, query_inputs)
+                cached_query = None
+                continue
+
             print(f"쿼리 실행 중 오류 발생: {str(e)}")
             previous_query_error = str(e)
             retry_count += 1
             if retry_count < max_retries:
                 print(f"AI에게 수정된 쿼리를 요청합니다. 재시도 횟수: {retry_count}")
+                llm_telemetry.record_retry("find_related_graph")
             else:
                 return {"nodes": []}
     
@@ -129,126 +270,226 @@ async def get_related_nodes(
 @router.post("/create_node_relation", response_model=CreateNodeRelationResponse)
 async def create_node_relation(
     node_data: CreateNodeRelationRequest,
-    neo4j: Session = Depends(get_neo4j),
+    neo4j: AsyncSession = Depends(get_neo4j),
     token_data: TokenData = Depends(get_current_user),
 ) -> Any:
     """
     node와 관련된 노드들을 받아서 relation을 생성.
     """
-    chain = get_create_relation_query_chain()
+    try:
+        relations = await create_node_relations(neo4j, node_data.label, node_data.node, node_data.related_nodes)
+        return {"relations": relations}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
+
+
+@router.post("/ingest", response_model=IngestJobResponse, status_code=202)
+async def ingest_note(
+    request: IngestRequest,
+    db: Session = Depends(get_db),
+    token_data: TokenData = Depends(get_current_user),
+) -> Any:
+    """
+    note를 요약하고, 노드를 생성하고, 관련 노드를 찾아 relation을 생성하는 과정을
+    백그라운드 job으로 등록하고 job id를 바로 리턴하는 api.
+    진행 상태와 결과는 GET /ai/ingest/{job_id}로 조회합니다.
+    """
+    job = create_ingest_job(db, token_data.uid, request.label, request.title, request.text)
+    ingest_workers.notify()
+    return job
+
+
+@router.get("/ingest/{job_id}", response_model=IngestJobResponse)
+async def get_ingest_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+    token_data: TokenData = Depends(get_current_user),
+) -> Any:
+    """
+    ingest job의 상태와 결과 조회
+    """
+    job = get_ingest_job(db, job_id, token_data.uid)
+    if not job:
+        raise NotFound("Ingest job not found")
+    return job
+
+
+async def retrieve_question_nodes(request: QueryRequest, neo4j: AsyncSession) -> List[dict]:
+    """
+    질문과 관련된 노드들을 검색.
+    vector 모드는 임베딩 유사도로, fulltext 모드는 full-text 인덱스로,
+    llm 모드는 AI가 생성한 cipher query로 검색합니다.
+    """
+    if request.mode == "vector":
+        return await node_index.vector_search(
+            neo4j,
+            request.label,
+            embed_text(request.question),
+            top_k=request.top_k or settings.RELATED_NODES_TOP_K,
+        )
+
+    if request.mode == "fulltext":
+        return await search_graph_nodes(
+            neo4j,
+            request.label,
+            request.question,
+            skip=0,
+            limit=request.top_k or settings.RELATED_NODES_TOP_K,
+            prefix=False,
+        )
+
     max_retries = 3
     retry_count = 0
     previous_query_error = ""
 
-    while retry_count < max_retries:
+    async def find_nodes(query, query_params):
+        await validate_cypher(neo4j, query, query_params, request.label)
+        records = await run_read_query(neo4j, query, query_params)
+        return [node_to_dict(record["n"], request.label) for record in records]
+
+    # 질문마다 필요한 쿼리 구조가 다르므로 이 경로의 쿼리는 템플릿으로 캐시하지 않습니다.
+    while True:
         try:
-            cipher_query = chain.invoke({
-                "label": node_data.label,
-                "target_node": node_data.node,
-                "existing_nodes": node_data.related_nodes,
-                "previous_query_error": previous_query_error,
-            })
-            result = neo4j.run(cipher_query.query)
-            if not result:
-                raise NotFound("관계 생성 실패")
-            
-            get_relation_query = f"""
-                MATCH (target_node:{node_data.label} {{uuid: $target_uuid}})
-                MATCH (related_node:{node_data.label})
-                WHERE related_node.uuid IN $related_uuids_list
-                MATCH (target_node)-[relation]-(related_node)
-                RETURN target_node, related_node, relation
-            """
-
-            related_uuids_list = [node.uuid for node in node_data.related_nodes]
-            result = neo4j.run(get_relation_query, {
-                "target_uuid": node_data.node.uuid,
-                "related_uuids_list": related_uuids_list
-            })
-            
-            relations = []
-            for record in result:
-                relation = record["relation"]
-                relations.append({
-                    "type": relation.type,
-                    "properties": dict(relation.items()),
-                    "source": record["target_node"].get("uuid"),
-                    "target": record["related_node"].get("uuid")
-                })
-            
-            return {"relations": relations}
-
-            
+            cipher_query, referred_nodes = await generate_and_execute(
+                "search_question_query",
+                {
+                    "label": request.label,
+                    "question": request.question,
+                    "previous_query_error": previous_query_error,
+                },
+                lambda candidate: find_nodes(candidate.query, candidate.query_params),
+            )
+            print(cipher_query)
+            return referred_nodes
+        
         except Exception as e:
             print(f"쿼리 실행 중 오류 발생: {str(e)}")
             previous_query_error = str(e)
             retry_count += 1
-            if retry_count < max_retries:
-                print(f"AI에게 수정된 쿼리를 요청합니다. 재시도 횟수: {retry_count}")
-            else:
-                raise HTTPException(status_code=500, detail=f"처리 중 오류 발생: {str(e)}")
-            
+            if retry_count >= max_retries:
+                raise
+            print(f"AI에게 수정된 쿼리를 요청합니다. 재시도 횟수: {retry_count}")
+            llm_telemetry.record_retry("search_question_query")
+
 
+def answer_context(question: str, nodes: List[dict]) -> dict:
+    """
+    답변 체인에 전달할 노드들을 토큰 예산에 맞게 고릅니다.
+    """
+    return build_answer_context(
+        question,
+        nodes,
+        token_budget=settings.QUERY_CONTEXT_TOKEN_BUDGET,
+        dedup_threshold=settings.QUERY_CONTEXT_DEDUP_THRESHOLD,
+    )
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(jsonable_encoder(data), ensure_ascii=False)}\n\n"
 
 
 @router.post("/query")
-async def get_related_nodes(
+async def query_graph(
     request: QueryRequest,
-    neo4j: Session = Depends(get_neo4j),
+    neo4j: AsyncSession = Depends(get_neo4j),
     token_data: TokenData = Depends(get_current_user),
 ) -> Any:
     """
-    질문을 분석해서 graph db를 검색하고, 그에 대한 답변을 하는 api
+    질문을 분석해서 graph db를 검색하고, 그에 대한 답변을 하는 api.
+    기본(vector 모드)은 임베딩 유사도로 노드를 검색하고,
+    fulltext 모드는 full-text 인덱스로, llm 모드에서는 cipher query를 생성하여 검색합니다.
     """
-    chain = get_search_question_query_chain()
-    question_chain = get_answer_with_nodes_query_chain()
-    max_retries = 3
-    retry_count = 0
-    previous_query_error = ""
+    try:
+        referred_nodes = await retrieve_question_nodes(request, neo4j)
+        context = answer_context(request.question, referred_nodes)
+        answer = await run_chain("answer_with_nodes", {
+            "question": request.question,
+            "nodes": context["nodes"],
+        })
+        
+        return {
+            "referred_nodes": referred_nodes,
+            "answer": answer.answer,
+            "included_nodes": context["included_nodes"],
+            "dropped_nodes": context["dropped_nodes"],
+        }
+
+    except Exception as e:
+        print(f"질문 처리 중 오류 발생: {str(e)}")
+        return {"nodes": [], "answer": "질문 처리 중 에러가 발생했습니다."}
+
+
+@router.post("/query/stream")
+async def query_graph_stream(
+    request: QueryRequest,
+    neo4j: AsyncSession = Depends(get_neo4j),
+    token_data: TokenData = Depends(get_current_user),
+) -> Any:
+    """
+    /ai/query의 Server-Sent Events 스트리밍 버전.
+    검색이 끝나면 nodes 이벤트로 referred_nodes를 먼저 보내고,
+    이후 답변을 token 이벤트로 생성되는 대로 보낸 뒤 done 이벤트로 종료합니다.
+    """
+    try:
+        referred_nodes = await retrieve_question_nodes(request, neo4j)
+        retrieval_error = None
+    except Exception as e:
+        print(f"질문 처리 중 오류 발생: {str(e)}")
+        retrieval_error = str(e)
+
+    async def event_stream():
+        if retrieval_error is not None:
+            yield sse_event("error", {"detail": "질문 처리 중 에러가 발생했습니다."})
+            return
+
+        context = answer_context(request.question, referred_nodes)
+        yield sse_event("nodes", {
+            "referred_nodes": referred_nodes,
+            "included_nodes": context["included_nodes"],
+            "dropped_nodes": context["dropped_nodes"],
+        })
 
-    while retry_count < max_retries:
         try:
-            cipher_query = chain.invoke({
-                "label": request.label,
-                "question": request.question,
-                "previous_query_error": previous_query_error,
-            })
-            print(cipher_query)
-            result = neo4j.run(cipher_query.query, cipher_query.query_params)
-            referred_nodes = []
-            referred_nodes_for_answer = []
-
-            for record in result:
-                node = record["n"]
-                node_data = dict(node.items())
-                
-                referred_nodes.append({
-                    "uuid": node_data.get("uuid", ""), 
-                    "label": request.label,
-                    "title": node_data.get("title", ""),
-                    "summary": node_data.get("summary", []),
-                    "entities": node_data.get("entities", []),
-                    "createdAt": convert_neo4j_datetime(node_data.get("createdAt", "")),
-                    "updatedAt": convert_neo4j_datetime(node_data.get("updatedAt", ""))
-                })
-                referred_nodes_for_answer.append({
-                    "title": node_data.get("title", ""),
-                    "summary": node_data.get("summary", []),
-                    "entities": node_data.get("entities", []),
-                })
-
-            answer = question_chain.invoke({
+            async for token in stream_chain("answer_with_nodes_stream", {
                 "question": request.question,
-                "nodes": referred_nodes_for_answer,
-            })
-            
-            return {"referred_nodes": referred_nodes, "answer": answer.answer}
-        
+                "nodes": context["nodes"],
+            }):
+                yield sse_event("token", {"text": token})
         except Exception as e:
-            print(f"쿼리 실행 중 오류 발생: {str(e)}")
-            previous_query_error = str(e)
-            retry_count += 1
-            if retry_count < max_retries:
-                print(f"AI에게 수정된 쿼리를 요청합니다. 재시도 횟수: {retry_count}")
-            else:
-                return {"nodes": [], "answer": "질문 처리 중 에러가 발생했습니다."}
\ No newline at end of file
+            print(f"답변 생성 중 오류 발생: {str(e)}")
+            yield sse_event("error", {"detail": "답변 생성 중 에러가 발생했습니다."})
+            return
+
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    token_data: TokenData = Depends(get_current_user),
+) -> Any:
+    """
+    AI 결과 캐시들의 적중/미적중 통계를 리턴하는 api
+    """
+    return {
+        "summary": summary_cache.stats(),
+        "cypher_template": cypher_template_cache.stats(),
+        "image_description": image_description_cache.stats(),
+        "singleflight": ai_singleflight.stats(),
+    }
+
+
+@router.get("/metrics")
+async def get_llm_metrics(
+    token_data: TokenData = Depends(get_current_user),
+) -> Any:
+    """
+    체인별 LLM 호출 수, 지연 시간, 토큰 사용량, 재시도, 출력 파싱 실패 통계와
+    병렬 쿼리 생성(hedging) 통계를 리턴하는 api
+    """
+    return {**llm_telemetry.stats(), "hedging": hedge_stats.to_dict()}
@@ -1,84 +1,67 @@
 from typing import List, Optional
-from fastapi import HTTPException, Depends, APIRouter
-from app.ai.text_processing import get_update_node_chain
+from fastapi import HTTPException, Depends, APIRouter, Query
+from app.ai.node_merge import merge_node_content
+from app.ai.embedding import embed_node, embedding_to_bytes
+from app.config import settings
+from app.db.graph import FulltextIndexUnavailable, create_graph_node, decode_node_cursor, fetch_graph_page, search_graph_nodes
+from app.db.graph_schema import entities_text
 from app.db.session import get_neo4j
-from neo4j import Session
-from app.db.util.utilities import convert_neo4j_datetime
+from neo4j import AsyncSession
+from app.db.node_index import node_index
+from app.db.util.utilities import convert_neo4j_datetime, node_to_dict
+from app.core.exceptions import BadRequest, ServiceUnavailable
 from app.dependencies import get_current_user
 from app.schemas.ai import BaseNode, CreateNodeResponse, CreateSingleNode, NodeInDB, UpdateSingleNode
 from app.schemas.auth import TokenData
-from app.schemas.node import NodesWithRelationshipsResponse
+from app.schemas.node import NodeSearchResponse, NodesWithRelationshipsResponse
 
 router = APIRouter(prefix="/nodes", tags=["nodes"])
 
 @router.get("/{label}", response_model=NodesWithRelationshipsResponse)
 async def get_nodes_with_relationships(
     label: str,
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (없으면 첫 페이지)"),
+    limit: int = Query(settings.NODE_PAGE_DEFAULT_SIZE, ge=1, le=settings.NODE_PAGE_MAX_SIZE),
     token_data: TokenData = Depends(get_current_user),
-    session: Session = Depends(get_neo4j),
+    session: AsyncSession = Depends(get_neo4j),
 ):
     """
-    특정 라벨을 가진 노드들과 그 노드들 간의 관계를 가져옵니다.
+    특정 라벨을 가진 노드들과 그 노드들 간의 관계를 uuid 순으로 한 페이지씩 가져옵니다.
+    next_cursor가 null이 될 때까지 cursor로 넘겨 다음 페이지를 요청합니다.
+    각 relation은 한 번만 리턴되며, 같은 label의 양 끝 노드는 현재 또는 이전 페이지에,
+    다른 label의 이웃 노드는 neighbors에 있습니다.
+    한 페이지의 relation이 NODE_PAGE_MAX_RELATIONS개를 넘으면 나머지는 다음 페이지(nodes는 비어 있음)로 이어집니다.
     """
-    # Cypher 쿼리 작성
-    query = f"""
-    MATCH (n:{label})
-    OPTIONAL MATCH (n)-[r]-(m)
-    WITH n, r, m
-    WHERE r IS NULL OR elementId(n) < elementId(m)
-    RETURN n, r, m
-    LIMIT 100
+    page_cursor = None
+    if cursor:
+        try:
+            page_cursor = decode_node_cursor(cursor)
+        except ValueError as e:
+            raise BadRequest(str(e))
+
+    return await fetch_graph_page(session, label, page_cursor, limit, settings.NODE_PAGE_MAX_RELATIONS)
+
+
+# /{label}/{title}과 겹치지 않도록 search를 label 앞에 둡니다 (title이 "search"인 노드도 조회할 수 있어야 함).
+@router.get("/search/{label}", response_model=NodeSearchResponse)
+async def search_nodes(
+    label: str,
+    q: str = Query(..., min_length=1, description="검색어 (마지막 단어는 접두어로도 검색)"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=settings.NODE_SEARCH_MAX_LIMIT),
+    token_data: TokenData = Depends(get_current_user),
+    session: AsyncSession = Depends(get_neo4j),
+):
     """
-    
-    result = session.run(query)
-    
-    nodes = {}
-    relationships = []
-    
-    for record in result:
-        source_node = record["n"]
-        target_node = record["m"]
-        relationship = record["r"]
-
-        if source_node.id not in nodes:
-            node_data = dict(source_node.items())
-            nodes[source_node.id] = {
-                "uuid": node_data.get("uuid"),
-                "label": label,
-                "title": node_data.get("title", ""),
-                "summary": node_data.get("summary", []),
-                "entities": node_data.get("entities", []),
-                "createdAt": convert_neo4j_datetime(node_data.get("createdAt", "")),
-                "updatedAt": convert_neo4j_datetime(node_data.get("updatedAt", ""))
-            }
-
-        if(target_node is None):
-            continue
-        
-        if target_node.id not in nodes:
-            node_data = dict(target_node.items())
-            nodes[target_node.id] = {
-                "uuid": node_data.get("uuid"),
-                "label": label,
-                "title": node_data.get("title", ""),
-                "summary": node_data.get("summary", []),
-                "entities": node_data.get("entities", []),
-                "createdAt": convert_neo4j_datetime(node_data.get("createdAt", "")),
-                "updatedAt": convert_neo4j_datetime(node_data.get("updatedAt", ""))
-            }
-        
-        relationships.append({
-            "id": relationship.id,
-            "type": relationship.type,
-            "properties": dict(relationship),
-            "source": dict(source_node.items()).get("uuid"),
-            "target": dict(target_node.items()).get("uuid")
-        })
-    
-    return {
-        "nodes": list(nodes.values()),
-        "relations": relationships
-    }
+    label의 full-text 인덱스로 title, summary, entities를 검색하여 점수 순으로 리턴합니다.
+    AI를 사용하지 않으므로 입력 중 검색(search-as-you-type)에 사용할 수 있습니다.
+    인덱스가 없거나 아직 만들어지는 중이면 503을 리턴합니다.
+    """
+    try:
+        nodes = await search_graph_nodes(session, label, q, skip, limit)
+    except FulltextIndexUnavailable as e:
+        raise ServiceUnavailable(str(e))
+    return {"nodes": nodes, "skip": skip, "limit": limit}
 
 
 @router.get("/{label}/{title}", response_model=Optional[NodeInDB])
@@ -86,7 +69,7 @@ async def get_node(
     label: str,
     title: str,
     token_data: TokenData = Depends(get_current_user),
-    session: Session = Depends(get_neo4j),
+    session: AsyncSession = Depends(get_neo4j),
 ):
     """
     특정 label과 title을 가진 노드 1개를 가져옵니다.
@@ -98,9 +81,9 @@ async def get_node(
         LIMIT 1
     """
 
-    result = session.run(query, {"title": title})
+    result = await session.run(query, {"title": title})
     
-    record = result.single()
+    record = await result.single()
     print(f"asdfasdfsd {record}")
     
     if not record:
@@ -125,7 +108,7 @@ async def delete_node(
     label: str,
     uuid: str,
     token_data: TokenData = Depends(get_current_user),
-    session: Session = Depends(get_neo4j),
+    session: AsyncSession = Depends(get_neo4j),
 ):
     """
     특정 label과 uuid를 가진 노드를 삭제합니다.
@@ -136,11 +119,14 @@ async def delete_node(
         DETACH DELETE n
     """
     
-    result = session.run(query, {"uuid": uuid})
+    result = await session.run(query, {"uuid": uuid})
+    await result.consume()
     
     if not result:
         raise HTTPException(status_code=404, detail="Node not found")
     
+    node_index.remove(label, uuid)
+
     return {"detail": "Node and Relations deleted successfully"}
 
 
@@ -149,33 +135,17 @@ async def create_node(
     label: str,
     node_data: CreateSingleNode,
     token_data: TokenData = Depends(get_current_user),
-    session: Session = Depends(get_neo4j),
+    session: AsyncSession = Depends(get_neo4j),
 ):
     """
     특정 label을 가진 노드를 생성합니다.
     """
-    # Cypher 쿼리 작성
-    query = f"""
-        CREATE (n:{label} {{title: $title, summary: $summary, entities: $entities, createdAt: datetime(), updatedAt: datetime(), uuid: randomUUID()}})
-        RETURN n
-    """
-    
-    result = session.run(query, {"title": node_data.title, "summary": node_data.summary, "entities": node_data.entities})
-    
-    record = result.single()
+    node = await create_graph_node(session, label, node_data.title, node_data.summary, node_data.entities)
 
-    if not record:
+    if not node:
         raise HTTPException(status_code=500, detail="Node creation failed")
-    
-    return {
-        "uuid": record["n"].get("uuid"),
-        "label": label,
-        "title": record["n"].get("title", ""),
-        "summary": record["n"].get("summary", ""),
-        "entities": record["n"].get("entities", []),
-        "createdAt": convert_neo4j_datetime(record["n"].get("createdAt", "")),
-        "updatedAt": convert_neo4j_datetime(record["n"].get("updatedAt", ""))
-    }
+
+    return node
     
 
 # update node
@@ -184,43 +154,45 @@ async def update_node(
     label: str,
     node_data: UpdateSingleNode,
     token_data: TokenData = Depends(get_current_user),
-    session: Session = Depends(get_neo4j),
+    session: AsyncSession = Depends(get_neo4j),
 ):
     """
     특정 label을 가진 노드를 업데이트합니다.
+    기본(auto)은 새 내용이 기존 내용과 크게 다를 때만 AI로 합치고, 그 외에는 로컬에서 합칩니다.
     """
 
-    update_node_chain = get_update_node_chain()
-        
-    result = update_node_chain.invoke({
-        "title": node_data.node.title,
-        "prev_summary": node_data.node.summary,
-        "prev_entities": node_data.node.entities,
-        "new_summary": node_data.summary,
-        "new_entities": node_data.entities
-    })
+    result, _ = await merge_node_content(
+        node_data.node.title,
+        node_data.node.summary,
+        node_data.node.entities,
+        node_data.summary,
+        node_data.entities,
+        mode=node_data.merge_mode,
+    )
 
     new_summary = result.summary
     new_entities = result.entities
 
     query = f"""
         MATCH (n:{label} {{title: $title}})
-        SET n.summary = $summary, n.entities = $entities, n.updatedAt = datetime()
+        SET n.summary = $summary, n.entities = $entities, n.entitiesText = $entitiesText, n.embedding = $embedding, n.updatedAt = datetime()
         RETURN n
     """
-    result = session.run(query, {"title": node_data.node.title, "summary": new_summary, "entities": new_entities})
+    embedding = embed_node(node_data.node.title, new_summary, new_entities)
+    result = await session.run(query, {
+        "title": node_data.node.title,
+        "summary": new_summary,
+        "entities": new_entities,
+        "entitiesText": entities_text(new_entities),
+        "embedding": embedding_to_bytes(embedding),
+    })
     
-    record = result.single()
+    record = await result.single()
 
     if not record:
         raise HTTPException(status_code=500, detail="Node update failed")
     
-    return {
-        "uuid": record["n"].get("uuid"),
-        "label": label,
-        "title": record["n"].get("title", ""),
-        "summary": record["n"].get("summary", ""),
-        "entities": record["n"].get("entities", []),
-        "createdAt": convert_neo4j_datetime(record["n"].get("createdAt", "")),
-        "updatedAt": convert_neo4j_datetime(record["n"].get("updatedAt", ""))
-    }
\ No newline at end of file
+    node = node_to_dict(record["n"], label)
+    node_index.upsert(label, node, embedding)
+
+    return node
\ No newline at end of file
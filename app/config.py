@@ -41,10 +41,231 @@ class Settings(BaseSettings):
         "NEO4J_PASSWORD", "password"
     )
 
+    # graph db 커넥션 풀 최대 크기 (워커 하나에서 동시에 실행할 수 있는 쿼리 수)
+    NEO4J_MAX_CONNECTION_POOL_SIZE: int = int(os.getenv(
+        "NEO4J_MAX_CONNECTION_POOL_SIZE", "100"
+    ))
+
+    # 풀이 가득 찼을 때 커넥션을 얻기 위해 기다리는 최대 시간 (초)
+    NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS: float = float(os.getenv(
+        "NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS", "30"
+    ))
+
+    # 이 시간이 지난 커넥션은 풀로 반환될 때 닫고 새로 만듭니다 (초)
+    NEO4J_MAX_CONNECTION_LIFETIME_SECONDS: int = int(os.getenv(
+        "NEO4J_MAX_CONNECTION_LIFETIME_SECONDS", "3600"
+    ))
+
+    # 새 커넥션을 여는 데 기다리는 최대 시간 (초)
+    NEO4J_CONNECTION_TIMEOUT_SECONDS: float = float(os.getenv(
+        "NEO4J_CONNECTION_TIMEOUT_SECONDS", "10"
+    ))
+
     ANTHROPIC_API_KEY: str = os.getenv(
         "ANTHROPIC_API_KEY", "ANTHROPIC_API_KEY"
     )
 
+    # 워커 하나에서 동시에 진행할 수 있는 LLM 호출 수
+    LLM_MAX_CONCURRENCY: int = int(os.getenv(
+        "LLM_MAX_CONCURRENCY", "200"
+    ))
+
+    # 모델 tier별 Anthropic 모델
+    LLM_LARGE_MODEL: str = os.getenv(
+        "LLM_LARGE_MODEL", "claude-3-5-sonnet-20240620"
+    )
+    LLM_SMALL_MODEL: str = os.getenv(
+        "LLM_SMALL_MODEL", "claude-3-5-haiku-20241022"
+    )
+
+    # 체인별 설정이 없을 때 사용하는 최대 출력 토큰 수와 요청 timeout(초)
+    LLM_DEFAULT_MAX_TOKENS: int = int(os.getenv(
+        "LLM_DEFAULT_MAX_TOKENS", "1024"
+    ))
+    LLM_DEFAULT_TIMEOUT_SECONDS: float = float(os.getenv(
+        "LLM_DEFAULT_TIMEOUT_SECONDS", "60"
+    ))
+
+    # 체인별 모델 tier와 max_tokens, timeout (체인이름=tier[:max_tokens[:timeout]], 쉼표로 구분)
+    LLM_CHAIN_ROUTES: str = os.getenv(
+        "LLM_CHAIN_ROUTES",
+        "text_extraction=large,"
+        "update_node=small:1024:30,"
+        "answer_with_nodes=large,"
+        "answer_with_nodes_stream=large,"
+        "find_related_graph=small:512:30,"
+        "classify_relations=small:512:30,"
+        "search_question_query=small:512:30,"
+        "image_description=large:1024:90"
+    )
+
+    # small tier 체인의 출력을 파싱하지 못하면 large tier로 다시 실행할지 여부
+    LLM_FALLBACK_ON_PARSE_FAILURE: bool = os.getenv(
+        "LLM_FALLBACK_ON_PARSE_FAILURE", "true"
+    ).lower() == "true"
+
+    # 실행에 성공한 LLM 생성 Cypher 쿼리 템플릿 캐시 크기
+    CYPHER_TEMPLATE_CACHE_SIZE: int = int(os.getenv(
+        "CYPHER_TEMPLATE_CACHE_SIZE", "256"
+    ))
+
+    # label별 노드 역색인을 graph db에서 다시 읽어오는 주기 (초, 0이면 다시 읽지 않음)
+    NODE_INDEX_TTL_SECONDS: int = int(os.getenv(
+        "NODE_INDEX_TTL_SECONDS", "300"
+    ))
+
+    # 관련 노드 검색 시 반환할 기본 노드 수
+    RELATED_NODES_TOP_K: int = int(os.getenv(
+        "RELATED_NODES_TOP_K", "20"
+    ))
+
+    # 노드 임베딩 차원 수 (변경 시 저장된 임베딩은 다시 계산됩니다)
+    EMBEDDING_DIM: int = int(os.getenv(
+        "EMBEDDING_DIM", "256"
+    ))
+
+    # GET /nodes/{label} 한 페이지의 기본/최대 노드 수
+    NODE_PAGE_DEFAULT_SIZE: int = int(os.getenv(
+        "NODE_PAGE_DEFAULT_SIZE", "100"
+    ))
+    NODE_PAGE_MAX_SIZE: int = int(os.getenv(
+        "NODE_PAGE_MAX_SIZE", "1000"
+    ))
+
+    # GET /nodes/{label} 한 페이지에서 리턴하는 최대 relation 수 (넘으면 나머지는 다음 페이지로 이어짐)
+    NODE_PAGE_MAX_RELATIONS: int = int(os.getenv(
+        "NODE_PAGE_MAX_RELATIONS", "10000"
+    ))
+
+    # GET /nodes/search/{label} 한 페이지의 최대 노드 수
+    NODE_SEARCH_MAX_LIMIT: int = int(os.getenv(
+        "NODE_SEARCH_MAX_LIMIT", "100"
+    ))
+
+    # 임베딩 검색 결과에 포함할 최소 코사인 유사도
+    VECTOR_SEARCH_MIN_SCORE: float = float(os.getenv(
+        "VECTOR_SEARCH_MIN_SCORE", "0.1"
+    ))
+
+    # /ai/summarize 결과의 워커별 메모리 캐시 크기
+    SUMMARY_CACHE_SIZE: int = int(os.getenv(
+        "SUMMARY_CACHE_SIZE", "1024"
+    ))
+
+    # /ai/summarize/batch 요청 하나에서 동시에 실행할 추출 수와 최대 item 수
+    SUMMARIZE_BATCH_CONCURRENCY: int = int(os.getenv(
+        "SUMMARIZE_BATCH_CONCURRENCY", "8"
+    ))
+    SUMMARIZE_BATCH_MAX_ITEMS: int = int(os.getenv(
+        "SUMMARIZE_BATCH_MAX_ITEMS", "100"
+    ))
+
+    # AI가 생성한 조회 쿼리에 허용되는 최대 LIMIT 값
+    CYPHER_MAX_LIMIT: int = int(os.getenv(
+        "CYPHER_MAX_LIMIT", "100"
+    ))
+
+    # AI 쿼리 생성 시 temperature를 달리한 후보들을 동시에 생성하고 먼저 성공한 후보를 사용할지 여부와
+    # 후보별 temperature (후보 수 = temperature 개수, 쉼표로 구분)
+    CYPHER_HEDGE_ENABLED: bool = os.getenv(
+        "CYPHER_HEDGE_ENABLED", "false"
+    ).lower() == "true"
+    CYPHER_HEDGE_TEMPERATURES: str = os.getenv(
+        "CYPHER_HEDGE_TEMPERATURES", "0.2,0.7"
+    )
+
+    # AI가 생성한 쿼리를 실행하기 전에 EXPLAIN으로 검증할지 여부
+    CYPHER_EXPLAIN_ENABLED: bool = os.getenv(
+        "CYPHER_EXPLAIN_ENABLED", "true"
+    ).lower() == "true"
+
+    # /ai/query 답변 체인에 전달할 노드 내용의 최대 토큰 수(추정치)
+    QUERY_CONTEXT_TOKEN_BUDGET: int = int(os.getenv(
+        "QUERY_CONTEXT_TOKEN_BUDGET", "4000"
+    ))
+
+    # summary가 이 비율 이상 겹치는 노드는 답변 컨텍스트에서 중복으로 보고 제외
+    QUERY_CONTEXT_DEDUP_THRESHOLD: float = float(os.getenv(
+        "QUERY_CONTEXT_DEDUP_THRESHOLD", "0.8"
+    ))
+
+    # 이미지 분석 전 인코딩 설정 (긴 변 최대 픽셀, 목표 크기, JPEG 또는 WEBP, 인코딩 프로세스 수)
+    IMAGE_MAX_DIMENSION: int = int(os.getenv(
+        "IMAGE_MAX_DIMENSION", "1568"
+    ))
+    IMAGE_TARGET_BYTES: int = int(os.getenv(
+        "IMAGE_TARGET_BYTES", str(1024 * 1024)
+    ))
+    IMAGE_OUTPUT_FORMAT: str = os.getenv(
+        "IMAGE_OUTPUT_FORMAT", "JPEG"
+    ).upper()
+    IMAGE_PROCESS_WORKERS: int = int(os.getenv(
+        "IMAGE_PROCESS_WORKERS", "2"
+    ))
+
+    # 업로드 이미지 최대 크기와 디코딩을 허용하는 최대 픽셀 수
+    IMAGE_MAX_UPLOAD_BYTES: int = int(os.getenv(
+        "IMAGE_MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)
+    ))
+    IMAGE_MAX_PIXELS: int = int(os.getenv(
+        "IMAGE_MAX_PIXELS", str(100_000_000)
+    ))
+
+    # 이미지 설명 캐시 크기와 같은 이미지로 볼 perceptual hash 최대 해밍 거리 (64비트 중)
+    IMAGE_CACHE_SIZE: int = int(os.getenv(
+        "IMAGE_CACHE_SIZE", "1024"
+    ))
+    IMAGE_CACHE_MAX_DISTANCE: int = int(os.getenv(
+        "IMAGE_CACHE_MAX_DISTANCE", "4"
+    ))
+
+    # 노드 업데이트 시 새 내용이 이 비율 이상 다르면 AI로 병합 (merge_mode=auto)
+    NODE_MERGE_LLM_THRESHOLD: float = float(os.getenv(
+        "NODE_MERGE_LLM_THRESHOLD", "0.5"
+    ))
+
+    # 로컬 병합 시 최대 엔티티 수와 summary 최대 길이(문자 수)
+    NODE_MERGE_MAX_ENTITIES: int = int(os.getenv(
+        "NODE_MERGE_MAX_ENTITIES", "10"
+    ))
+    NODE_MERGE_SUMMARY_MAX_CHARS: int = int(os.getenv(
+        "NODE_MERGE_SUMMARY_MAX_CHARS", "1000"
+    ))
+
+    # ingest job 워커 수, 최대 시도 횟수, 재시도 대기 시간(초, 시도마다 두 배), 대기열 조회 주기(초)
+    INGEST_WORKERS: int = int(os.getenv(
+        "INGEST_WORKERS", "2"
+    ))
+    INGEST_MAX_ATTEMPTS: int = int(os.getenv(
+        "INGEST_MAX_ATTEMPTS", "3"
+    ))
+    INGEST_RETRY_BACKOFF_SECONDS: float = float(os.getenv(
+        "INGEST_RETRY_BACKOFF_SECONDS", "5"
+    ))
+    INGEST_POLL_INTERVAL_SECONDS: float = float(os.getenv(
+        "INGEST_POLL_INTERVAL_SECONDS", "1"
+    ))
+
+    # running 상태로 이 시간(초) 이상 남은 ingest job은 워커가 중단된 것으로 보고 다시 실행
+    INGEST_JOB_TIMEOUT_SECONDS: int = int(os.getenv(
+        "INGEST_JOB_TIMEOUT_SECONDS", "600"
+    ))
+
+    # 체인 실행마다 지연 시간/토큰 사용량을 JSON 한 줄로 출력할지 여부
+    LLM_TELEMETRY_LOG: bool = os.getenv(
+        "LLM_TELEMETRY_LOG", "false"
+    ).lower() == "true"
+
+    # 시작 시 사용 중인 모든 label의 graph db 제약 조건/인덱스를 확인할지 여부
+    GRAPH_SCHEMA_BOOTSTRAP_ON_STARTUP: bool = os.getenv(
+        "GRAPH_SCHEMA_BOOTSTRAP_ON_STARTUP", "true"
+    ).lower() == "true"
+
+    # 시작 시 LLM 클라이언트와 db 커넥션 풀을 미리 준비할지 여부
+    WARMUP_ON_STARTUP: bool = os.getenv(
+        "WARMUP_ON_STARTUP", "true"
+    ).lower() == "true"
+
 
     
 settings = Settings()
\ No newline at end of file
@@ -28,4 +28,18 @@ class BadRequest(HTTPException):
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=detail
-        )
\ No newline at end of file
+        )
+
+class PayloadTooLarge(HTTPException):
+    def __init__(self, detail: str = "Payload too large"):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail
+        )
+
+class ServiceUnavailable(HTTPException):
+    def __init__(self, detail: str = "Service unavailable"):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail
+        )
@@ -0,0 +1,62 @@
+from typing import Iterable
+from fastapi.responses import JSONResponse
+from app.core.exceptions import PayloadTooLarge
+
+
+class UploadSizeLimitMiddleware:
+    """
+    지정된 경로로 들어온 요청 본문을 max_bytes로 제한하는 ASGI 미들웨어.
+    Content-Length가 max_bytes를 넘으면 본문을 받기 전에 413으로 거절하고,
+    Content-Length가 없거나(chunked) 실제 본문이 더 크면 받은 크기를 세다가 넘는 순간 413으로 중단합니다.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    def _detail(self) -> str:
+        return f"요청 본문은 최대 {self.max_bytes} bytes까지 허용됩니다."
+
+    async def _reject(self, scope, receive, send) -> None:
+        response = JSONResponse(status_code=413, content={"detail": self._detail()})
+        await response(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope["headers"]:
+            if name != b"content-length":
+                continue
+            if value.isdigit() and int(value) > self.max_bytes:
+                await self._reject(scope, receive, send)
+                return
+            break
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # 본문을 읽는 도중(form 파싱 등)에 발생하므로 HTTPException 처리기에서 413 응답이 됩니다.
+                    raise PayloadTooLarge(self._detail())
+            return message
+
+        async def tracked_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except PayloadTooLarge:
+            if response_started:
+                raise
+            await self._reject(scope, receive, send)
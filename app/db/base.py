@@ -1,7 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from neo4j import GraphDatabase
+from neo4j import AsyncGraphDatabase
 
 from app.config import settings
 
@@ -12,4 +12,11 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-driver = GraphDatabase.driver(settings.NEO4J_URL, auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD))
\ No newline at end of file
+driver = AsyncGraphDatabase.driver(
+    settings.NEO4J_URL,
+    auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+    max_connection_pool_size=settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+    connection_acquisition_timeout=settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS,
+    max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME_SECONDS,
+    connection_timeout=settings.NEO4J_CONNECTION_TIMEOUT_SECONDS,
+)
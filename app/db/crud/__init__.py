@@ -3,3 +3,5 @@
 from .user import *  # noqa
 from .collection import * # noqa
 from .note import * # noqa
+from .summary_cache import * # noqa
+from .ingest_job import * # noqa
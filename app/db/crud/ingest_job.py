@@ -0,0 +1,124 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from app.models.ingest_job import IngestJob
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def create_ingest_job(db: Session, user_uid: str, label: str, title: str, text: str) -> IngestJob:
+    """
+    대기 상태의 ingest job 생성
+    """
+    now = _now()
+    db_obj = IngestJob(
+        id=str(uuid.uuid4()),
+        user_uid=user_uid,
+        label=label,
+        title=title,
+        text=text,
+        status="queued",
+        attempts=0,
+        result={},
+        available_at=now,
+        updated_at=now,
+    )
+    db.add(db_obj)
+    db.commit()
+    db.refresh(db_obj)
+    return db_obj
+
+
+def get_ingest_job(db: Session, job_id: str, user_uid: str) -> Optional[IngestJob]:
+    """
+    사용자의 ingest job 조회
+    """
+    return db.query(IngestJob).filter(IngestJob.id == job_id, IngestJob.user_uid == user_uid).first()
+
+
+def claim_ingest_job(db: Session, stale_after_seconds: int, max_attempts: int) -> Optional[IngestJob]:
+    """
+    실행할 job 하나를 가져와 running 상태로 바꿉니다.
+    실행 가능한 대기 job과, 워커가 중단되어 stale_after_seconds 이상 running 상태로 남은 job이 대상입니다.
+    running 상태로 남은 job 중 이미 max_attempts번 시도한 job은 (워커를 중단시키는 job일 수 있으므로) 실패로 종료합니다.
+    Postgres에서는 FOR UPDATE SKIP LOCKED로 여러 워커가 같은 job을 가져가지 않습니다.
+    """
+    now = _now()
+    stale = and_(IngestJob.status == "running", IngestJob.locked_at < now - timedelta(seconds=stale_after_seconds))
+
+    exhausted = (
+        db.query(IngestJob)
+        .filter(stale, IngestJob.attempts >= max_attempts)
+        .update({
+            IngestJob.status: "failed",
+            IngestJob.error: f"{stale_after_seconds}초 안에 끝나지 않은 시도가 최대 시도 횟수({max_attempts})에 도달했습니다.",
+            IngestJob.locked_at: None,
+            IngestJob.updated_at: now,
+        }, synchronize_session=False)
+    )
+    if exhausted:
+        db.commit()
+        print(f"시간 안에 끝나지 않은 ingest job {exhausted}개를 실패로 종료했습니다.")
+
+    job = (
+        db.query(IngestJob)
+        .filter(or_(
+            and_(IngestJob.status == "queued", IngestJob.available_at <= now),
+            and_(stale, IngestJob.attempts < max_attempts),
+        ))
+        .order_by(IngestJob.available_at)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.attempts += 1
+    job.locked_at = now
+    job.updated_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def save_ingest_stage(db: Session, job: IngestJob, stage: str, result: Dict[str, Any]) -> IngestJob:
+    """
+    완료된 단계와 그때까지의 결과 저장
+    """
+    job.stage = stage
+    job.result = {**(job.result or {}), **result}
+    job.updated_at = _now()
+    db.commit()
+    return job
+
+
+def finish_ingest_job(db: Session, job: IngestJob) -> IngestJob:
+    job.status = "succeeded"
+    job.error = None
+    job.locked_at = None
+    job.updated_at = _now()
+    db.commit()
+    return job
+
+
+def fail_ingest_job(db: Session, job: IngestJob, error: str, retry_after_seconds: Optional[float]) -> IngestJob:
+    """
+    실패한 job을 retry_after_seconds 후에 다시 실행하도록 대기시키거나, None이면 실패로 종료
+    """
+    now = _now()
+    job.error = error
+    job.locked_at = None
+    job.updated_at = now
+    if retry_after_seconds is None:
+        job.status = "failed"
+    else:
+        job.status = "queued"
+        job.available_at = now + timedelta(seconds=retry_after_seconds)
+    db.commit()
+    return job
@@ -0,0 +1,19 @@
+from typing import List, Optional
+from sqlalchemy.orm import Session
+from app.models.summary_cache import SummaryCache
+
+
+def get_summary_cache(db: Session, key: str) -> Optional[SummaryCache]:
+    """
+    캐시 키로 저장된 요약 결과 조회
+    """
+    return db.query(SummaryCache).filter(SummaryCache.key == key).first()
+
+
+def save_summary_cache(db: Session, key: str, summary: str, entities: List[str]) -> SummaryCache:
+    """
+    요약 결과 저장. 다른 워커가 같은 키를 먼저 저장했다면 덮어씁니다.
+    """
+    db_obj = db.merge(SummaryCache(key=key, summary=summary, entities=entities))
+    db.commit()
+    return db_obj
@@ -0,0 +1,288 @@
+import base64
+import binascii
+import json
+import re
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+from neo4j import AsyncSession
+from neo4j.exceptions import Neo4jError
+from app.ai.embedding import embed_node, embedding_to_bytes
+from app.db.graph_schema import entities_text, fulltext_index_name, graph_schema
+from app.db.node_index import node_index
+from app.db.util.utilities import node_to_dict
+
+
+LUCENE_SPECIAL_PATTERN = re.compile(r'([+\-!(){}\[\]^"~*?:\\/]|&&|\|\|)')
+LUCENE_OPERATORS = {"AND", "OR", "NOT", "TO"}
+
+
+class FulltextIndexUnavailable(RuntimeError):
+    """
+    full-text 인덱스가 없거나 아직 만들어지는 중이라 검색할 수 없음
+    """
+
+
+async def create_graph_node(
+    session: AsyncSession,
+    label: str,
+    title: str,
+    summary: str,
+    entities: List[str],
+    uuid: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    임베딩과 함께 노드를 생성하고 label 색인에 추가합니다. 생성에 실패하면 None
+    처음 보는 label이면 노드를 만들기 전에 제약 조건과 인덱스를 먼저 생성합니다.
+    uuid를 주면 그 uuid의 노드가 이미 있을 때 새로 만들지 않고 기존 노드를 리턴하므로
+    같은 uuid로 다시 실행해도 노드가 중복 생성되지 않습니다.
+    """
+    await graph_schema.ensure_label(session, label)
+
+    query = f"""
+        MERGE (n:{label} {{uuid: $uuid}})
+        ON CREATE SET n.title = $title, n.summary = $summary, n.entities = $entities, n.entitiesText = $entitiesText, n.embedding = $embedding, n.createdAt = datetime(), n.updatedAt = datetime()
+        RETURN n
+    """
+
+    embedding = embed_node(title, summary, entities)
+    result = await session.run(query, {
+        "uuid": uuid or str(uuid4()),
+        "title": title,
+        "summary": summary,
+        "entities": entities,
+        "entitiesText": entities_text(entities),
+        "embedding": embedding_to_bytes(embedding),
+    })
+
+    record = await result.single()
+    if not record:
+        return None
+
+    node = node_to_dict(record["n"], label)
+    node_index.upsert(label, node, embedding)
+    return node
+
+
+async def merge_relations(session: AsyncSession, label: str, target_uuid: str, pairs: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """
+    (target)-[type]->(related) 관계들을 한 번의 쿼리로 생성(이미 있으면 유지)하고 관계 목록을 리턴.
+    pairs는 {"uuid": 연관 노드 uuid, "type": 관계 유형} 목록입니다.
+    """
+    if not pairs:
+        return []
+
+    query = f"""
+        MATCH (target:{label} {{uuid: $target_uuid}})
+        UNWIND $pairs AS pair
+        MATCH (related:{label} {{uuid: pair.uuid}})
+        CALL apoc.merge.relationship(target, pair.type, {{}}, {{}}, related, {{}}) YIELD rel
+        RETURN related.uuid AS related_uuid, rel
+    """
+    result = await session.run(query, {"target_uuid": target_uuid, "pairs": pairs})
+
+    return [
+        {
+            "type": record["rel"].type,
+            "properties": dict(record["rel"].items()),
+            "source": target_uuid,
+            "target": record["related_uuid"],
+        }
+        async for record in result
+    ]
+
+
+async def run_read_query(session: AsyncSession, query: str, query_params: Optional[Dict[str, Any]] = None) -> List[Any]:
+    """
+    읽기 트랜잭션에서 쿼리를 실행하고 record 목록을 리턴.
+    쿼리가 데이터를 쓰려고 하면 graph db가 거부하므로 AI가 생성한 조회 쿼리는 이 함수로 실행합니다.
+    """
+    async def read(tx):
+        result = await tx.run(query, query_params or {})
+        return [record async for record in result]
+
+    return await session.execute_read(read)
+
+
+def fulltext_query(text: str, prefix: bool = True) -> str:
+    """
+    사용자 입력을 Lucene 쿼리로 변환합니다.
+    특수 문자는 escape하고, prefix이면 입력 중인 마지막 단어는 접두어 검색도 함께 수행합니다.
+    (예: "graph dat" -> "graph dat dat*")
+    """
+    terms = []
+    for term in text.split():
+        if term.upper() in LUCENE_OPERATORS:
+            term = term.lower()
+        terms.append(LUCENE_SPECIAL_PATTERN.sub(r"\\\1", term))
+    if prefix and terms:
+        terms.append(f"{terms[-1]}*")
+    return " ".join(terms)
+
+
+async def search_graph_nodes(
+    session: AsyncSession,
+    label: str,
+    text: str,
+    skip: int,
+    limit: int,
+    prefix: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    label의 full-text 인덱스(title, summary, entities)로 노드를 검색하여 Lucene 점수 순으로 리턴.
+    prefix는 입력 중 검색처럼 마지막 단어가 완성되지 않았을 수 있을 때만 사용합니다.
+    인덱스를 사용할 수 없으면 FulltextIndexUnavailable
+    """
+    query = fulltext_query(text, prefix)
+    if not query:
+        return []
+
+    try:
+        result = await session.run(
+            """
+            CALL db.index.fulltext.queryNodes($index, $query, {skip: $skip, limit: $limit})
+            YIELD node, score
+            RETURN node, score
+            """,
+            {"index": fulltext_index_name(label), "query": query, "skip": skip, "limit": limit},
+        )
+        return [
+            {**node_to_dict(record["node"], label), "score": record["score"]}
+            async for record in result
+        ]
+    except Neo4jError as e:
+        raise FulltextIndexUnavailable(f"label {label}의 full-text 인덱스를 사용할 수 없습니다: {e.message}")
+
+
+def encode_node_cursor(
+    after: Optional[str],
+    until: Optional[str] = None,
+    relation_after: Optional[str] = None,
+    more: bool = False,
+) -> str:
+    """
+    다음 노드 페이지의 cursor. relation_after를 주면 (after, until] 노드 페이지의
+    relation을 relation_after 다음부터 이어서 가져오는 cursor이며, more는 until 뒤에 노드가 더 있는지 여부입니다.
+    """
+    cursor = {"after": after}
+    if relation_after is not None:
+        cursor.update({"until": until, "relation_after": relation_after, "more": more})
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+
+def decode_node_cursor(cursor: str) -> Dict[str, Any]:
+    """
+    cursor를 {"after", "until", "relation_after", "more"}로 변환. 형식이 잘못되었으면 ValueError
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        after = data["after"]
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"잘못된 cursor입니다: {str(e)}")
+
+    relation_after = data.get("relation_after")
+    if relation_after is None:
+        if not isinstance(after, str):
+            raise ValueError("잘못된 cursor입니다.")
+        return {"after": after, "until": None, "relation_after": None, "more": False}
+
+    until = data.get("until")
+    more = data.get("more")
+    if (
+        not (after is None or isinstance(after, str))
+        or not isinstance(until, str)
+        or not isinstance(relation_after, str)
+        or not isinstance(more, bool)
+    ):
+        raise ValueError("잘못된 cursor입니다.")
+    return {"after": after, "until": until, "relation_after": relation_after, "more": more}
+
+
+async def fetch_graph_page(
+    session: AsyncSession,
+    label: str,
+    cursor: Optional[Dict[str, Any]],
+    limit: int,
+    max_relations: int,
+) -> Dict[str, Any]:
+    """
+    uuid 순으로 cursor 다음의 노드 limit개와, 그 노드들의 relation을 가져옵니다.
+    - 같은 label 노드 사이의 relation은 uuid가 더 큰 쪽 노드의 페이지에서 한 번만 리턴되므로
+      페이지를 순서대로 읽으면 양 끝 노드를 이미 받은 상태가 됩니다.
+    - 다른 label 노드와의 relation은 이 label 노드의 페이지에서 리턴되고, 상대 노드는 neighbors에 포함됩니다.
+    - relation은 element id 순으로 최대 max_relations개까지 리턴합니다. 남은 relation이 있으면
+      next_cursor는 같은 노드들의 relation을 이어서 가져오는 cursor이고, 그 페이지의 nodes는 비어 있습니다.
+    """
+    cursor = cursor or {}
+    after = cursor.get("after")
+    relation_after = cursor.get("relation_after")
+
+    if relation_after is None:
+        node_query = f"""
+            MATCH (n:{label})
+            WHERE n.uuid IS NOT NULL AND ($after IS NULL OR n.uuid > $after)
+            RETURN n
+            ORDER BY n.uuid
+            LIMIT $limit
+        """
+        result = await session.run(node_query, {"after": after, "limit": limit + 1})
+        nodes = [node_to_dict(record["n"], label) async for record in result]
+        more = len(nodes) > limit
+        nodes = nodes[:limit]
+        until = nodes[-1]["uuid"] if nodes else None
+        uuids = [node["uuid"] for node in nodes]
+    else:
+        # relation을 이어서 가져오는 페이지: 노드는 이전 응답에서 이미 받았으므로 uuid만 다시 조회합니다.
+        until = cursor["until"]
+        more = cursor["more"]
+        node_query = f"""
+            MATCH (n:{label})
+            WHERE n.uuid IS NOT NULL AND ($after IS NULL OR n.uuid > $after) AND n.uuid <= $until
+            RETURN n.uuid AS uuid
+            ORDER BY n.uuid
+        """
+        result = await session.run(node_query, {"after": after, "until": until})
+        nodes = []
+        uuids = [record["uuid"] async for record in result]
+
+    relations = []
+    neighbors = {}
+    next_cursor = encode_node_cursor(until) if more else None
+    if uuids:
+        relation_query = f"""
+            UNWIND $uuids AS uuid
+            MATCH (n:{label} {{uuid: uuid}})-[r]-(m)
+            WHERE (NOT m:{label} OR m.uuid < n.uuid)
+              AND ($relation_after IS NULL OR elementId(r) > $relation_after)
+            RETURN elementId(r) AS id, r, startNode(r).uuid AS source, endNode(r).uuid AS target,
+                   CASE WHEN m:{label} THEN null ELSE m END AS neighbor, labels(m) AS neighbor_labels
+            ORDER BY id
+            LIMIT $limit
+        """
+        result = await session.run(relation_query, {
+            "uuids": uuids,
+            "relation_after": relation_after,
+            "limit": max_relations + 1,
+        })
+        async for record in result:
+            if len(relations) == max_relations:
+                next_cursor = encode_node_cursor(after, until, relations[-1]["id"], more)
+                break
+            relations.append({
+                "id": record["id"],
+                "type": record["r"].type,
+                "properties": dict(record["r"].items()),
+                "source": record["source"],
+                "target": record["target"],
+            })
+            neighbor = record["neighbor"]
+            if neighbor is not None:
+                neighbor_label = record["neighbor_labels"][0] if record["neighbor_labels"] else ""
+                neighbor_node = node_to_dict(neighbor, neighbor_label)
+                neighbors.setdefault(neighbor_node["uuid"], neighbor_node)
+
+    return {
+        "nodes": nodes,
+        "relations": relations,
+        "neighbors": list(neighbors.values()),
+        "next_cursor": next_cursor,
+    }
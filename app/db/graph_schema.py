@@ -0,0 +1,140 @@
+"""
+graph db 스키마(제약 조건, 인덱스) 관리.
+시작 시 사용 중인 모든 label에 대해 실행되고, 새 label의 노드가 처음 생성될 때는 제약 조건/인덱스만 생성합니다.
+마이그레이션 명령으로 직접 실행할 수도 있습니다:
+
+    python -m app.db.graph_schema [label ...]
+"""
+import asyncio
+import sys
+from typing import Dict, List, Optional, Set
+from neo4j import AsyncSession
+from app.db.base import driver
+
+
+def uuid_constraint_name(label: str) -> str:
+    return f"{label}_uuid_unique"
+
+
+def title_index_name(label: str) -> str:
+    return f"{label}_title"
+
+
+def fulltext_index_name(label: str) -> str:
+    return f"{label}_fulltext"
+
+
+def entities_text(entities: Optional[List[str]]) -> str:
+    """
+    full-text 인덱스는 문자열 속성만 색인하므로 entities 목록을 공백으로 이은 entitiesText 속성을 함께 저장합니다.
+    """
+    return " ".join(entities or [])
+
+
+def schema_queries(label: str) -> List[str]:
+    """
+    label 하나에 필요한 스키마 쿼리. 모두 IF NOT EXISTS로 여러 번 실행해도 안전합니다.
+    - uuid 유일성 제약 조건 (uuid 조회가 인덱스 탐색이 됩니다)
+    - title range 인덱스
+    - title/summary/entitiesText full-text 인덱스
+    """
+    return [
+        f"CREATE CONSTRAINT `{uuid_constraint_name(label)}` IF NOT EXISTS "
+        f"FOR (n:`{label}`) REQUIRE n.uuid IS UNIQUE",
+        f"CREATE INDEX `{title_index_name(label)}` IF NOT EXISTS "
+        f"FOR (n:`{label}`) ON (n.title)",
+        f"CREATE FULLTEXT INDEX `{fulltext_index_name(label)}` IF NOT EXISTS "
+        f"FOR (n:`{label}`) ON EACH [n.title, n.summary, n.entitiesText]",
+    ]
+
+
+def backfill_query(label: str) -> str:
+    """
+    entitiesText가 없는 기존 노드에 값을 채웁니다.
+    """
+    return f"""
+        MATCH (n:`{label}`)
+        WHERE n.entitiesText IS NULL AND n.entities IS NOT NULL
+        CALL {{
+            WITH n
+            SET n.entitiesText = apoc.text.join(n.entities, ' ')
+        }} IN TRANSACTIONS OF 1000 ROWS
+    """
+
+
+class GraphSchemaManager:
+    """
+    label별 스키마 관리.
+    - ensure_label: 요청 처리 중에 처음 보는 label의 제약 조건/인덱스만 생성합니다 (IF NOT EXISTS DDL).
+      성공/실패한 label을 기억하므로 같은 label로는 다시 실행하지 않습니다.
+    - ensure_all: 시작 시와 마이그레이션 명령에서 DDL과 entitiesText 채우기(label 전체 탐색)를 실행합니다.
+      이전에 실패한 label도 다시 시도합니다.
+    """
+
+    def __init__(self):
+        self._ensured: Set[str] = set()
+        self.failed: Dict[str, str] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def _create_schema(self, session: AsyncSession, label: str) -> bool:
+        try:
+            for query in schema_queries(label):
+                result = await session.run(query)
+                await result.consume()
+        except Exception as e:
+            # 스키마가 없어도 노드 생성은 동작하므로 오류를 기록하고, 시작/마이그레이션 시 다시 시도합니다.
+            print(f"graph db 스키마 생성 중 오류 발생 ({label}): {str(e)}")
+            self.failed[label] = str(e)
+            return False
+        self.failed.pop(label, None)
+        self._ensured.add(label)
+        return True
+
+    async def ensure_label(self, session: AsyncSession, label: str) -> None:
+        if label in self._ensured or label in self.failed:
+            return
+
+        lock = self._locks.setdefault(label, asyncio.Lock())
+        async with lock:
+            if label in self._ensured or label in self.failed:
+                return
+            if await self._create_schema(session, label):
+                print(f"graph db 스키마 생성 완료: {label}")
+
+    async def ensure_all(self, session: AsyncSession, labels: Optional[List[str]] = None) -> List[str]:
+        """
+        주어진 label들(없으면 graph db에서 사용 중인 모든 label)의 스키마를 확인하고
+        기존 노드의 entitiesText를 채운 뒤, 스키마 생성에 성공한 label 목록을 리턴
+        """
+        if not labels:
+            result = await session.run("CALL db.labels() YIELD label RETURN label")
+            labels = [record["label"] async for record in result]
+
+        ensured = []
+        for label in labels:
+            if not await self._create_schema(session, label):
+                continue
+            result = await session.run(backfill_query(label))
+            await result.consume()
+            ensured.append(label)
+        return ensured
+
+
+graph_schema = GraphSchemaManager()
+
+
+async def bootstrap_graph_schema(labels: Optional[List[str]] = None) -> List[str]:
+    async with driver.session() as session:
+        return await graph_schema.ensure_all(session, labels)
+
+
+async def _main(labels: List[str]) -> None:
+    try:
+        ensured = await bootstrap_graph_schema(labels)
+        print(f"{len(ensured)}개 label의 스키마를 확인했습니다: {', '.join(ensured)}")
+    finally:
+        await driver.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1:]))
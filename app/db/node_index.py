@@ -0,0 +1,255 @@
+import asyncio
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Set
+import numpy as np
+from neo4j import AsyncSession
+from app.ai.embedding import embed_node, embedding_from_bytes
+from app.config import settings
+from app.db.util.utilities import node_to_dict
+from app.db.vector_index import LabelVectorIndex
+
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# 관련도 점수 가중치
+TOKEN_OVERLAP_WEIGHT = 0.5
+ENTITY_DICE_WEIGHT = 0.3
+SUMMARY_DICE_WEIGHT = 0.2
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower().strip()
+
+
+def tokenize(text: str) -> Set[str]:
+    return set(TOKEN_PATTERN.findall(normalize(text)))
+
+
+def bigrams(text: str) -> Set[str]:
+    """
+    apoc.text.sorensenDiceSimilarity와 같이 문자 bigram 집합을 사용합니다.
+    """
+    text = normalize(text)
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def index_tokens(title: str, entities: Iterable[str]) -> Set[str]:
+    """
+    title과 entities에서 색인할 토큰 목록. entity는 단어 단위 토큰과 전체 문자열 모두 색인합니다.
+    """
+    tokens = tokenize(title)
+    for entity in entities or []:
+        tokens |= tokenize(entity)
+        normalized = normalize(entity)
+        if normalized:
+            tokens.add(normalized)
+    return tokens
+
+
+class LabelIndex:
+    """
+    하나의 label에 속한 노드들의 역색인과 임베딩 인덱스
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self._tokens: Dict[str, Set[str]] = {}
+        self._entity_bigrams: Dict[str, List[Set[str]]] = {}
+        self._summary_bigrams: Dict[str, Set[str]] = {}
+        self.vectors = LabelVectorIndex()
+        self.loaded_at = time.monotonic()
+
+    def upsert(self, node: Dict[str, Any], embedding: Optional[np.ndarray] = None) -> None:
+        uuid = node.get("uuid")
+        if not uuid:
+            return
+        self.remove(uuid)
+
+        if embedding is None:
+            embedding = embed_node(node.get("title", ""), node.get("summary", ""), node.get("entities", []))
+        self.vectors.upsert(uuid, embedding)
+
+        tokens = index_tokens(node.get("title", ""), node.get("entities", []))
+        for token in tokens:
+            self.postings.setdefault(token, set()).add(uuid)
+
+        self.nodes[uuid] = node
+        self._tokens[uuid] = tokens
+        self._entity_bigrams[uuid] = [bigrams(entity) for entity in node.get("entities", []) or []]
+        self._summary_bigrams[uuid] = bigrams(node.get("summary", ""))
+
+    def remove(self, uuid: str) -> None:
+        for token in self._tokens.pop(uuid, set()):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(uuid)
+            if not postings:
+                del self.postings[token]
+        self.nodes.pop(uuid, None)
+        self._entity_bigrams.pop(uuid, None)
+        self._summary_bigrams.pop(uuid, None)
+        self.vectors.remove(uuid)
+
+    def search(
+        self,
+        title: str,
+        summary: str,
+        entities: List[str],
+        top_k: int,
+        exclude_uuid: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        토큰을 공유하는 후보 노드들을 (토큰 겹침 + entities/summary Dice 유사도)로 점수화하여
+        상위 top_k개를 반환
+        """
+        query_tokens = index_tokens(title, entities)
+        if not query_tokens:
+            return []
+
+        candidates: Set[str] = set()
+        for token in query_tokens:
+            candidates |= self.postings.get(token, set())
+        candidates.discard(exclude_uuid)
+
+        query_entity_bigrams = [bigrams(entity) for entity in entities or []]
+        query_summary_bigrams = bigrams(summary)
+
+        scored = []
+        for uuid in candidates:
+            overlap = len(query_tokens & self._tokens[uuid]) / len(query_tokens)
+
+            entity_score = 0.0
+            candidate_entity_bigrams = self._entity_bigrams[uuid]
+            if query_entity_bigrams and candidate_entity_bigrams:
+                entity_score = sum(
+                    max(dice(query_entity, candidate_entity) for candidate_entity in candidate_entity_bigrams)
+                    for query_entity in query_entity_bigrams
+                ) / len(query_entity_bigrams)
+
+            summary_score = dice(query_summary_bigrams, self._summary_bigrams[uuid])
+
+            score = (
+                TOKEN_OVERLAP_WEIGHT * overlap
+                + ENTITY_DICE_WEIGHT * entity_score
+                + SUMMARY_DICE_WEIGHT * summary_score
+            )
+            scored.append((score, uuid))
+
+        scored.sort(reverse=True)
+        return [self.nodes[uuid] for _, uuid in scored[:top_k]]
+
+    def vector_search(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        min_score: float = 0.0,
+        exclude_uuid: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        임베딩 코사인 유사도 상위 top_k개 노드를 반환
+        """
+        return [
+            self.nodes[uuid]
+            for uuid, _ in self.vectors.search(embedding, top_k, min_score, exclude_uuid)
+        ]
+
+
+class NodeIndex:
+    """
+    label별 역색인 모음.
+    label을 처음 조회할 때 graph db에서 전체 노드를 읽어 색인을 만들고,
+    이후에는 노드 생성/수정/삭제 시 점진적으로 갱신합니다.
+    다른 워커에서 발생한 변경을 반영하기 위해 ttl이 지나면 다시 읽어옵니다.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._labels: Dict[str, LabelIndex] = {}
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+
+    def _is_stale(self, index: LabelIndex) -> bool:
+        return self.ttl_seconds > 0 and time.monotonic() - index.loaded_at > self.ttl_seconds
+
+    async def load(self, session: AsyncSession, label: str) -> LabelIndex:
+        query = f"""
+            MATCH (n:{label})
+            RETURN n
+        """
+        index = LabelIndex()
+        result = await session.run(query)
+        async for record in result:
+            index.upsert(
+                node_to_dict(record["n"], label),
+                embedding_from_bytes(record["n"].get("embedding")),
+            )
+        self._labels[label] = index
+        return index
+
+    async def get(self, session: AsyncSession, label: str) -> LabelIndex:
+        """
+        색인이 없거나 오래되었으면 다시 읽어옵니다.
+        같은 label을 동시에 조회하는 요청들은 한 번만 읽어온 결과를 함께 사용합니다.
+        """
+        index = self._labels.get(label)
+        if index is not None and not self._is_stale(index):
+            return index
+
+        lock = self._load_locks.setdefault(label, asyncio.Lock())
+        async with lock:
+            index = self._labels.get(label)
+            if index is None or self._is_stale(index):
+                index = await self.load(session, label)
+        return index
+
+    def upsert(self, label: str, node: Dict[str, Any], embedding: Optional[np.ndarray] = None) -> None:
+        """
+        이미 색인이 만들어진 label에 한해 노드를 추가/갱신합니다.
+        아직 색인이 없다면 다음 조회 시 전체를 읽어오므로 무시합니다.
+        """
+        index = self._labels.get(label)
+        if index is not None:
+            index.upsert(node, embedding)
+
+    def remove(self, label: str, uuid: str) -> None:
+        index = self._labels.get(label)
+        if index is not None:
+            index.remove(uuid)
+
+    async def search(
+        self,
+        session: AsyncSession,
+        label: str,
+        title: str,
+        summary: str,
+        entities: List[str],
+        top_k: int,
+        exclude_uuid: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return (await self.get(session, label)).search(title, summary, entities, top_k, exclude_uuid)
+
+    async def vector_search(
+        self,
+        session: AsyncSession,
+        label: str,
+        embedding: np.ndarray,
+        top_k: int,
+        exclude_uuid: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return (await self.get(session, label)).vector_search(
+            embedding, top_k, settings.VECTOR_SEARCH_MIN_SCORE, exclude_uuid
+        )
+
+
+node_index = NodeIndex(settings.NODE_INDEX_TTL_SECONDS)
@@ -1,4 +1,7 @@
-from app.db.base import SessionLocal, driver
+from typing import Any, Dict
+from sqlalchemy import text
+from app.config import settings
+from app.db.base import SessionLocal, driver, engine
 
 def get_db():
     """
@@ -10,12 +13,74 @@ def get_db():
     finally:
         db.close()
 
-def get_neo4j():
+
+class GraphSessionStats:
+    """
+    graph db 세션 사용량 집계
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.peak_active = 0
+        self.opened = 0
+
+    def open(self) -> None:
+        self.opened += 1
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+
+    def close(self) -> None:
+        self.active -= 1
+
+
+graph_session_stats = GraphSessionStats()
+
+
+async def get_neo4j():
     """
     graph db 데이터베이스 세션을 제공하는 의존성 함수
     """
     neo4j = driver.session()
+    graph_session_stats.open()
     try:
         yield neo4j
     finally:
-        neo4j.close()
\ No newline at end of file
+        graph_session_stats.close()
+        await neo4j.close()
+
+
+def graph_pool_stats() -> Dict[str, Any]:
+    """
+    graph db 세션 수와 주소별 커넥션 풀 사용량.
+    드라이버가 공개 API로 풀 상태를 제공하지 않으므로 내부 풀 객체를 읽으며, 읽을 수 없으면 생략합니다.
+    """
+    connections = {}
+    pool = getattr(driver, "_pool", None)
+    for address, pooled in list(getattr(pool, "connections", {}).items()):
+        in_use = sum(1 for connection in list(pooled) if getattr(connection, "in_use", False))
+        connections[str(address)] = {
+            "total": len(pooled),
+            "in_use": in_use,
+            "idle": len(pooled) - in_use,
+        }
+
+    return {
+        "max_connection_pool_size": settings.NEO4J_MAX_CONNECTION_POOL_SIZE,
+        "connection_acquisition_timeout_seconds": settings.NEO4J_CONNECTION_ACQUISITION_TIMEOUT_SECONDS,
+        "max_connection_lifetime_seconds": settings.NEO4J_MAX_CONNECTION_LIFETIME_SECONDS,
+        "sessions": {
+            "active": graph_session_stats.active,
+            "peak_active": graph_session_stats.peak_active,
+            "opened": graph_session_stats.opened,
+        },
+        "connections": connections,
+    }
+
+
+async def warmup_db_pools():
+    """
+    SQL / graph db 커넥션 풀에 미리 연결을 만들어 둡니다.
+    """
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    await driver.verify_connectivity()
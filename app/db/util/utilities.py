@@ -1,8 +1,14 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from neo4j.time import DateTime as Neo4jDateTime
 from datetime import datetime
+import asyncio
 import io
 import base64
-from PIL import Image
+import time
+from PIL import Image, ImageOps
+from app.config import settings
+from app.core.exceptions import PayloadTooLarge
 
 
 def convert_neo4j_datetime(neo4j_datetime):
@@ -20,64 +26,195 @@ def convert_neo4j_datetime(neo4j_datetime):
     )
 
 
+def node_to_dict(node, label):
+    """
+    graph db 노드를 NodeInDB 형태의 dict로 변환
+    """
+    node_data = dict(node.items())
+    return {
+        "uuid": node_data.get("uuid", ""),
+        "label": label,
+        "title": node_data.get("title", ""),
+        "summary": node_data.get("summary", ""),
+        "entities": node_data.get("entities", []),
+        "createdAt": convert_neo4j_datetime(node_data.get("createdAt", "")),
+        "updatedAt": convert_neo4j_datetime(node_data.get("updatedAt", ""))
+    }
+
+
+def configure_image_decoding(max_pixels):
+    """
+    디코딩을 허용하는 최대 픽셀 수 설정 (초과 시 DecompressionBombError).
+    앱 시작 시와 이미지 프로세스 풀의 각 워커가 시작될 때 호출됩니다.
+    """
+    Image.MAX_IMAGE_PIXELS = max_pixels
+
+
+async def read_upload_limited(upload, max_bytes, chunk_size=1024 * 1024):
+    """
+    업로드된 파일 part를 chunk 단위로 읽으면서 max_bytes를 넘는 순간 중단합니다.
+    multipart 본문은 핸들러가 호출되기 전에 이미 모두 받아진 상태이므로
+    요청 전체 크기는 UploadSizeLimitMiddleware가 받는 도중에 제한하고, 여기서는 파일 크기만 검사합니다.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise PayloadTooLarge(f"이미지는 최대 {max_bytes} bytes까지 업로드할 수 있습니다.")
+
+    content = bytearray()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        content += chunk
+        if len(content) > max_bytes:
+            raise PayloadTooLarge(f"이미지는 최대 {max_bytes} bytes까지 업로드할 수 있습니다.")
+    return bytes(content)
+
+
+def _encode(img, save_format, quality):
+    buffered = io.BytesIO()
+    if save_format == "PNG":
+        img.save(buffered, format=save_format, optimize=True)
+    else:
+        img.save(buffered, format=save_format, quality=quality)
+    return buffered.getvalue()
+
+
+def encode_image(image_content, max_dimension, target_bytes, output_format="JPEG", min_quality=40, max_quality=90):
+    """
+    이미지를 모델이 활용할 수 있는 최대 해상도로 먼저 줄인 뒤,
+    target_bytes 이하가 되는 가장 높은 quality를 이진 탐색으로 찾아 인코딩합니다.
+    최소 quality로도 크기를 넘으면 크기 비율로 해상도를 예측하여 다시 줄입니다.
+    프로세스 풀에서 실행되는 동기 함수입니다.
+    """
+    start = time.perf_counter()
 
-async def compress_image_to_base64(image_content, max_size_mb=18, quality_start=95, min_quality=40):
-    max_size_bytes = max_size_mb * 1024 * 1024
-    
     img = Image.open(io.BytesIO(image_content))
-    original_format = img.format
-    
-    if not original_format:
-        original_format = "JPEG"
-    
+    # JPEG는 디코딩 단계에서 1/2~1/8 크기로 읽어 전체 해상도로 메모리에 올리지 않습니다.
+    if img.format == "JPEG":
+        scale = min(1.0, max_dimension / max(img.size))
+        img.draft("RGB", (int(img.width * scale), int(img.height * scale)))
+    img.thumbnail((max_dimension, max_dimension), Image.LANCZOS, reducing_gap=2.0)
+    img = ImageOps.exif_transpose(img)
+
     has_transparency = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
-    
-    if has_transparency:
-        save_format = 'PNG'
+
+    if output_format == "WEBP":
+        save_format = "WEBP"
+        img = img.convert("RGBA" if has_transparency else "RGB")
+    elif has_transparency:
+        save_format = "PNG"
         if img.mode == 'P':
             img = img.convert('RGBA')
     else:
-        save_format = original_format if original_format != 'PNG' else 'JPEG'
-        if img.mode != 'RGB' and save_format == 'JPEG':
+        save_format = "JPEG"
+        if img.mode != 'RGB':
             img = img.convert('RGB')
-    
-    quality = quality_start
-    
-    while quality >= min_quality:
-        buffered = io.BytesIO()
-        img.save(buffered, format=save_format, quality=quality, optimize=True)
-        
-        size = buffered.getbuffer().nbytes
-        if size <= max_size_bytes:
-            break
-        
-        quality -= 5
-    
-    if buffered.getbuffer().nbytes > max_size_bytes:
-        width, height = img.size
-        
-        scale_factor = 0.9
-        
-        while scale_factor > 0.1:
-            new_width = int(width * scale_factor)
-            new_height = int(height * scale_factor)
-            
-            resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-            
-            buffered = io.BytesIO()
-            resized_img.save(buffered, format=save_format, quality=quality, optimize=True)
-            
-            if buffered.getbuffer().nbytes <= max_size_bytes:
-                break
-                
-            scale_factor *= 0.9
-    
-    buffered.seek(0)
-    
-    base64_image = base64.b64encode(buffered.getvalue()).decode("utf-8")
-    mime_type = f"image/{save_format.lower()}"
-    
+
+    data = _encode(img, save_format, max_quality)
+    quality = max_quality
+
+    if len(data) > target_bytes and save_format != "PNG":
+        best = None
+        low, high = min_quality, max_quality - 1
+        while low <= high:
+            mid = (low + high) // 2
+            candidate = _encode(img, save_format, mid)
+            if len(candidate) <= target_bytes:
+                best, quality = candidate, mid
+                low = mid + 1
+            else:
+                high = mid - 1
+        if best is not None:
+            data = best
+        else:
+            quality = min_quality
+            data = _encode(img, save_format, quality)
+
+    while len(data) > target_bytes and min(img.size) > 16:
+        # 인코딩 크기는 대략 픽셀 수에 비례하므로 면적 비율의 제곱근만큼 줄입니다.
+        scale = min(0.9, (target_bytes / len(data)) ** 0.5 * 0.95)
+        new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+        img = img.resize(new_size, Image.LANCZOS)
+        data = _encode(img, save_format, quality)
+
     return {
-        "base64_image": base64_image,
-        "mime_type": mime_type
+        "base64_image": base64.b64encode(data).decode("utf-8"),
+        "mime_type": f"image/{save_format.lower()}",
+        "width": img.width,
+        "height": img.height,
+        "quality": quality,
+        "output_bytes": len(data),
+        "encode_ms": round((time.perf_counter() - start) * 1000, 2),
     }
+
+
+def perceptual_hash(image_content, hash_size=8):
+    """
+    디코딩된 이미지의 64비트 difference hash (dHash).
+    재인코딩/리사이즈된 같은 이미지는 해밍 거리가 작은 값을 가집니다.
+    """
+    img = Image.open(io.BytesIO(image_content))
+    img.draft("L", (hash_size * 8, hash_size * 8))
+    img = ImageOps.exif_transpose(img)
+    img = img.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+
+    pixels = list(img.getdata())
+    value = 0
+    for row in range(hash_size):
+        for col in range(hash_size):
+            left = pixels[row * (hash_size + 1) + col]
+            right = pixels[row * (hash_size + 1) + col + 1]
+            value = (value << 1) | (1 if left > right else 0)
+    return value
+
+
+_image_executor = None
+
+
+def get_image_executor():
+    """
+    이미지 인코딩 전용 프로세스 풀. 처음 사용할 때 생성됩니다.
+    """
+    global _image_executor
+    if _image_executor is None:
+        _image_executor = ProcessPoolExecutor(
+            max_workers=settings.IMAGE_PROCESS_WORKERS,
+            initializer=configure_image_decoding,
+            initargs=(settings.IMAGE_MAX_PIXELS,),
+        )
+    return _image_executor
+
+
+def shutdown_image_executor():
+    global _image_executor
+    if _image_executor is not None:
+        _image_executor.shutdown(wait=False, cancel_futures=True)
+        _image_executor = None
+
+
+async def compute_perceptual_hash(image_content):
+    """
+    프로세스 풀에서 이미지의 perceptual hash를 계산합니다.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_image_executor(), perceptual_hash, image_content)
+
+
+async def compress_image_to_base64(image_content):
+    """
+    이벤트 루프를 막지 않도록 이미지 디코딩/리사이즈/인코딩을 프로세스 풀에서 실행합니다.
+    """
+    loop = asyncio.get_running_loop()
+    image_data = await loop.run_in_executor(
+        get_image_executor(),
+        partial(
+            encode_image,
+            image_content,
+            max_dimension=settings.IMAGE_MAX_DIMENSION,
+            target_bytes=settings.IMAGE_TARGET_BYTES,
+            output_format=settings.IMAGE_OUTPUT_FORMAT,
+        ),
+    )
+    print(f"이미지 인코딩 완료: {image_data['width']}x{image_data['height']}, "
+          f"{image_data['output_bytes']} bytes, {image_data['encode_ms']} ms")
+    return image_data
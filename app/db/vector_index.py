@@ -0,0 +1,70 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.ai.embedding import EMBEDDING_DIM
+
+
+class LabelVectorIndex:
+    """
+    하나의 label에 속한 노드 임베딩을 연속된 float32 행렬로 보관하고
+    행렬 곱 한 번으로 코사인 유사도 top-k를 계산하는 인덱스
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._matrix = np.zeros((capacity, EMBEDDING_DIM), dtype=np.float32)
+        self._uuids: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._uuids)
+
+    def upsert(self, uuid: str, vector: np.ndarray) -> None:
+        position = self._positions.get(uuid)
+        if position is None:
+            position = len(self._uuids)
+            if position == self._matrix.shape[0]:
+                grown = np.zeros((self._matrix.shape[0] * 2, EMBEDDING_DIM), dtype=np.float32)
+                grown[:position] = self._matrix
+                self._matrix = grown
+            self._uuids.append(uuid)
+            self._positions[uuid] = position
+        self._matrix[position] = vector
+
+    def remove(self, uuid: str) -> None:
+        """
+        마지막 행을 삭제된 자리로 옮겨서 행렬을 연속적으로 유지합니다.
+        """
+        position = self._positions.pop(uuid, None)
+        if position is None:
+            return
+        last = len(self._uuids) - 1
+        if position != last:
+            moved_uuid = self._uuids[last]
+            self._matrix[position] = self._matrix[last]
+            self._uuids[position] = moved_uuid
+            self._positions[moved_uuid] = position
+        self._uuids.pop()
+
+    def search(
+        self,
+        vector: np.ndarray,
+        top_k: int,
+        min_score: float = 0.0,
+        exclude_uuid: Optional[str] = None,
+    ) -> List[Tuple[str, float]]:
+        size = len(self._uuids)
+        if size == 0 or top_k <= 0:
+            return []
+
+        scores = self._matrix[:size] @ vector
+        if exclude_uuid in self._positions:
+            scores[self._positions[exclude_uuid]] = -np.inf
+
+        k = min(top_k, size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (self._uuids[position], float(scores[position]))
+            for position in top
+            if scores[position] > min_score
+        ]
@@ -1,10 +1,18 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.protected import collections, users, ai, nodes as protected_nodes_router, notes as protected_notes_router
 from app.config import settings
+from app.core.middleware import UploadSizeLimitMiddleware
 from app.api import auth, nodes
+from app.ai.chains import build_chains, warmup_llm_client
+from app.ai.ingest import ingest_workers
 from app.db.base import Base, engine, driver
+from app.db.graph_schema import bootstrap_graph_schema
+from app.db.session import graph_pool_stats, warmup_db_pools
+from app.db.util.utilities import configure_image_decoding, shutdown_image_executor
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
 import firebase_admin
 from firebase_admin import credentials
 import os
@@ -20,15 +28,48 @@ def startup_event():
             print("Firebase initialized successfully")
     else:
         print("Firebase already initialized")
+
+    configure_image_decoding(settings.IMAGE_MAX_PIXELS)
+
+    build_chains()
+
+
+async def graph_schema_event():
+    try:
+        labels = await bootstrap_graph_schema()
+        print(f"Graph schema ensured for {len(labels)} labels")
+    except Exception as e:
+        print(f"Graph schema bootstrap failed: {str(e)}")
+
+
+async def warmup_event():
+    try:
+        await warmup_db_pools()
+        print("DB connection pools warmed up")
+    except Exception as e:
+        print(f"DB warm-up failed: {str(e)}")
+
+    try:
+        await warmup_llm_client()
+        print("Anthropic client warmed up")
+    except Exception as e:
+        print(f"Anthropic client warm-up failed: {str(e)}")
     
-def shutdown_event():
-    driver.close()
+async def shutdown_event():
+    await driver.close()
+    shutdown_image_executor()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     startup_event()
+    if settings.GRAPH_SCHEMA_BOOTSTRAP_ON_STARTUP:
+        await graph_schema_event()
+    if settings.WARMUP_ON_STARTUP:
+        await warmup_event()
+    ingest_workers.start()
     yield
-    shutdown_event()
+    await ingest_workers.stop()
+    await shutdown_event()
 
 # SQLAlchemy 테이블 생성
 Base.metadata.create_all(bind=engine)
@@ -41,6 +82,13 @@ app = FastAPI(
 )
 
 
+# 이미지 업로드 크기 제한 (multipart 헤더 등을 위한 여유분 포함)
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    paths=[f"{settings.API_V1_STR}/ai/analyze_image"],
+    max_bytes=settings.IMAGE_MAX_UPLOAD_BYTES + 64 * 1024,
+)
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -68,6 +116,15 @@ async def root():
 async def health_check():
     return {"status": "ok"}
 
+@app.get("/health-check/graph-pool")
+async def graph_pool_health_check(
+    token_data: TokenData = Depends(get_current_user),
+):
+    """
+    graph db 세션 수와 커넥션 풀 사용량 (드라이버 내부 상태를 노출하므로 인증된 사용자만 조회할 수 있습니다)
+    """
+    return graph_pool_stats()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Integer, JSON, String, Text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String(36), primary_key=True)
+    user_uid = Column(String, index=True, nullable=False)
+    label = Column(String, nullable=False)
+    title = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+
+    # queued / running / succeeded / failed
+    status = Column(String(16), index=True, nullable=False, default="queued")
+    # 마지막으로 완료된 단계 (재시도 시 다음 단계부터 실행)
+    stage = Column(String(32), nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    available_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, JSON, String, Text
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class SummaryCache(Base):
+    __tablename__ = "summary_cache"
+
+    key = Column(String(64), primary_key=True)
+    summary = Column(Text, nullable=False)
+    entities = Column(JSON, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
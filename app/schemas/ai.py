@@ -2,7 +2,7 @@ from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional
 from pydantic import BaseModel, Field, Json
-from typing import List, Optional,Dict, Any
+from typing import List, Literal, Optional,Dict, Any
 
 from app.schemas.node import BaseNode, NodeInDB, RelationshipModel
 
@@ -13,6 +13,8 @@ class TextProcessRequest(BaseModel):
 class GetRelatedNodesRequest(BaseModel):
     label: str
     node: BaseNode
+    mode: Literal["index", "vector", "llm"] = Field(default="index", description="index: 로컬 역색인 검색, vector: 임베딩 유사도 검색, llm: AI가 생성한 Cypher 쿼리로 검색")
+    top_k: Optional[int] = Field(default=None, description="index/vector 모드에서 반환할 최대 노드 수")
 
 class CreateSingleNode(BaseModel):
     title: str
@@ -23,6 +25,7 @@ class UpdateSingleNode(BaseModel):
     node: BaseNode
     summary: str = Field(description="노드 요약")
     entities: List[str] = Field(description="노드에 포함된 엔티티 목록")
+    merge_mode: Literal["auto", "local", "llm"] = Field(default="auto", description="auto: 내용이 크게 다를 때만 AI로 병합, local: 로컬 병합, llm: 항상 AI로 병합")
 class CreateNodeResponse(NodeInDB):
     pass
 
@@ -35,24 +38,53 @@ class CreateNodeRelationRequest(BaseModel):
 class CreateNodeRelationResponse(BaseModel):
     relations: List[RelationshipModel]
 
-class CreateNodeRequest(BaseModel):
+class IngestRequest(BaseModel):
     label: str
     title: str
-    summary: str
-    entities: List[str]
-    related_nodes: List[BaseNode]
+    text: str
+
+class IngestJobResponse(BaseModel):
+    id: str = Field(description="ingest job id")
+    status: Literal["queued", "running", "succeeded", "failed"]
+    stage: Optional[str] = Field(default=None, description="마지막으로 완료된 단계 (summarize, create_node, related_nodes, create_relations)")
+    attempts: int
+    result: Optional[Dict[str, Any]] = Field(default=None, description="단계별 결과 (summary, entities, node, related_nodes, relations)")
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
 
 class SummarizedText(BaseModel): 
     summary: str = Field(description="메모 내용 요약")
     entities: List[str] = Field(description="메모에서 확인된 주요 엔티티들의 목록과 그 속성")
     
 
+class BatchTextProcessRequest(BaseModel):
+    items: List[TextProcessRequest]
+
+class BatchSummarizeItem(BaseModel):
+    index: int = Field(description="요청 items에서의 위치")
+    result: Optional[SummarizedText] = None
+    error: Optional[str] = None
+
+class BatchSummarizeResponse(BaseModel):
+    results: List[BatchSummarizeItem]
+    
+
 class Neo4jCipherQuery(BaseModel):
     query: str  = Field(description="Neo4j Cypher 쿼리 문자열")
     query_params: Json = Field(description="쿼리 파라미터를 포함하는 JSON 객체")
 
-class RawNeo4jCipherQuery(BaseModel):
-    query: str= Field(description="Neo4j Cypher 쿼리 문자열")
+RelationType = Literal["REFERS_TO", "REFERENCED_BY", "RELATED_TO", "PARENT_OF", "CHILD_OF"]
+
+class RelationChoice(BaseModel):
+    related_uuid: str = Field(description="관계를 맺을 연관 노드의 uuid")
+    relation_type: RelationType = Field(description="타겟 노드에서 연관 노드 방향의 관계 유형")
+
+class RelationChoices(BaseModel):
+    relations: List[RelationChoice] = Field(description="연관 노드별 관계 유형 목록")
 
 
 class ImageDescription(BaseModel):
@@ -63,6 +95,8 @@ class ImageDescription(BaseModel):
 class QueryRequest(BaseModel):
     label: str
     question: str
+    mode: Literal["vector", "fulltext", "llm"] = Field(default="vector", description="vector: 임베딩 유사도 검색, fulltext: full-text 인덱스 검색, llm: AI가 생성한 Cypher 쿼리로 검색")
+    top_k: Optional[int] = Field(default=None, description="vector/fulltext 모드에서 답변에 사용할 최대 노드 수")
     # language_tag: str
 
 class AnswerModel(BaseModel):
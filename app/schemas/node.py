@@ -2,9 +2,9 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
-from neo4j import Session
 
 class RelationshipModel(BaseModel):
+    id: Optional[str] = Field(default=None, description="relation의 element id")
     type: Optional[str]
     properties: Dict[str, Any]
     source: str
@@ -20,6 +20,16 @@ class NodeInDB(BaseNode):
     createdAt: Optional[datetime] = Field(description="노드 생성일")
     updatedAt: Optional[datetime] = Field(description="노드 수정일")
 
+class NodeSearchResult(NodeInDB):
+    score: float = Field(description="full-text 검색 점수 (Lucene)")
+
+class NodeSearchResponse(BaseModel):
+    nodes: List[NodeSearchResult]
+    skip: int
+    limit: int
+
 class NodesWithRelationshipsResponse(BaseModel):
     nodes: List[NodeInDB]
-    relations: List[RelationshipModel]
\ No newline at end of file
+    relations: List[RelationshipModel]
+    neighbors: List[NodeInDB] = Field(default_factory=list, description="relations에 포함된 다른 label의 이웃 노드")
+    next_cursor: Optional[str] = Field(default=None, description="다음 페이지 cursor (relation이 남았으면 같은 노드들의 나머지 relation, 마지막 페이지이면 null)")
\ No newline at end of file
@@ -0,0 +1,489 @@
+"""
+HTTP 부하 벤치마크.
+
+app.main:app을 외부 서비스 대신 로컬 대체물에 연결하여 실행하고,
+여러 라우트를 섞은 트래픽을 보내 라우트별 지연 시간 백분위수(p50/p90/p99),
+처리량, 오류율을 JSON으로 출력합니다.
+
+- SQL db: 임시 SQLite 파일 (--database-url로 로컬 Postgres 지정 가능)
+- graph db: 로컬 Neo4j (--neo4j-url). 연결할 수 없으면 graph db를 사용하는 라우트는 제외됩니다.
+- Firebase: signInWithPassword 응답을 흉내 내는 stub 서버 (--firebase-latency-ms)
+- Claude: 모든 모델 tier를 대신하는, 프롬프트의 출력 형식에 맞춰 고정된 응답을 돌려주는 가짜 모델 (--llm-latency-ms)
+
+stub 서버, API 서버, 부하 생성기는 서로의 측정에 영향을 주지 않도록 각각 별도 프로세스에서 실행됩니다.
+
+    python -m benchmarks.http_load --duration 30 --concurrency 32 --output bench_http.json
+    python -m benchmarks.http_load --mix nodes=1 collections=1 --llm-latency-ms 800
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+API_V1_STR = "/api/v1"
+
+# 라우트 이름 -> 기본 가중치
+DEFAULT_MIX = {
+    "nodes": 4,
+    "collections": 3,
+    "query": 1,
+    "summarize": 1,
+    "signin": 1,
+}
+
+# graph db가 필요한 라우트
+GRAPH_ROUTES = {"nodes", "query"}
+
+ROUTE_NAMES = {
+    "nodes": "GET /nodes/{label}",
+    "collections": "GET /collection/",
+    "query": "POST /ai/query",
+    "summarize": "POST /ai/summarize",
+    "signin": "POST /auth/signin",
+}
+
+SAMPLE_WORDS = (
+    "그래프 데이터베이스 메모 요약 엔티티 관계 질문 답변 회의 일정 프로젝트 출시 "
+    "성능 지연 캐시 인덱스 검색 노드 사용자 컬렉션 이미지 분석 결과 계획 리뷰"
+).split()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def firebase_uid(email):
+    return hashlib.sha1(email.encode("utf-8")).hexdigest()[:28]
+
+
+def user_email(index):
+    return f"bench-user-{index}@example.com"
+
+
+def sample_text(rng, words):
+    return " ".join(rng.choice(SAMPLE_WORDS) for _ in range(words))
+
+
+def percentile(sorted_values, p):
+    """
+    nearest-rank 백분위수
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+# ---------------------------------------------------------------------------
+# Firebase stub
+# ---------------------------------------------------------------------------
+
+def _serve_firebase_stub(port, latency_ms):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            time.sleep(latency_ms / 1000)
+            email = body.get("email", "")
+            response = json.dumps({
+                "localId": firebase_uid(email),
+                "email": email,
+                "idToken": "stub-id-token",
+                "registered": True,
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer(("127.0.0.1", port), Handler).serve_forever()
+
+
+# ---------------------------------------------------------------------------
+# API 서버
+# ---------------------------------------------------------------------------
+
+def _fake_chat_model(latency_ms, label):
+    """
+    claude_llm 대신 사용할 결정적인 가짜 채팅 모델.
+    프롬프트에 포함된 출력 형식(format instructions)을 보고 파싱 가능한 응답을 만듭니다.
+    """
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    def respond(messages):
+        prompt = "\n".join(str(message.content) for message in messages)
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        if '"query_params"' in prompt:
+            return json.dumps({
+                "query": f"MATCH (n:{label}) RETURN n LIMIT 10",
+                "query_params": "{}",
+            })
+        if '"related_uuid"' in prompt:
+            return json.dumps({"relations": []})
+        if '"answer"' in prompt:
+            return json.dumps({"answer": f"벤치마크 답변 {digest}"})
+        if '"entities"' in prompt:
+            return json.dumps({
+                "summary": f"벤치마크 요약 {digest}",
+                "entities": ["벤치마크", digest],
+            })
+        return f"벤치마크 응답 {digest} 입니다."
+
+    def message(messages):
+        content = respond(messages)
+        prompt_chars = sum(len(str(message.content)) for message in messages)
+        usage = {"input_tokens": prompt_chars // 4, "output_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["input_tokens"] + usage["output_tokens"]
+        return AIMessage(content=content, usage_metadata=usage)
+
+    class BenchmarkChatModel(BaseChatModel):
+        model: str = "benchmark-fake"
+
+        @property
+        def _llm_type(self):
+            return "benchmark-fake"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            time.sleep(latency_ms / 1000)
+            return ChatResult(generations=[ChatGeneration(message=message(messages))])
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(latency_ms / 1000)
+            return ChatResult(generations=[ChatGeneration(message=message(messages))])
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            words = respond(messages).split(" ")
+            for i, word in enumerate(words):
+                await asyncio.sleep(latency_ms / 1000 / len(words))
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word if i == 0 else f" {word}"))
+
+    return BenchmarkChatModel()
+
+
+def _register_sqlite_functions(engine):
+    """
+    SQLite에는 없는 Postgres 함수(now, timezone)를 등록하여
+    server_default가 그대로 동작하도록 합니다.
+    """
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "connect")
+    def register(dbapi_connection, connection_record):
+        dbapi_connection.create_function("now", 0, lambda: time.strftime("%Y-%m-%d %H:%M:%S"))
+        dbapi_connection.create_function("timezone", 2, lambda zone, value: value)
+
+
+def _seed_users(count):
+    """
+    /auth/signup은 Firebase Admin SDK를 사용하므로, 벤치마크 사용자는 db에 직접 만들어 둡니다.
+    로그인은 stub 서버를 거쳐 같은 firebase uid로 연결됩니다.
+    """
+    from app.db.base import SessionLocal
+    from app.models.user import User
+
+    db = SessionLocal()
+    try:
+        for i in range(count):
+            email = user_email(i)
+            if db.query(User).filter(User.email == email).first() is None:
+                db.add(User(email=email, firebase_uid=firebase_uid(email), is_active=True))
+        db.commit()
+    finally:
+        db.close()
+
+
+def _serve_api(port, options):
+    os.environ.update({
+        "DATABASE_URL": options["database_url"],
+        "NEO4J_URL": options["neo4j_url"],
+        "NEO4J_USER": options["neo4j_user"],
+        "NEO4J_PASSWORD": options["neo4j_password"],
+        "FIREBASE_AUTH_URL": options["firebase_url"],
+        "FIREBASE_CREDENTIALS_PATH": os.path.join(tempfile.gettempdir(), "benchmark-no-firebase-credentials.json"),
+        "ANTHROPIC_API_KEY": "benchmark",
+        "WARMUP_ON_STARTUP": "false",
+    })
+
+    # 체인 모듈들이 모델을 import하기 전에 모든 tier의 모델을 가짜 모델로 교체
+    import app.ai.model
+    fake_llm = _fake_chat_model(options["llm_latency_ms"], options["label"])
+    app.ai.model.claude_llm = fake_llm
+    app.ai.model.get_llm = lambda *args, **kwargs: fake_llm
+
+    if options["database_url"].startswith("sqlite"):
+        from app.db.base import engine
+        _register_sqlite_functions(engine)
+
+    import uvicorn
+    from app.main import app
+    _seed_users(options["users"])
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+# ---------------------------------------------------------------------------
+# 부하 생성
+# ---------------------------------------------------------------------------
+
+def graph_available(options):
+    from neo4j import GraphDatabase
+
+    try:
+        with GraphDatabase.driver(options["neo4j_url"], auth=(options["neo4j_user"], options["neo4j_password"])) as driver:
+            driver.verify_connectivity()
+        return True
+    except Exception as e:
+        print(f"graph db에 연결할 수 없어 graph 라우트를 제외합니다: {e}", file=sys.stderr)
+        return False
+
+
+async def wait_until_ready(client, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get("/health-check")
+            if response.status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("API 서버가 시작되지 않았습니다.")
+
+
+async def signin(client, email):
+    response = await client.post(f"{API_V1_STR}/auth/signin", json={"email": email, "password": "benchmark"})
+    if response.status_code != 200:
+        raise RuntimeError(f"로그인 실패 ({response.status_code}): {response.text}")
+    return response.json()["access_token"]
+
+
+async def seed(client, args, use_graph):
+    """
+    사용자, collection, 노드를 미리 만들어 두고 사용자별 access token을 반환
+    """
+    rng = random.Random(args.seed)
+    tokens = []
+    for i in range(args.users):
+        token = await signin(client, user_email(i))
+        headers = {"Authorization": f"Bearer {token}"}
+        for j in range(args.collections_per_user):
+            response = await client.post(
+                f"{API_V1_STR}/collection/create",
+                json={"title": f"collection {j}", "description": sample_text(rng, 8)},
+                headers=headers,
+            )
+            response.raise_for_status()
+        tokens.append(token)
+
+    if use_graph:
+        headers = {"Authorization": f"Bearer {tokens[0]}"}
+        for i in range(args.seed_nodes):
+            response = await client.post(
+                f"{API_V1_STR}/nodes/{args.label}",
+                json={
+                    "title": f"bench node {i} {sample_text(rng, 2)}",
+                    "summary": sample_text(rng, 30),
+                    "entities": [rng.choice(SAMPLE_WORDS) for _ in range(4)],
+                },
+                headers=headers,
+            )
+            response.raise_for_status()
+    return tokens
+
+
+def build_request(route, rng, args, tokens):
+    headers = {"Authorization": f"Bearer {rng.choice(tokens)}"}
+    if route == "nodes":
+        return "GET", f"{API_V1_STR}/nodes/{args.label}", None, headers
+    if route == "collections":
+        return "GET", f"{API_V1_STR}/collection/", None, headers
+    if route == "query":
+        return "POST", f"{API_V1_STR}/ai/query", {"label": args.label, "question": sample_text(rng, 6)}, headers
+    if route == "summarize":
+        # 일부 요청은 같은 본문을 반복하여 요약 캐시 적중도 함께 측정됩니다.
+        text = sample_text(random.Random(rng.randrange(args.summarize_unique_texts)), 60)
+        return "POST", f"{API_V1_STR}/ai/summarize", {"title": "benchmark", "text": text}, headers
+    return "POST", f"{API_V1_STR}/auth/signin", {"email": user_email(rng.randrange(args.users)), "password": "benchmark"}, {}
+
+
+async def virtual_user(client, worker_id, mix, args, tokens, deadline, samples):
+    rng = random.Random(args.seed * 1000 + worker_id)
+    routes, weights = zip(*mix.items())
+    while time.monotonic() < deadline:
+        route = rng.choices(routes, weights)[0]
+        method, url, body, headers = build_request(route, rng, args, tokens)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, json=body, headers=headers)
+            status = response.status_code
+        except Exception as e:
+            status = type(e).__name__
+        samples.append((route, status, (time.perf_counter() - start) * 1000))
+
+
+def summarize_samples(samples, elapsed):
+    by_route = {}
+    for route, status, latency in samples:
+        by_route.setdefault(route, []).append((status, latency))
+
+    def stats(entries):
+        latencies = sorted(latency for _, latency in entries)
+        status_codes = {}
+        errors = 0
+        for status, _ in entries:
+            status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+            if not isinstance(status, int) or status >= 400:
+                errors += 1
+        return {
+            "requests": len(entries),
+            "throughput_rps": round(len(entries) / elapsed, 2),
+            "error_rate": round(errors / len(entries), 4),
+            "status_codes": status_codes,
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies), 2),
+                "p50": round(percentile(latencies, 50), 2),
+                "p90": round(percentile(latencies, 90), 2),
+                "p99": round(percentile(latencies, 99), 2),
+                "max": round(latencies[-1], 2),
+            },
+        }
+
+    return {
+        "overall": stats([(status, latency) for _, status, latency in samples]) if samples else None,
+        "routes": {ROUTE_NAMES[route]: stats(entries) for route, entries in sorted(by_route.items())},
+    }
+
+
+async def drive(args, mix, use_graph, base_url):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.request_timeout) as client:
+        await wait_until_ready(client, args.startup_timeout)
+        tokens = await seed(client, args, use_graph)
+
+        if args.warmup > 0:
+            await asyncio.gather(*(
+                virtual_user(client, -1 - i, mix, args, tokens, time.monotonic() + args.warmup, [])
+                for i in range(args.concurrency)
+            ))
+
+        samples = []
+        start = time.monotonic()
+        await asyncio.gather(*(
+            virtual_user(client, i, mix, args, tokens, start + args.duration, samples)
+            for i in range(args.concurrency)
+        ))
+        return summarize_samples(samples, time.monotonic() - start)
+
+
+def parse_mix(values):
+    if not values:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for value in values:
+        route, _, weight = value.partition("=")
+        if route not in ROUTE_NAMES:
+            raise SystemExit(f"알 수 없는 라우트: {route} (가능한 값: {', '.join(ROUTE_NAMES)})")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30, help="측정 시간 (초)")
+    parser.add_argument("--warmup", type=float, default=3, help="측정 전 워밍업 시간 (초)")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시에 요청을 보내는 가상 사용자 수")
+    parser.add_argument("--mix", nargs="*", help="라우트별 가중치 (예: nodes=4 collections=3 query=1 summarize=1 signin=1)")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--collections-per-user", type=int, default=5)
+    parser.add_argument("--seed-nodes", type=int, default=200)
+    parser.add_argument("--summarize-unique-texts", type=int, default=50)
+    parser.add_argument("--label", default="Benchmark")
+    parser.add_argument("--llm-latency-ms", type=float, default=500)
+    parser.add_argument("--firebase-latency-ms", type=float, default=50)
+    parser.add_argument("--database-url", help="기본: 임시 SQLite 파일")
+    parser.add_argument("--neo4j-url", default="bolt://localhost:7687")
+    parser.add_argument("--neo4j-user", default="neo4j")
+    parser.add_argument("--neo4j-password", default="password")
+    parser.add_argument("--request-timeout", type=float, default=60)
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON을 저장할 경로 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    workdir = tempfile.mkdtemp(prefix="memoria-bench-")
+    firebase_port, api_port = free_port(), free_port()
+    options = {
+        "database_url": args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "neo4j_url": args.neo4j_url,
+        "neo4j_user": args.neo4j_user,
+        "neo4j_password": args.neo4j_password,
+        "firebase_url": f"http://127.0.0.1:{firebase_port}/v1/accounts:signInWithPassword",
+        "llm_latency_ms": args.llm_latency_ms,
+        "label": args.label,
+        "users": args.users,
+    }
+
+    use_graph = any(route in GRAPH_ROUTES for route in mix) and graph_available(options)
+    skipped = sorted(ROUTE_NAMES[route] for route in mix if route in GRAPH_ROUTES and not use_graph)
+    mix = {route: weight for route, weight in mix.items() if use_graph or route not in GRAPH_ROUTES}
+    if not mix:
+        raise SystemExit("실행할 라우트가 없습니다.")
+
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(target=_serve_firebase_stub, args=(firebase_port, args.firebase_latency_ms), daemon=True),
+        context.Process(target=_serve_api, args=(api_port, options), daemon=True),
+    ]
+    for process in processes:
+        process.start()
+
+    try:
+        result = asyncio.run(drive(args, mix, use_graph, f"http://127.0.0.1:{api_port}"))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+
+    report = json.dumps({
+        "options": {
+            "duration_seconds": args.duration,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "llm_latency_ms": args.llm_latency_ms,
+            "firebase_latency_ms": args.firebase_latency_ms,
+            "database": options["database_url"].split(":", 1)[0],
+            "graph_db": args.neo4j_url if use_graph else None,
+            "seed_nodes": args.seed_nodes if use_graph else 0,
+            "skipped_routes": skipped,
+        },
+        **result,
+    }, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
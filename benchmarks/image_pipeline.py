@@ -0,0 +1,124 @@
+"""
+이미지 인코딩 파이프라인 벤치마크.
+
+합성한 큰 사진(JPEG/PNG)을 encode_image로 처리하면서 이미지별로
+인코딩 시간, 출력 크기, 최대 RSS를 측정하고 JSON으로 출력합니다.
+최대 RSS를 이미지별로 분리하기 위해 각 측정은 새 프로세스에서 실행됩니다.
+비교를 위해 전체 해상도로 디코딩만 하는 경우(full_decode)도 함께 측정합니다.
+
+    python -m benchmarks.image_pipeline --megapixels 12 40 --output bench_image.json
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+from PIL import Image
+
+
+def make_photo(megapixels, image_format):
+    """
+    압축이 잘 되지 않는 사진과 비슷한 노이즈 이미지
+    """
+    width = int((megapixels * 1_000_000 * 4 / 3) ** 0.5)
+    height = int(width * 3 / 4)
+    img = Image.effect_noise((width // 4, height // 4), 60).resize((width, height), Image.BILINEAR)
+    img = Image.merge("RGB", (img, img.rotate(90, expand=False), img.transpose(Image.FLIP_LEFT_RIGHT)))
+    buffered = io.BytesIO()
+    if image_format == "JPEG":
+        img.save(buffered, format="JPEG", quality=92)
+    else:
+        img.save(buffered, format=image_format)
+    return buffered.getvalue()
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 bytes 단위
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _run_case(mode, image_content, options, queue):
+    try:
+        queue.put(_measure(mode, image_content, options))
+    except Exception as e:
+        queue.put({"error": f"{type(e).__name__}: {e}"})
+
+
+def _measure(mode, image_content, options):
+    from app.db.util.utilities import encode_image
+
+    baseline_rss = _peak_rss_bytes()
+    start = time.perf_counter()
+    if mode == "full_decode":
+        img = Image.open(io.BytesIO(image_content))
+        img.load()
+        result = {"width": img.width, "height": img.height, "output_bytes": None}
+    else:
+        result = encode_image(image_content, **options)
+        result.pop("base64_image")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        **result,
+        "elapsed_ms": round(elapsed_ms, 2),
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "peak_rss_delta_bytes": _peak_rss_bytes() - baseline_rss,
+    }
+
+
+def run_case(mode, image_content, options):
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_run_case, args=(mode, image_content, options, queue))
+    process.start()
+    try:
+        return queue.get(timeout=600)
+    finally:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[12, 40])
+    parser.add_argument("--formats", nargs="+", default=["JPEG", "PNG"])
+    parser.add_argument("--max-dimension", type=int, default=1568)
+    parser.add_argument("--target-bytes", type=int, default=1024 * 1024)
+    parser.add_argument("--output-format", default="JPEG")
+    parser.add_argument("--output", help="결과 JSON을 저장할 경로 (기본: 표준 출력)")
+    args = parser.parse_args()
+
+    options = {
+        "max_dimension": args.max_dimension,
+        "target_bytes": args.target_bytes,
+        "output_format": args.output_format,
+    }
+
+    results = []
+    for megapixels in args.megapixels:
+        for image_format in args.formats:
+            image_content = make_photo(megapixels, image_format)
+            for mode in ("full_decode", "encode_image"):
+                result = run_case(mode, image_content, options)
+                result.update({
+                    "mode": mode,
+                    "input_format": image_format,
+                    "input_megapixels": megapixels,
+                    "input_bytes": len(image_content),
+                })
+                results.append(result)
+                print(json.dumps(result), file=sys.stderr)
+
+    report = json.dumps({"options": options, "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
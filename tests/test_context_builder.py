@@ -0,0 +1,61 @@
+import json
+from app.ai.context_builder import build_answer_context, estimate_tokens
+
+
+def node(title, summary, entities=()):
+    return {"uuid": title, "title": title, "summary": summary, "entities": list(entities), "createdAt": "x"}
+
+
+def titles(context):
+    return [n["title"] for n in context["nodes"]]
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("그래프") == 2
+
+
+def test_nodes_are_ordered_by_relevance_and_trimmed_to_fields():
+    nodes = [
+        node("Cooking", "Pasta recipes for dinner."),
+        node("Graph database", "Neo4j stores graph data.", ["Neo4j"]),
+    ]
+    context = build_answer_context("What is a graph database?", nodes, token_budget=1000, dedup_threshold=0.8)
+
+    assert titles(context) == ["Graph database", "Cooking"]
+    assert set(context["nodes"][0]) == {"title", "summary", "entities"}
+
+
+def test_near_duplicate_summaries_are_dropped():
+    nodes = [
+        node("Graph database", "Neo4j stores graph data in nodes."),
+        node("Graph DB", "Neo4j stores graph data in nodes!"),
+        node("Graph theory", "Vertices and edges form a graph."),
+    ]
+    context = build_answer_context("graph", nodes, token_budget=1000, dedup_threshold=0.8)
+
+    assert len({"Graph database", "Graph DB"} & set(titles(context))) == 1
+    assert "Graph theory" in titles(context)
+    assert context["included_nodes"] == 2
+    assert context["dropped_nodes"] == 1
+
+
+def test_token_budget_is_respected():
+    nodes = [node(f"Graph {i}", f"Summary number {i} about graphs.") for i in range(10)]
+    cost = estimate_tokens(json.dumps({"title": "Graph 0", "summary": "Summary number 0 about graphs.", "entities": []}))
+
+    context = build_answer_context("graph", nodes, token_budget=cost * 3, dedup_threshold=1.1)
+
+    assert context["included_nodes"] == 3
+    assert context["context_tokens"] <= cost * 3
+    assert context["dropped_nodes"] == 7
+
+
+def test_empty_nodes():
+    assert build_answer_context("graph", [], token_budget=100, dedup_threshold=0.8) == {
+        "nodes": [],
+        "included_nodes": 0,
+        "dropped_nodes": 0,
+        "context_tokens": 0,
+    }
@@ -0,0 +1,105 @@
+import asyncio
+import pytest
+from app.ai.cypher_validation import CypherValidationError, check_cypher
+from app.config import settings
+from app.db.graph import run_read_query
+
+
+def test_accepts_read_query_with_limit():
+    check_cypher("MATCH (n:Note) WHERE n.title CONTAINS $q RETURN n LIMIT 10", "Note", {"q": "graph"})
+
+
+def test_accepts_keywords_in_properties_strings_and_map_keys():
+    check_cypher(
+        """
+        MATCH (n:Note {create: true})-[:MERGE]-(m:Note)
+        WHERE n.set = 'merge' AND n.`delete` IS NULL AND m.create <> "SET n.x = 1" AND n.remove = $set
+        RETURN n, m.drop AS drop_value
+        LIMIT 5
+        """,
+        "Note",
+        {"set": 1},
+    )
+
+
+@pytest.mark.parametrize("query", [
+    "RETURN date.truncate('month', date()) AS d, n LIMIT 1",
+    "RETURN duration.between(n.createdAt, datetime()).days AS days, n LIMIT 1",
+    "RETURN point.distance(point({x: 0, y: 0}), point({x: 1, y: 1})) AS d, n LIMIT 1",
+    "RETURN datetime.truncate('day', n.updatedAt) AS d, duration.inDays(date(), date()) AS x, n LIMIT 1",
+    "RETURN apoc.text.sorensenDiceSimilarity(n.title, $q) AS score, n LIMIT 1",
+])
+def test_accepts_builtin_temporal_and_allowed_functions(query):
+    check_cypher(f"MATCH (n:Note) {query}", "Note", {"q": "graph"})
+
+
+@pytest.mark.parametrize("query, message", [
+    ("MATCH (n:Note) SET n.title = 'x' RETURN n LIMIT 1", "SET"),
+    ("MATCH (n:Note) CREATE (m:Note) RETURN n LIMIT 1", "CREATE"),
+    ("MATCH (n:Note) DETACH DELETE n", "DETACH"),
+    ("MATCH (n:Note) RETURN n", "LIMIT"),
+    ("MATCH (n:Note) RETURN n LIMIT 100000", "LIMIT"),
+    ("MATCH (n:Note) RETURN n LIMIT $limit", "LIMIT"),
+    ("MATCH (n:Note), (m:Person) RETURN n LIMIT 1", "Person"),
+    ("MATCH (m:Person) RETURN m LIMIT 1", "Note"),
+    ("MATCH (n:Note) CALL apoc.cypher.run('MATCH (x) RETURN x', {}) YIELD value RETURN n LIMIT 1", "apoc.cypher.run"),
+    ("MATCH (n:Note) RETURN date.foo.bar(n) LIMIT 1", "date.foo.bar"),
+    ("MATCH (n:Note) RETURN n LIMIT 1 UNION ALL CALL db.clearQueryCaches YIELD value RETURN value AS n LIMIT 1", "db.clearQueryCaches"),
+    ("MATCH (n:Note) CALL `db`.`clearQueryCaches` YIELD value RETURN n LIMIT 1", "db.clearQueryCaches"),
+    ("MATCH (n:Note), (m) RETURN m AS n LIMIT 10", "label이 없는"),
+    ("MATCH (n:Note)--() RETURN n LIMIT 10", "label이 없는"),
+    ("MATCH (`m`) RETURN m AS n LIMIT 10", "Note"),
+    ("MATCH (n:!Note) RETURN n LIMIT 10", "label 식"),
+    ("MATCH (n:Note|Person) RETURN n LIMIT 10", "label 식"),
+    ("MATCH (n:Note) RETURN n LIMIT 10 + 1000", "정수 또는"),
+    ("MATCH (n:Note) WITH n LIMIT 5 MATCH (n)--(m:Note) RETURN m AS n", "마지막 RETURN"),
+    ("MATCH (n:Note) RETURN n LIMIT 5 UNION MATCH (n:Note) RETURN n", "마지막 RETURN"),
+])
+def test_rejects_invalid_queries(query, message):
+    with pytest.raises(CypherValidationError, match=message):
+        check_cypher(query, "Note")
+
+
+def test_write_clauses_allowed_when_not_read_only():
+    check_cypher("MATCH (n:Note {uuid: $uuid}) SET n.title = $title RETURN n", "Note", read_only=False)
+    with pytest.raises(CypherValidationError, match="DELETE"):
+        check_cypher("MATCH (n:Note) DELETE n", "Note", read_only=False)
+
+
+def test_limit_parameter_is_checked(monkeypatch):
+    monkeypatch.setattr(settings, "CYPHER_MAX_LIMIT", 50)
+    check_cypher("MATCH (n:Note) RETURN n LIMIT $limit", "Note", {"limit": 50})
+    with pytest.raises(CypherValidationError, match="LIMIT"):
+        check_cypher("MATCH (n:Note) RETURN n LIMIT $limit", "Note", {"limit": 51})
+
+
+def test_accepts_reused_labeled_variable_and_inner_limit():
+    check_cypher("MATCH (n:Note) WITH n LIMIT 5 MATCH (n)--(m:Note) RETURN m AS n LIMIT 5", "Note")
+    check_cypher("MATCH (n:Note) RETURN n, count(n) AS c LIMIT $limit;", "Note", {"limit": 5})
+
+
+class FakeTransaction:
+    async def run(self, query, params):
+        async def records():
+            yield {"n": {"uuid": "u1"}}
+        return records()
+
+
+class FakeReadSession:
+    def __init__(self):
+        self.read_calls = 0
+
+    async def execute_read(self, work):
+        self.read_calls += 1
+        return await work(FakeTransaction())
+
+    async def run(self, query, params=None):
+        raise AssertionError("생성된 쿼리는 읽기 트랜잭션에서 실행되어야 합니다.")
+
+
+def test_generated_queries_run_in_read_transaction():
+    session = FakeReadSession()
+    records = asyncio.run(run_read_query(session, "MATCH (n:Note) RETURN n LIMIT 1", {}))
+
+    assert records == [{"n": {"uuid": "u1"}}]
+    assert session.read_calls == 1
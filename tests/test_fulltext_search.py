@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from neo4j.exceptions import Neo4jError
+from neo4j.time import DateTime
+from app.api.protected import nodes
+from app.db.graph import FulltextIndexUnavailable, fulltext_query, search_graph_nodes
+from app.db.session import get_neo4j
+from app.dependencies import get_current_user
+
+
+class FakeNode(dict):
+    pass
+
+
+class FakeResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        async def records():
+            for record in self._records:
+                yield record
+        return records()
+
+
+class FakeSession:
+    def __init__(self, records=(), error=None):
+        self.records = list(records)
+        self.error = error
+        self.params = []
+
+    async def run(self, query, params=None):
+        self.params.append(params)
+        if self.error is not None:
+            raise self.error
+        return FakeResult(self.records)
+
+
+def missing_index_error():
+    return Neo4jError._hydrate_neo4j(
+        code="Neo.ClientError.Procedure.ProcedureCallFailed",
+        message="There is no such fulltext schema index: Note_fulltext",
+    )
+
+
+def test_fulltext_query_adds_prefix_for_last_term():
+    assert fulltext_query("graph dat") == "graph dat dat*"
+    assert fulltext_query("graph dat", prefix=False) == "graph dat"
+    assert fulltext_query("   ") == ""
+
+
+def test_fulltext_query_escapes_lucene_syntax():
+    assert fulltext_query("a+b (c) OR title:x", prefix=False) == r"a\+b \(c\) or title\:x"
+
+
+def test_search_returns_nodes_with_score():
+    session = FakeSession([{"node": FakeNode(uuid="u1", title="Graph"), "score": 2.5}])
+    nodes_found = asyncio.run(search_graph_nodes(session, "Note", "graph", skip=0, limit=10))
+
+    assert session.params == [{"index": "Note_fulltext", "query": "graph graph*", "skip": 0, "limit": 10}]
+    assert nodes_found[0]["uuid"] == "u1"
+    assert nodes_found[0]["score"] == 2.5
+
+
+def test_blank_query_does_not_hit_graph_db():
+    session = FakeSession()
+    assert asyncio.run(search_graph_nodes(session, "Note", "  ", skip=0, limit=10)) == []
+    assert session.params == []
+
+
+def test_missing_index_raises_unavailable():
+    with pytest.raises(FulltextIndexUnavailable):
+        asyncio.run(search_graph_nodes(FakeSession(error=missing_index_error()), "Note", "graph", skip=0, limit=10))
+
+
+def client_with_session(session):
+    async def fake_neo4j():
+        yield session
+
+    app = FastAPI()
+    app.include_router(nodes.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    app.dependency_overrides[get_neo4j] = fake_neo4j
+    return TestClient(app)
+
+
+def test_search_route_returns_503_when_index_is_unavailable():
+    response = client_with_session(FakeSession(error=missing_index_error())).get("/nodes/search/Note", params={"q": "graph"})
+    assert response.status_code == 503
+
+
+class SingleResult:
+    def __init__(self, record):
+        self._record = record
+
+    async def single(self):
+        return self._record
+
+
+class NodeSession:
+    async def run(self, query, params=None):
+        created = DateTime(2024, 1, 1)
+        return SingleResult({"n": FakeNode(
+            uuid="u1", title=params["title"], summary="", entities=[], createdAt=created, updatedAt=created,
+        )})
+
+
+def test_node_titled_search_is_still_reachable():
+    response = client_with_session(NodeSession()).get("/nodes/Note/search")
+    assert response.status_code == 200
+    assert response.json()["title"] == "search"
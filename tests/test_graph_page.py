@@ -0,0 +1,169 @@
+import asyncio
+import re
+import pytest
+from app.db.graph import decode_node_cursor, encode_node_cursor, fetch_graph_page
+
+
+class FakeRelationship(dict):
+    def __init__(self, type, **properties):
+        super().__init__(**properties)
+        self.type = type
+
+
+class FakeResult:
+    def __init__(self, records):
+        self._records = records
+
+    def __aiter__(self):
+        async def records():
+            for record in self._records:
+                yield record
+        return records()
+
+
+class FakeGraphSession:
+    """
+    fetch_graph_page의 두 쿼리를 메모리의 그래프로 흉내냅니다.
+    nodes는 {uuid: label}, edges는 (id, type, source, target) 목록입니다.
+    """
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+
+    def _node(self, uuid):
+        return {"uuid": uuid, "title": uuid}
+
+    async def run(self, query, params=None):
+        label = re.search(r"MATCH \(n:(\w+)", query).group(1)
+        if "$uuids" not in query:
+            uuids = sorted(
+                uuid for uuid, node_label in self.nodes.items()
+                if node_label == label
+                and (params["after"] is None or uuid > params["after"])
+                and ("until" not in params or uuid <= params["until"])
+            )
+            if "until" in params:
+                return FakeResult([{"uuid": uuid} for uuid in uuids])
+            return FakeResult([{"n": self._node(uuid)} for uuid in uuids[:params["limit"]]])
+
+        records = []
+        for uuid in params["uuids"]:
+            for id, type, source, target in self.edges:
+                if uuid not in (source, target):
+                    continue
+                other = target if source == uuid else source
+                same_label = self.nodes[other] == label
+                if same_label and not other < uuid:
+                    continue
+                if params["relation_after"] is not None and not id > params["relation_after"]:
+                    continue
+                records.append({
+                    "id": id,
+                    "r": FakeRelationship(type),
+                    "source": source,
+                    "target": target,
+                    "neighbor": None if same_label else self._node(other),
+                    "neighbor_labels": [self.nodes[other]],
+                })
+        records.sort(key=lambda record: record["id"])
+        return FakeResult(records[:params["limit"]])
+
+
+def fetch_all_pages(session, label, limit, max_relations=100):
+    pages = []
+    cursor = None
+    while True:
+        page = asyncio.run(fetch_graph_page(session, label, cursor, limit, max_relations))
+        pages.append(page)
+        if page["next_cursor"] is None:
+            return pages
+        cursor = decode_node_cursor(page["next_cursor"])
+
+
+def test_cursor_round_trip():
+    assert decode_node_cursor(encode_node_cursor("b5f1-uuid")) == {
+        "after": "b5f1-uuid", "until": None, "relation_after": None, "more": False,
+    }
+    assert decode_node_cursor(encode_node_cursor(None, "c0", "5:abc:12", True)) == {
+        "after": None, "until": "c0", "relation_after": "5:abc:12", "more": True,
+    }
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    "bm90IGpzb24=",
+    "eyJiZWZvcmUiOiAieCJ9",
+    "eyJhZnRlciI6IDF9",
+    "eyJhZnRlciI6IG51bGx9",
+    "eyJhZnRlciI6ICJhIiwgInJlbGF0aW9uX2FmdGVyIjogInIxIn0=",
+])
+def test_decode_rejects_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_node_cursor(cursor)
+
+
+def test_pages_cover_every_node_and_relation_once():
+    nodes = {f"n{i}": "Note" for i in range(5)}
+    edges = [
+        ("r1", "RELATED", "n0", "n4"),
+        ("r2", "RELATED", "n3", "n1"),
+        ("r3", "RELATED", "n1", "n2"),
+    ]
+    pages = fetch_all_pages(FakeGraphSession(nodes, edges), "Note", limit=2)
+
+    assert [len(page["nodes"]) for page in pages] == [2, 2, 1]
+    delivered = set()
+    relation_ids = []
+    for page in pages:
+        delivered.update(node["uuid"] for node in page["nodes"])
+        for relation in page["relations"]:
+            # 같은 label의 양 끝 노드는 현재 또는 이전 페이지에서 이미 받은 상태
+            assert {relation["source"], relation["target"]} <= delivered
+            relation_ids.append(relation["id"])
+    assert delivered == set(nodes)
+    assert sorted(relation_ids) == ["r1", "r2", "r3"]
+
+
+def test_last_page_is_exactly_full():
+    nodes = {f"n{i}": "Note" for i in range(4)}
+    pages = fetch_all_pages(FakeGraphSession(nodes, []), "Note", limit=2)
+
+    assert [len(page["nodes"]) for page in pages] == [2, 2]
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_cross_label_relations_are_returned_with_neighbors():
+    nodes = {"n0": "Note", "n1": "Note", "p0": "Person"}
+    edges = [
+        ("r1", "MENTIONS", "n0", "p0"),
+        ("r2", "MENTIONS", "n1", "p0"),
+    ]
+    page = asyncio.run(fetch_graph_page(FakeGraphSession(nodes, edges), "Note", None, 10, 100))
+
+    assert [(relation["id"], relation["source"], relation["target"]) for relation in page["relations"]] == [
+        ("r1", "n0", "p0"),
+        ("r2", "n1", "p0"),
+    ]
+    assert [(node["uuid"], node["label"]) for node in page["neighbors"]] == [("p0", "Person")]
+
+
+def test_relations_over_the_cap_continue_on_following_pages():
+    nodes = {"hub": "Note", "zz": "Note", **{f"p{i}": "Person" for i in range(5)}}
+    edges = [(f"r{i}", "MENTIONS", "hub", f"p{i}") for i in range(5)]
+    pages = fetch_all_pages(FakeGraphSession(nodes, edges), "Note", limit=1, max_relations=2)
+
+    assert [[node["uuid"] for node in page["nodes"]] for page in pages] == [["hub"], [], [], ["zz"]]
+    assert [[relation["id"] for relation in page["relations"]] for page in pages] == [
+        ["r0", "r1"], ["r2", "r3"], ["r4"], [],
+    ]
+    assert pages[-1]["next_cursor"] is None
+
+
+def test_relation_continuation_on_last_node_page_ends_pagination():
+    nodes = {"hub": "Note", **{f"p{i}": "Person" for i in range(3)}}
+    edges = [(f"r{i}", "MENTIONS", "hub", f"p{i}") for i in range(3)]
+    pages = fetch_all_pages(FakeGraphSession(nodes, edges), "Note", limit=10, max_relations=2)
+
+    assert len(pages) == 2
+    assert sorted(relation["id"] for page in pages for relation in page["relations"]) == ["r0", "r1", "r2"]
@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+from app.dependencies import get_current_user
+from app.main import app
+
+
+def test_graph_pool_stats_require_authentication():
+    assert TestClient(app).get("/health-check/graph-pool").status_code in (401, 403)
+
+
+def test_graph_pool_stats_for_authenticated_user():
+    app.dependency_overrides[get_current_user] = lambda: None
+    try:
+        response = TestClient(app).get("/health-check/graph-pool")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 200
+    assert set(response.json()) >= {"max_connection_pool_size", "sessions", "connections"}
@@ -0,0 +1,96 @@
+import asyncio
+from app.db.graph_schema import GraphSchemaManager, entities_text, schema_queries
+
+
+class FakeResult:
+    def __init__(self, records=()):
+        self._records = list(records)
+
+    async def consume(self):
+        return None
+
+    def __aiter__(self):
+        async def records():
+            for record in self._records:
+                yield record
+        return records()
+
+
+class FakeSession:
+    def __init__(self, fail_labels=(), labels=()):
+        self.queries = []
+        self.fail_labels = set(fail_labels)
+        self.labels = list(labels)
+
+    async def run(self, query, params=None):
+        self.queries.append(query)
+        if "db.labels()" in query:
+            return FakeResult({"label": label} for label in self.labels)
+        if any(f"`{label}`" in query for label in self.fail_labels):
+            raise RuntimeError("constraint violation")
+        return FakeResult()
+
+
+def is_backfill(query):
+    return "entitiesText IS NULL" in query
+
+
+def test_entities_text_joins_entities():
+    assert entities_text(["graph", "db"]) == "graph db"
+    assert entities_text(None) == ""
+
+
+def test_ensure_label_runs_only_ddl_once():
+    manager = GraphSchemaManager()
+    session = FakeSession()
+
+    asyncio.run(manager.ensure_label(session, "Note"))
+    asyncio.run(manager.ensure_label(session, "Note"))
+
+    assert session.queries == schema_queries("Note")
+    assert not any(is_backfill(query) for query in session.queries)
+
+
+def test_concurrent_ensure_label_runs_ddl_once():
+    manager = GraphSchemaManager()
+    session = FakeSession()
+
+    async def run():
+        await asyncio.gather(*(manager.ensure_label(session, "Note") for _ in range(5)))
+
+    asyncio.run(run())
+    assert session.queries == schema_queries("Note")
+
+
+def test_failed_label_is_not_retried_on_request_path():
+    manager = GraphSchemaManager()
+    session = FakeSession(fail_labels=["Note"])
+
+    asyncio.run(manager.ensure_label(session, "Note"))
+    asyncio.run(manager.ensure_label(session, "Note"))
+
+    assert len(session.queries) == 1
+    assert "Note" in manager.failed
+
+
+def test_ensure_all_retries_failures_and_backfills():
+    manager = GraphSchemaManager()
+    asyncio.run(manager.ensure_label(FakeSession(fail_labels=["Note"]), "Note"))
+
+    session = FakeSession(labels=["Note", "Other"])
+    ensured = asyncio.run(manager.ensure_all(session))
+
+    assert ensured == ["Note", "Other"]
+    assert manager.failed == {}
+    assert sum(is_backfill(query) for query in session.queries) == 2
+
+
+def test_ensure_all_skips_backfill_for_failed_label():
+    manager = GraphSchemaManager()
+    session = FakeSession(fail_labels=["Note"], labels=["Note", "Other"])
+
+    ensured = asyncio.run(manager.ensure_all(session))
+
+    assert ensured == ["Other"]
+    assert "Note" in manager.failed
+    assert [query for query in session.queries if is_backfill(query) and "`Note`" in query] == []
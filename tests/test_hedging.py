@@ -0,0 +1,133 @@
+import asyncio
+import pytest
+from app.ai import hedging
+from app.ai.hedging import HedgeStats, generate_and_execute
+from app.config import settings
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = HedgeStats()
+    monkeypatch.setattr(hedging, "hedge_stats", stats)
+    monkeypatch.setattr(settings, "CYPHER_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "CYPHER_HEDGE_TEMPERATURES", "0.2,0.7")
+    return stats
+
+
+def fake_chain(monkeypatch, delays):
+    """
+    temperature별로 delays[temperature]초 뒤에 f"query@{temperature}"를 생성하는 체인
+    """
+    calls = {"started": [], "cancelled": []}
+
+    async def run_chain(name, inputs, temperature=None):
+        calls["started"].append(temperature)
+        try:
+            await asyncio.sleep(delays[temperature])
+        except asyncio.CancelledError:
+            calls["cancelled"].append(temperature)
+            raise
+        return f"query@{temperature}"
+
+    monkeypatch.setattr(hedging, "run_chain", run_chain)
+    return calls
+
+
+async def execute_ok(candidate):
+    return f"rows for {candidate}"
+
+
+def test_first_successful_candidate_wins_and_others_are_cancelled(monkeypatch, stats):
+    calls = fake_chain(monkeypatch, {0.2: 0.01, 0.7: 1.0})
+
+    candidate, result = asyncio.run(generate_and_execute("search_question_query", {}, execute_ok))
+
+    assert candidate == "query@0.2"
+    assert result == "rows for query@0.2"
+    assert calls["cancelled"] == [0.7]
+    assert stats.to_dict()["candidates_cancelled"] == 1
+    assert stats.to_dict()["rounds"] == 1
+
+
+def test_failed_execution_falls_through_to_next_candidate(monkeypatch, stats):
+    fake_chain(monkeypatch, {0.2: 0.01, 0.7: 0.02})
+
+    async def execute(candidate):
+        if candidate == "query@0.2":
+            raise ValueError("invalid query")
+        return "rows"
+
+    candidate, result = asyncio.run(generate_and_execute("search_question_query", {}, execute))
+
+    assert (candidate, result) == ("query@0.7", "rows")
+    assert stats.candidates_failed == 1
+    assert stats.candidates_cancelled == 0
+
+
+def test_all_candidates_failing_raises_last_error(monkeypatch, stats):
+    fake_chain(monkeypatch, {0.2: 0.01, 0.7: 0.02})
+
+    async def execute(candidate):
+        raise ValueError(f"invalid {candidate}")
+
+    with pytest.raises(ValueError, match="invalid query@0.7"):
+        asyncio.run(generate_and_execute("search_question_query", {}, execute))
+    assert stats.rounds_failed == 1
+    assert stats.candidates_failed == 2
+
+
+def test_cancelling_the_request_cancels_pending_candidates(monkeypatch, stats):
+    calls = fake_chain(monkeypatch, {0.2: 1.0, 0.7: 1.0})
+
+    async def main():
+        task = asyncio.create_task(generate_and_execute("search_question_query", {}, execute_ok))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+    assert sorted(calls["cancelled"]) == [0.2, 0.7]
+    assert stats.candidates_cancelled == 2
+
+
+def test_disabled_runs_a_single_candidate(monkeypatch, stats):
+    monkeypatch.setattr(settings, "CYPHER_HEDGE_ENABLED", False)
+    calls = fake_chain(monkeypatch, {None: 0})
+
+    candidate, _ = asyncio.run(generate_and_execute("search_question_query", {}, execute_ok))
+
+    assert candidate == "query@None"
+    assert calls["started"] == [None]
+    assert stats.rounds == 0
+
+
+def test_cancelled_candidates_are_recorded_in_llm_telemetry(monkeypatch, stats):
+    from langchain_core.messages import HumanMessage
+    from app.ai import chains
+    from app.ai.telemetry import LLMTelemetry
+
+    telemetry = LLMTelemetry()
+    monkeypatch.setattr(chains, "llm_telemetry", telemetry)
+    monkeypatch.setattr(chains, "get_chain", lambda name, tier=None: name)
+    monkeypatch.setattr(hedging, "run_chain", chains.run_chain)
+
+    async def ainvoke_chain(chain, inputs, config=None):
+        callback = config["callbacks"][0]
+        callback.on_chat_model_start({}, [[HumanMessage(content="x" * 400)]])
+        temperature = config["configurable"]["llm_temperature"]
+        await asyncio.sleep(0.01 if temperature == 0.2 else 1.0)
+        return f"query@{temperature}"
+
+    monkeypatch.setattr(chains, "ainvoke_chain", ainvoke_chain)
+
+    candidate, _ = asyncio.run(generate_and_execute("search_question_query", {}, execute_ok))
+
+    metrics = telemetry.stats()["chains"]["search_question_query"]
+    assert candidate == "query@0.2"
+    assert metrics["calls"] == 2
+    assert metrics["cancelled"] == 1
+    assert metrics["errors"] == 0
+    assert metrics["estimated_input_tokens"] == 100
+    assert metrics["input_tokens"] == 100
@@ -0,0 +1,66 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.ai.image_cache import ImageDescriptionCache
+from app.api.protected import ai
+from app.dependencies import get_current_user
+from app.schemas.ai import ImageDescription
+
+
+def test_cache_matches_near_duplicate_hash_within_label():
+    cache = ImageDescriptionCache(max_size=8, max_distance=2)
+    cache.set("Note", 0b1010, {"description": "a"})
+
+    assert cache.get(" note ", 0b1011) == {"description": "a"}
+    assert cache.get("Note", 0b0101) is None
+    assert cache.get("Other", 0b1010) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_analyze_image_response_shape_is_same_on_hit_and_miss(monkeypatch):
+    image_description_cache = ImageDescriptionCache(max_size=8, max_distance=0)
+    calls = []
+
+    async def compute_perceptual_hash(image_content):
+        return 42
+
+    async def compress_image_to_base64(image_content):
+        return {
+            "base64_image": "",
+            "mime_type": "image/jpeg",
+            "width": 10,
+            "height": 20,
+            "quality": 90,
+            "output_bytes": 100,
+            "encode_ms": 1.5,
+        }
+
+    async def run_chain(name, inputs):
+        calls.append(name)
+        return ImageDescription(description="a cat")
+
+    monkeypatch.setattr(ai, "image_description_cache", image_description_cache)
+    monkeypatch.setattr(ai, "compute_perceptual_hash", compute_perceptual_hash)
+    monkeypatch.setattr(ai, "compress_image_to_base64", compress_image_to_base64)
+    monkeypatch.setattr(ai, "run_chain", run_chain)
+    app = FastAPI()
+    app.include_router(ai.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+    client = TestClient(app)
+
+    def analyze():
+        return client.post(
+            "/ai/analyze_image",
+            files={"image": ("a.jpg", b"image-bytes", "image/jpeg")},
+            data={"label": "Note"},
+        ).json()
+
+    miss = analyze()
+    hit = analyze()
+
+    assert calls == ["image_description"]
+    assert miss["cached"] is False
+    assert hit["cached"] is True
+    assert set(miss) == set(hit) == {"description", "image", "cached"}
+    assert hit["image"] == miss["image"]
+    assert hit["description"] == "a cat"
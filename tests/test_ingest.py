@@ -0,0 +1,152 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.ai import ingest
+from app.db.base import Base
+from app.db.crud.ingest_job import claim_ingest_job, create_ingest_job
+from app.schemas.ai import RelationChoice, RelationChoices, SummarizedText
+
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeGraphSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeDriver:
+    def session(self):
+        return FakeGraphSession()
+
+
+def graph_node(uuid, title):
+    # node_to_dict와 같은 형태 (createdAt/updatedAt은 datetime)
+    return {
+        "uuid": uuid,
+        "label": "Note",
+        "title": title,
+        "summary": f"{title} summary",
+        "entities": ["python"],
+        "createdAt": NOW,
+        "updatedAt": NOW,
+    }
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def fake_graph(monkeypatch):
+    calls = {"create_graph_node": [], "merge_relations": []}
+
+    async def summarize_with_cache(db, title, text):
+        return SummarizedText(summary=f"{title} summary", entities=["python"])
+
+    async def create_graph_node(session, label, title, summary, entities, uuid=None):
+        calls["create_graph_node"].append(uuid)
+        return graph_node(uuid, title)
+
+    async def search(session, label, title, summary, entities, top_k, exclude_uuid=None):
+        return [graph_node("related-1", "related")]
+
+    async def generate_and_execute(name, inputs, execute):
+        candidate = RelationChoices(relations=[
+            RelationChoice(related_uuid="related-1", relation_type="RELATED_TO"),
+            RelationChoice(related_uuid="unknown", relation_type="RELATED_TO"),
+        ])
+        return candidate, await execute(candidate)
+
+    async def merge_relations(session, label, target_uuid, pairs):
+        calls["merge_relations"].append(pairs)
+        return [{"type": pair["type"], "properties": {}, "source": target_uuid, "target": pair["uuid"]} for pair in pairs]
+
+    monkeypatch.setattr(ingest, "driver", FakeDriver())
+    monkeypatch.setattr(ingest, "summarize_with_cache", summarize_with_cache)
+    monkeypatch.setattr(ingest, "create_graph_node", create_graph_node)
+    monkeypatch.setattr(ingest.node_index, "search", search)
+    monkeypatch.setattr(ingest, "generate_and_execute", generate_and_execute)
+    monkeypatch.setattr(ingest, "merge_relations", merge_relations)
+    return calls
+
+
+def test_ingest_job_runs_all_stages(db, fake_graph):
+    create_ingest_job(db, "user-1", "Note", "title", "text")
+    job = claim_ingest_job(db, stale_after_seconds=600, max_attempts=3)
+
+    asyncio.run(ingest.run_ingest_job(job, db))
+    db.refresh(job)
+
+    assert job.status == "succeeded"
+    assert job.stage == "create_relations"
+    assert job.error is None
+    assert job.result["summary"] == "title summary"
+    assert job.result["node"]["uuid"] == job.id
+    assert job.result["node"]["createdAt"] == NOW.isoformat()
+    assert [node["uuid"] for node in job.result["related_nodes"]] == ["related-1"]
+    assert job.result["relations"] == [
+        {"type": "RELATED_TO", "properties": {}, "source": job.id, "target": "related-1"}
+    ]
+    # 후보에 없는 uuid는 관계 생성에서 제외됩니다.
+    assert fake_graph["merge_relations"] == [[{"uuid": "related-1", "type": "RELATED_TO"}]]
+
+
+def test_ingest_retry_reuses_node_uuid(db, fake_graph, monkeypatch):
+    create_ingest_job(db, "user-1", "Note", "title", "text")
+    job = claim_ingest_job(db, stale_after_seconds=600, max_attempts=3)
+
+    async def failing_search(*args, **kwargs):
+        raise RuntimeError("graph db unavailable")
+
+    monkeypatch.setattr(ingest.node_index, "search", failing_search)
+    asyncio.run(ingest.run_ingest_job(job, db))
+    db.refresh(job)
+    assert job.status == "queued"
+    assert job.stage == "create_node"
+
+    # 노드를 만든 뒤 결과 저장 전에 중단된 경우와 같이 create_node 단계부터 다시 실행
+    async def search(*args, **kwargs):
+        return []
+
+    monkeypatch.setattr(ingest.node_index, "search", search)
+    job.stage = "summarize"
+    db.commit()
+    asyncio.run(ingest.run_ingest_job(job, db))
+    db.refresh(job)
+
+    assert job.status == "succeeded"
+    assert fake_graph["create_graph_node"] == [job.id, job.id]
+
+
+def test_stale_running_job_is_reclaimed_until_attempts_are_exhausted(db):
+    job = create_ingest_job(db, "user-1", "Note", "title", "text")
+
+    for attempt in range(1, 4):
+        claimed = claim_ingest_job(db, stale_after_seconds=600, max_attempts=3)
+        assert claimed.id == job.id
+        assert claimed.attempts == attempt
+        # 워커가 job을 끝내지 못하고 중단된 경우
+        claimed.locked_at = datetime.now(timezone.utc) - timedelta(seconds=601)
+        db.commit()
+
+    assert claim_ingest_job(db, stale_after_seconds=600, max_attempts=3) is None
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.attempts == 3
+    assert job.locked_at is None
+    assert "최대 시도 횟수" in job.error
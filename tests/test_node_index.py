@@ -0,0 +1,51 @@
+from app.db.node_index import LabelIndex
+
+
+def node(uuid, title, summary="", entities=()):
+    return {"uuid": uuid, "label": "Note", "title": title, "summary": summary, "entities": list(entities)}
+
+
+def uuids(nodes):
+    return [n["uuid"] for n in nodes]
+
+
+def test_search_ranks_by_token_overlap_and_similarity():
+    index = LabelIndex()
+    index.upsert(node("a", "Graph database", "Neo4j stores graphs.", ["Neo4j", "Cypher"]))
+    index.upsert(node("b", "Graph theory", "Vertices and edges.", ["Euler"]))
+    index.upsert(node("c", "Cooking", "Pasta recipes.", ["Pasta"]))
+
+    results = index.search("Graph database", "Neo4j stores data.", ["Neo4j"], top_k=10)
+
+    assert uuids(results) == ["a", "b"]
+
+
+def test_search_only_scores_nodes_sharing_a_token():
+    index = LabelIndex()
+    index.upsert(node("a", "Graph database"))
+    index.upsert(node("b", "Cooking"))
+
+    assert uuids(index.search("Graph", "", [], top_k=10)) == ["a"]
+    assert index.search("", "", [], top_k=10) == []
+
+
+def test_search_respects_top_k_and_exclude():
+    index = LabelIndex()
+    for i in range(5):
+        index.upsert(node(f"n{i}", f"Graph note {i}"))
+
+    assert len(index.search("Graph", "", [], top_k=3)) == 3
+    assert "n0" not in uuids(index.search("Graph note 0", "", [], top_k=10, exclude_uuid="n0"))
+
+
+def test_upsert_replaces_and_remove_clears_postings():
+    index = LabelIndex()
+    index.upsert(node("a", "Graph database"))
+    index.upsert(node("a", "Cooking"))
+
+    assert index.search("Graph", "", [], top_k=10) == []
+    assert uuids(index.search("Cooking", "", [], top_k=10)) == ["a"]
+
+    index.remove("a")
+    assert index.postings == {}
+    assert index.search("Cooking", "", [], top_k=10) == []
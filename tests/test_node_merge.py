@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from app.ai import node_merge
+from app.ai.node_merge import merge_divergence, merge_entities, merge_node_content, merge_summary
+from app.ai.telemetry import LLMTelemetry
+from app.config import settings
+from app.schemas.ai import SummarizedText
+
+
+@pytest.fixture(autouse=True)
+def telemetry(monkeypatch):
+    telemetry = LLMTelemetry()
+    monkeypatch.setattr(node_merge, "llm_telemetry", telemetry)
+    return telemetry
+
+
+@pytest.fixture
+def chain_calls(monkeypatch):
+    calls = []
+
+    async def run_chain(name, inputs):
+        calls.append((name, inputs))
+        return SummarizedText(summary="merged by llm", entities=["Graph"])
+
+    monkeypatch.setattr(node_merge, "run_chain", run_chain)
+    return calls
+
+
+def test_merge_entities_deduplicates_by_normalized_value():
+    assert merge_entities(["Graph", "Neo4j"], ["graph ", "FastAPI"], max_entities=10) == ["Graph", "Neo4j", "FastAPI"]
+
+
+def test_merge_entities_keeps_shared_then_new_when_over_limit():
+    merged = merge_entities(["old", "shared"], ["shared", "new"], max_entities=2)
+    assert merged == ["shared", "new"]
+
+
+def test_merge_summary_appends_only_novel_sentences():
+    merged = merge_summary("Graphs store nodes.", "Graphs store nodes. Edges link them.", max_chars=1000)
+    assert merged == "Graphs store nodes. Edges link them."
+
+
+def test_merge_summary_drops_oldest_sentences_over_limit():
+    merged = merge_summary("First sentence here.", "Second sentence here.", max_chars=25)
+    assert merged == "Second sentence here."
+
+
+def test_merge_divergence():
+    assert merge_divergence("Graphs store nodes.", ["Graph"], "Graphs store nodes.", ["graph"]) == 0.0
+    assert merge_divergence("", [], "Entirely new content.", ["New"]) == 1.0
+
+
+def test_auto_merges_locally_when_content_is_similar(chain_calls, telemetry):
+    result, mode = asyncio.run(merge_node_content(
+        "Graph", "Graphs store nodes.", ["Graph"], "Graphs store nodes.", ["Graph"],
+    ))
+
+    assert mode == "local"
+    assert result.summary == "Graphs store nodes."
+    assert chain_calls == []
+    assert telemetry.stats()["node_merges"] == {"local": 1}
+
+
+def test_auto_uses_llm_when_content_diverges(monkeypatch, chain_calls, telemetry):
+    monkeypatch.setattr(settings, "NODE_MERGE_LLM_THRESHOLD", 0.5)
+    result, mode = asyncio.run(merge_node_content(
+        "Graph", "Short.", ["Graph"], "A completely different and much longer description.", ["Other", "More"],
+    ))
+
+    assert mode == "llm"
+    assert result.summary == "merged by llm"
+    assert [name for name, _ in chain_calls] == ["update_node"]
+    assert telemetry.stats()["node_merges"] == {"llm": 1}
+
+
+def test_explicit_mode_skips_divergence_check(chain_calls, telemetry):
+    _, mode = asyncio.run(merge_node_content("Graph", "Same.", [], "Same.", [], mode="llm"))
+
+    assert mode == "llm"
+    assert len(chain_calls) == 1
@@ -0,0 +1,73 @@
+import json
+from app.ai.query_cache import CypherTemplateCache
+from app.schemas.ai import Neo4jCipherQuery
+
+
+RELATED_QUERY = "MATCH (n:Note) WHERE n.title = $title OR any(e IN n.entities WHERE e IN $entities) RETURN n LIMIT $limit"
+
+
+def cypher(query, query_params):
+    return Neo4jCipherQuery(query=query, query_params=json.dumps(query_params))
+
+
+def related_inputs(title, summary, entities):
+    return {"title": title, "summary": summary, "entities": entities}
+
+
+def test_related_nodes_template_is_rebound_to_new_inputs():
+    cache = CypherTemplateCache(8)
+    inputs = related_inputs("Neo4j", "graph database", ["graph", "cypher"])
+    stored = cache.store("get_related_nodes", "Note", inputs, cypher(RELATED_QUERY, {"title": "Neo4j", "entities": ["graph", "cypher"], "limit": 10}))
+    assert stored
+
+    query, params = cache.lookup("get_related_nodes", "Note", related_inputs("Postgres", "sql database", ["sql"]))
+    assert query == RELATED_QUERY
+    assert params == {"title": "Postgres", "entities": ["sql"], "limit": 10}
+
+
+def test_templates_are_scoped_by_endpoint_and_label():
+    cache = CypherTemplateCache(8)
+    inputs = related_inputs("Neo4j", "graph database", ["graph"])
+    cache.store("get_related_nodes", "Note", inputs, cypher(RELATED_QUERY, {"title": "Neo4j"}))
+
+    assert cache.lookup("get_related_nodes", "Other", inputs) is None
+    assert cache.lookup("query", "Note", inputs) is None
+
+
+def test_query_with_inlined_literal_or_unknown_param_is_not_stored():
+    cache = CypherTemplateCache(8)
+    inputs = related_inputs("Neo4j", "graph database", ["graph"])
+
+    assert not cache.store("get_related_nodes", "Note", inputs, cypher("MATCH (n:Note {title: 'Neo4j'}) RETURN n LIMIT 10", {}))
+    assert not cache.store("get_related_nodes", "Note", inputs, cypher(RELATED_QUERY, {"title": "something else"}))
+    assert cache.lookup("get_related_nodes", "Note", inputs) is None
+
+
+def test_invalidate_removes_template():
+    cache = CypherTemplateCache(8)
+    inputs = related_inputs("Neo4j", "graph database", ["graph"])
+    cache.store("get_related_nodes", "Note", inputs, cypher(RELATED_QUERY, {"title": "Neo4j"}))
+
+    cache.invalidate("get_related_nodes", "Note", inputs)
+    assert cache.lookup("get_related_nodes", "Note", inputs) is None
+
+
+def test_keywords_picked_from_summary_are_not_stored():
+    cache = CypherTemplateCache(8)
+    query = "MATCH (n:Note) WHERE any(k IN $keywords WHERE n.summary CONTAINS k) RETURN n LIMIT 10"
+    inputs = related_inputs("Launch", "Neo4j launch event planned for next week", ["Neo4j"])
+
+    assert not cache.store("get_related_nodes", "Note", inputs, cypher(query, {"keywords": ["Neo4j", "launch"]}))
+    assert cache.lookup(
+        "get_related_nodes", "Note",
+        related_inputs("Groceries", "need to buy milk and eggs at the store in the morning", ["milk"]),
+    ) is None
+
+
+def test_rebound_list_param_keeps_the_input_list_as_is():
+    cache = CypherTemplateCache(8)
+    query = "MATCH (n:Note) WHERE any(e IN $entities WHERE e IN n.entities) RETURN n LIMIT 10"
+    cache.store("get_related_nodes", "Note", related_inputs("Launch", "Neo4j launch", ["Neo4j", "launch"]), cypher(query, {"entities": ["Neo4j", "launch"]}))
+
+    _, params = cache.lookup("get_related_nodes", "Note", related_inputs("Groceries", "need to buy milk", ["milk", "eggs"]))
+    assert params == {"entities": ["milk", "eggs"]}
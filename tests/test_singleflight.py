@@ -0,0 +1,93 @@
+import asyncio
+import pytest
+from app.ai.singleflight import SingleFlight, singleflight_key
+
+
+def test_key_ignores_whitespace_differences():
+    assert singleflight_key("Note", "what  is\n a graph ") == singleflight_key("Note", "what is a graph")
+    assert singleflight_key("Note", "a") != singleflight_key("Note", "b")
+
+
+def test_concurrent_calls_share_one_execution():
+    async def main():
+        flight = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", fn) for _ in range(3)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(main())
+    assert results == ["result"] * 3
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "followers": 2}
+
+
+def test_leader_cancellation_does_not_cancel_followers():
+    async def main():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "result"
+
+        leader = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return leader, await follower
+
+    leader, result = asyncio.run(main())
+    assert leader.cancelled()
+    assert result == "result"
+
+
+def test_errors_are_shared_and_key_is_released():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+        async def succeed():
+            return "ok"
+
+        return results, await flight.do("key", succeed)
+
+    results, retried = asyncio.run(main())
+    assert [str(result) for result in results] == ["boom", "boom"]
+    assert retried == "ok"
+
+
+def test_all_callers_cancelled_does_not_leak_running_call():
+    async def main():
+        flight = SingleFlight()
+        finished = asyncio.Event()
+
+        async def fn():
+            await asyncio.sleep(0.01)
+            finished.set()
+            raise RuntimeError("nobody is waiting")
+
+        caller = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await finished.wait()
+        await asyncio.sleep(0)
+        return flight.stats()["in_flight"]
+
+    assert asyncio.run(main()) == 0
@@ -0,0 +1,126 @@
+import asyncio
+import io
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from PIL import Image
+from app.api.protected import ai
+from app.core.middleware import UploadSizeLimitMiddleware
+from app.db.util.utilities import configure_image_decoding, perceptual_hash
+from app.dependencies import get_current_user
+
+
+def upload_app(max_bytes):
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, paths=["/upload"], max_bytes=max_bytes)
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    return app
+
+
+def call_asgi(app, chunks, headers):
+    """
+    Content-Length 없이 chunk들을 차례로 보내는 요청을 실행하고 (status, 받은 chunk 수)를 리턴
+    """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/upload",
+        "raw_path": b"/upload",
+        "root_path": "",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    pending = list(chunks)
+    received = []
+    sent = []
+
+    async def receive():
+        if not pending:
+            return {"type": "http.disconnect"}
+        body = pending.pop(0)
+        received.append(body)
+        return {"type": "http.request", "body": body, "more_body": bool(pending)}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+    return status, len(received)
+
+
+def multipart_chunks(file_size, chunk_size=1024):
+    boundary = b"boundary"
+    body = (
+        b"--" + boundary + b"\r\n"
+        b'Content-Disposition: form-data; name="file"; filename="a.bin"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n"
+        + b"x" * file_size
+        + b"\r\n--" + boundary + b"--\r\n"
+    )
+    chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+    headers = [(b"content-type", b"multipart/form-data; boundary=" + boundary)]
+    return chunks, headers
+
+
+def test_rejects_by_content_length_before_reading_body():
+    client = TestClient(upload_app(max_bytes=100))
+    response = client.post("/upload", files={"file": ("a.bin", b"x" * 1000)})
+    assert response.status_code == 413
+
+
+def test_rejects_chunked_body_while_receiving():
+    chunks, headers = multipart_chunks(file_size=50 * 1024)
+    status, received = call_asgi(upload_app(max_bytes=4 * 1024), chunks, headers)
+    assert status == 413
+    # 제한을 넘은 chunk까지만 받고 나머지는 읽지 않습니다.
+    assert received == 5
+    assert received < len(chunks)
+
+
+def test_accepts_chunked_body_under_limit():
+    chunks, headers = multipart_chunks(file_size=2 * 1024)
+    status, _ = call_asgi(upload_app(max_bytes=64 * 1024), chunks, headers)
+    assert status == 200
+
+
+def png_bytes(size):
+    buffered = io.BytesIO()
+    Image.new("RGB", size).save(buffered, format="PNG")
+    return buffered.getvalue()
+
+
+def test_decoding_limit_raises_decompression_bomb_error():
+    original = Image.MAX_IMAGE_PIXELS
+    try:
+        configure_image_decoding(100)
+        with pytest.raises(Image.DecompressionBombError):
+            perceptual_hash(png_bytes((100, 100)))
+    finally:
+        Image.MAX_IMAGE_PIXELS = original
+
+
+def test_analyze_image_maps_decompression_bomb_to_413(monkeypatch):
+    async def compute_perceptual_hash(image_content):
+        raise Image.DecompressionBombError("too many pixels")
+
+    monkeypatch.setattr(ai, "compute_perceptual_hash", compute_perceptual_hash)
+    app = FastAPI()
+    app.include_router(ai.router)
+    app.dependency_overrides[get_current_user] = lambda: None
+
+    response = TestClient(app).post(
+        "/ai/analyze_image",
+        files={"image": ("a.png", png_bytes((10, 10)), "image/png")},
+        data={"label": "Note"},
+    )
+    assert response.status_code == 413
@@ -0,0 +1,56 @@
+import numpy as np
+from app.ai.embedding import EMBEDDING_DIM
+from app.db.vector_index import LabelVectorIndex
+
+
+def unit(*components):
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    vector[:len(components)] = components
+    return vector / np.linalg.norm(vector)
+
+
+def test_search_returns_top_k_by_cosine_similarity():
+    index = LabelVectorIndex()
+    index.upsert("x", unit(1, 0))
+    index.upsert("xy", unit(1, 1))
+    index.upsert("y", unit(0, 1))
+    index.upsert("neg", unit(-1, 0))
+
+    results = index.search(unit(1, 0.1), top_k=2)
+
+    assert [uuid for uuid, _ in results] == ["x", "xy"]
+    assert results[0][1] > results[1][1]
+
+
+def test_search_applies_min_score_and_exclude():
+    index = LabelVectorIndex()
+    index.upsert("x", unit(1, 0))
+    index.upsert("y", unit(0, 1))
+    index.upsert("neg", unit(-1, 0))
+
+    assert [uuid for uuid, _ in index.search(unit(1, 0), top_k=10, min_score=0.1)] == ["x"]
+    assert [uuid for uuid, _ in index.search(unit(1, 0.5), top_k=1, exclude_uuid="x")] == ["y"]
+
+
+def test_search_handles_empty_index_and_top_k_larger_than_size():
+    index = LabelVectorIndex()
+    assert index.search(unit(1, 0), top_k=5) == []
+
+    index.upsert("x", unit(1, 0))
+    assert [uuid for uuid, _ in index.search(unit(1, 0), top_k=5)] == ["x"]
+    assert index.search(unit(1, 0), top_k=0) == []
+
+
+def test_grows_and_keeps_rows_consistent_after_remove():
+    index = LabelVectorIndex(capacity=2)
+    for i in range(5):
+        vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        vector[i] = 1.0
+        index.upsert(f"n{i}", vector)
+    index.remove("n1")
+
+    assert len(index) == 4
+    for i in (0, 2, 3, 4):
+        vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+        vector[i] = 1.0
+        assert index.search(vector, top_k=1)[0] == (f"n{i}", 1.0)